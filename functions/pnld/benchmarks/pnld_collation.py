@@ -0,0 +1,126 @@
+"""
+Allocations and peak memory of collating PNLD file results for a batch:
+the per-file dict of five lists with one extract_items pass per entity (as
+before PnldFileResult) against PnldFileResult collated into a PnldBatchResult
+as each file completes.
+
+Records are shaped like transform_pnld_file output (one OffenceRevision with
+30 terminal entries, menus, menu options and messages per file, plus a share
+of failed files), so only the result containers differ between the two runs.
+
+Run from functions/pnld:
+    python -m benchmarks.pnld_collation
+    python -m benchmarks.pnld_collation --files 5000 --failed 0.3 --repeat 5
+"""
+import argparse
+import gc
+import logging
+import random
+import time
+import tracemalloc
+
+from pnld_process.utils.pnld_results import PnldFileResult, PnldBatchResult
+
+
+def build_records(rng, idx, failed):
+    """Semarchy-shaped records of one file: (source_file, messages, offence, menus, menu_options)."""
+    messages = [{
+        "MessageCode": "WA-NSDT-CLEANSE-001",
+        "MessageType": "WARNING",
+        "MessageIssue": "Cleansed text",
+        "MessageCause": f"Whitespace removed ({n})",
+        "MessageResolution": "None",
+        "FID_SourceFile": idx,
+    } for n in range(rng.randint(0, 3))]
+
+    if failed:
+        return {"SourceFileID": idx, "FID_SourceStatus": "Failed", "MessageCount": len(messages)}, messages, None, [], []
+
+    offence = {f"TerminalEntry{n:02d}.EntryPrompt": f"Prompt {n}" for n in range(1, 31)}
+    offence.update({"CJSCode": f"SY{idx:05d}", "CJSTitle": f"Synthetic offence {idx}", "xml_file_id": idx})
+    menus = [{"MenuMD5": f"{idx:08x}{n:024x}", "CJSCode": f"SY{idx:05d}", "xml_file_id": idx}
+             for n in range(rng.randint(0, 3))]
+    menu_options = [{"FID_Menu": menu["MenuMD5"], "OptionNumber": n, "OptionText": f"Option {n}"}
+                    for menu in menus for n in range(1, 4)]
+
+    return {"SourceFileID": idx, "MessageCount": len(messages)}, messages, offence, menus, menu_options
+
+
+def collate_dicts(files):
+    """Before: a dict of five lists per file, then five passes over the batch."""
+    processed_records = []
+    for source_file, messages, offence, menus, menu_options in files:
+        processed_records.append({
+            "SourceFile": [source_file],
+            "SourceFileMessage": messages,
+            "OffenceRevision": [offence] if offence is not None else [],
+            "Menu": menus,
+            "MenuOptions": menu_options,
+        })
+
+    def extract_items(data, key):
+        results = []
+        for item in data:
+            if key in item:
+                results.extend(item[key])
+        return results
+
+    return (
+        extract_items(processed_records, "SourceFile"),
+        extract_items(processed_records, "SourceFileMessage"),
+        extract_items(processed_records, "OffenceRevision"),
+        extract_items(processed_records, "Menu"),
+        extract_items(processed_records, "MenuOptions"),
+    )
+
+
+def collate_results(files):
+    """After: a slotted result per file, collated into the batch as it completes."""
+    batch = PnldBatchResult(len(files))
+    for index, (source_file, messages, offence, menus, menu_options) in enumerate(files):
+        batch.add(index, PnldFileResult(source_file, messages, offence, menus, menu_options))
+    batch.finish()
+    return batch.source_files, batch.messages, batch.offences, batch.menus, batch.menu_options
+
+
+def measure(collate, files):
+    """(seconds, peak traced bytes, traced bytes still held once collated)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    collated = collate(files)
+
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del collated
+    return elapsed, peak, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--failed", type=float, default=0.2, help="Share of files that fail validation")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(0)
+    files = [build_records(rng, idx, rng.random() < args.failed) for idx in range(args.files)]
+
+    # Both must produce the same per-entity records
+    assert collate_dicts(files) == collate_results(files)
+
+    print(f"{args.files} files, {args.failed:.0%} failed, best of {args.repeat}")
+    print(f"{'collation':>10} | {'ms':>7} | {'peak KB':>8} | {'held KB':>8}")
+
+    for name, collate in (("dicts", collate_dicts), ("slotted", collate_results)):
+        elapsed, peak, held = min(measure(collate, files) for _ in range(args.repeat))
+        print(f"{name:>10} | {elapsed * 1e3:>7.2f} | {peak / 1024:>8.1f} | {held / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Import time of the pnld_process function (and the warmup function) against
+the budget recorded in benchmarks/pnld_import_budget.json.
+
+Each module is imported in a fresh interpreter with `-X importtime`, after
+azure.functions (the Python worker has already loaded it when it loads a
+function), so the figure is what loading the function adds to a cold start.
+The median over --repeat runs is compared with the budget; the slowest
+imports are listed so a regression can be traced to the module that caused
+it. Exits 1 when a module is over budget.
+
+Run from functions/pnld:
+    python -m benchmarks.pnld_import_time
+    python -m benchmarks.pnld_import_time --repeat 9 --top 20
+    python -m benchmarks.pnld_import_time --record     # re-record the budget
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "pnld_import_budget.json")
+
+# Modules loaded by the worker for the PNLD function app
+MODULES = ("pnld_process", "warmup")
+
+# Recorded budget = median measured * headroom (machines and load vary)
+HEADROOM = 1.5
+
+
+def import_times(module):
+    """
+    {imported module: (self us, cumulative us)} of the imports `module` adds,
+    in a fresh interpreter where azure.functions is already loaded.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import azure.functions; import {module}"],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header line
+        name = fields[2].strip()
+        if name == "azure.functions" and fields[2] == f" {name}":
+            times = {}  # loaded by the worker, not by the function
+            continue
+        times[name] = (self_us, cumulative_us)
+    return times
+
+
+def measure(module, repeat):
+    """(median ms of importing `module`, import times of the median run)."""
+    runs = sorted((import_times(module) for _ in range(repeat)), key=lambda t: t[module][1])
+    median = runs[len(runs) // 2]
+    return statistics.median(run[module][1] for run in runs) / 1000, median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports (by self time) listed per module")
+    parser.add_argument("--record", action="store_true", help=f"Record median x {HEADROOM} as the new budget")
+    args = parser.parse_args()
+
+    try:
+        with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+            budgets = json.load(f)
+    except FileNotFoundError:
+        budgets = {}
+
+    over_budget = []
+
+    for module in MODULES:
+        median_ms, times = measure(module, args.repeat)
+        budget_ms = budgets.get(module, {}).get("budget_ms")
+
+        if args.record:
+            budget_ms = round(median_ms * HEADROOM)
+            budgets[module] = {"budget_ms": budget_ms, "recorded_ms": round(median_ms, 1)}
+
+        status = "no budget" if budget_ms is None else ("OK" if median_ms <= budget_ms else "OVER BUDGET")
+        print(f"{module}: {median_ms:.1f} ms (budget {budget_ms} ms) - {status}")
+
+        for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda t: -t[1][0])[:args.top]:
+            print(f"    {self_us / 1000:>7.1f} ms self | {cumulative_us / 1000:>7.1f} ms cumulative | {name}")
+
+        if budget_ms is not None and median_ms > budget_ms:
+            over_budget.append(module)
+
+    if args.record:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Budget recorded in {BUDGET_FILE}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
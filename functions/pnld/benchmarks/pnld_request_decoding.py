@@ -0,0 +1,144 @@
+"""
+Parity and speed of decode_request_records against req.get_json (strict
+UTF-8 decode + json.loads) and the request checks pnld_process made on it.
+
+Every body - a fixed set of valid and invalid ones, plus --mutations random
+single-byte edits of a valid body - must give the same outcome both ways:
+the same records (SourceFileContent loaded), the same request error, or
+ValueError for both. Then a --files x --content-kb body is decoded both
+ways and timed. Exits 1 on any mismatch.
+
+Run from functions/pnld:
+    python -m benchmarks.pnld_request_decoding
+    python -m benchmarks.pnld_request_decoding --mutations 20000 --files 500 --content-kb 256
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+import time
+
+from pnld_process.utils.request_decoding import decode_request_records, load_content
+
+FIXED_BODIES = [
+    # Valid
+    b'{"records": []}',
+    b'{}',
+    b' \r\n{"records":[{"SourceFileID":1,"SourceFileContent":"QUJD"}]}\n',
+    b'{"x":[1,2,{"y":null}],"records":[{"SourceFileID":1,"SourceFileContent":"QU\\nJD"},{"SourceFileID":2}]}',
+    b'{"records":[{"SourceFileID":1,"SourceFileContent":"\\u0041\\/B"}],"records":[{"SourceFileID":3}]}',
+    b'{"records":[1,"a",null,[2],{"SourceFileContent":null}]}',
+    b'{"records":[{"SourceFileContent":"caf\xc3\xa9","n":-1.5e3,"t":true,"f":false}],"z":NaN}',
+    b'{"records":[{"SourceFileContent":"a\\"b\\\\"}]}',
+    # Request errors
+    b'[]',
+    b'"records"',
+    b'{"records": {}}',
+    b'{"records": "x"}',
+    b'{"records": null}',
+    # Invalid JSON
+    b'',
+    b'{',
+    b'{"x":[1,,2],"records":[]}',
+    b'{"x":{"a" 1},"records":[]}',
+    b'{"x":tru,"records":[]}',
+    b'{"records":[]} x',
+    b'{"records":[],}',
+    b'{"records":[1,]}',
+    b'{"records":[{"SourceFileContent":"QU\tJD"}]}',
+    b'{"records":[{"SourceFileContent":"QU\\qJD"}]}',
+    b'{"records":[{"SourceFileContent":"QUJD}]}',
+    b'{"records":[{"SourceFileContent":"\xff"}]}',
+    b'{"x":"\xc3","records":[]}',
+    b'\xef\xbb\xbf{"records":[]}',
+    b'{"records":[{"SourceFileID":01}]}',
+    b'{"x":[1,2}],"records":[]}',
+]
+
+
+def reference(body):
+    """What pnld_process did with req.get_json(): records, a request error, or 'invalid'."""
+    try:
+        request_body = json.loads(body.decode("utf-8"))
+    except ValueError:
+        return "invalid"
+    if not isinstance(request_body, dict):
+        return "body_is_not_json_object"
+    records = request_body.get("records", [])
+    if not isinstance(records, list):
+        return "'records'_not_array"
+    return records
+
+
+def decoded(body):
+    """The same outcome through decode_request_records."""
+    try:
+        records, error = decode_request_records(body)
+    except ValueError:
+        return "invalid"
+    if error is not None:
+        return error
+    return [load_content(record) if isinstance(record, dict) else record for record in records]
+
+
+def mutate(rng, body):
+    """One random byte deleted, inserted or replaced (JSON punctuation is favoured)."""
+    pos = rng.randrange(len(body) + 1)
+    byte = bytes([rng.choice(b'{}[]",:\\ 0aen\x00\xff')])
+    edit = rng.randrange(3)
+    if edit == 0 and pos < len(body):
+        return body[:pos] + body[pos + 1:]
+    if edit == 1:
+        return body[:pos] + byte + body[pos:]
+    return body[:pos] + byte + body[pos + 1:]
+
+
+def build_body(rng, files, content_bytes):
+    return json.dumps({
+        "meta": {"batch": 1, "tags": ["a", "b"]},
+        "records": [
+            {"SourceFileID": idx, "CJSCode": f"SY{idx:05d}",
+             "SourceFileContent": base64.b64encode(rng.randbytes(content_bytes)).decode()}
+            for idx in range(files)
+        ],
+    }).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mutations", type=int, default=5000, help="Random single-byte edits of a valid body")
+    parser.add_argument("--files", type=int, default=200, help="Records in the timed body")
+    parser.add_argument("--content-kb", type=int, default=256, help="Decoded SourceFileContent size per record")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_body = FIXED_BODIES[3]
+    bodies = list(FIXED_BODIES) + [mutate(rng, seed_body) for _ in range(args.mutations)]
+
+    mismatches = 0
+    for body in bodies:
+        expected, actual = reference(body), decoded(body)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH {body[:120]!r}: json.loads={expected!r:.80} decoder={actual!r:.80}")
+    print(f"Parity: {len(bodies) - mismatches}/{len(bodies)} bodies match")
+
+    body = build_body(rng, args.files, args.content_kb * 1024)
+    started = time.perf_counter()
+    reference(body)
+    reference_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    decode_request_records(body)
+    decode_seconds = time.perf_counter() - started
+    print(f"Body of {len(body) / 1e6:.1f} MB: json.loads {reference_seconds * 1e3:.1f} ms, "
+          f"decode_request_records {decode_seconds * 1e3:.1f} ms (content left in the body)")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-stage latency of pnld_file_handling from the spans written by the local
+file exporter (PnldTelemetryExporter=file, see PnldTelemetryFile): count,
+p50 / p95 / p99 / max and total per stage, slowest p99 first, so the stage
+that dominates the tail stands out. Stages can be split by outcome and
+limited to one batch's files.
+
+Run from functions/pnld:
+    python -m benchmarks.pnld_stage_report /tmp/pnld-telemetry.jsonl
+    python -m benchmarks.pnld_stage_report /tmp/pnld-telemetry.jsonl --by-outcome
+    python -m benchmarks.pnld_stage_report /tmp/pnld-telemetry.jsonl --batch-id 1234
+"""
+import argparse
+import json
+import math
+from datetime import datetime
+
+STAGE_SPAN_PREFIX = "pnld_process.file."
+
+
+def _seconds(span):
+    start = datetime.fromisoformat(span["start_time"])
+    end = datetime.fromisoformat(span["end_time"])
+    return (end - start).total_seconds()
+
+
+def read_spans(path):
+    """File and stage spans in the exporter output (metric lines are skipped)."""
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a worker that was stopped
+            if "context" in item and item.get("name", "").startswith("pnld_process.file"):
+                spans.append(item)
+    return spans
+
+
+def stage_durations(spans, batch_id=None, by_outcome=False):
+    """{stage (or 'stage [outcome]'): [seconds, ...]} of the stage spans."""
+    file_spans = {span["context"]["span_id"]: span for span in spans if span["name"] == "pnld_process.file"}
+
+    durations = {}
+    for span in spans:
+        if not span["name"].startswith(STAGE_SPAN_PREFIX):
+            continue
+
+        if batch_id is not None:
+            parent = file_spans.get(span.get("parent_id"))
+            if parent is None or str(parent["attributes"].get("pnld.batch_id")) != batch_id:
+                continue
+
+        name = span["name"][len(STAGE_SPAN_PREFIX):]
+        if by_outcome:
+            name = f"{name} [{span['attributes'].get('pnld.outcome')}]"
+        durations.setdefault(name, []).append(_seconds(span))
+    return durations
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list (as BatchStageTelemetry reports it)."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSON-lines file written by the file exporter")
+    parser.add_argument("--batch-id", help="Only files of this BatchID")
+    parser.add_argument("--by-outcome", action="store_true", help="Report each stage per outcome (success / failed / error)")
+    args = parser.parse_args()
+
+    durations = stage_durations(read_spans(args.path), args.batch_id, args.by_outcome)
+    if not durations:
+        print("No pnld_process stage spans found")
+        return
+
+    rows = []
+    for name, values in durations.items():
+        ordered = sorted(values)
+        rows.append((name, len(ordered), *(percentile(ordered, q) * 1e3 for q in (0.5, 0.95, 0.99)),
+                     ordered[-1] * 1e3, sum(ordered) * 1e3))
+    rows.sort(key=lambda row: -row[4])
+
+    width = max(len(row[0]) for row in rows)
+    print(f"{'stage':<{width}} | {'count':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'max ms':>8} | {'total ms':>10}")
+    for name, count, p50, p95, p99, slowest, total in rows:
+        print(f"{name:<{width}} | {count:>6} | {p50:>8.2f} | {p95:>8.2f} | {p99:>8.2f} | {slowest:>8.2f} | {total:>10.1f}")
+
+    print(f"Slowest stage at p99: {rows[0][0]}")
+
+
+if __name__ == "__main__":
+    main()
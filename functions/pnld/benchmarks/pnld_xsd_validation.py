@@ -0,0 +1,81 @@
+"""
+Per-file cost of pnld_xsd_validation: compiling the XSD and building a parser
+for every file (as before the compiled-schema cache) against the cached,
+per-thread schema and parser.
+
+Run from functions/pnld:
+    python -m benchmarks.pnld_xsd_validation
+    python -m benchmarks.pnld_xsd_validation --files 400 --member-kb 8 --threads 4
+    python -m benchmarks.pnld_xsd_validation --xsd path/to/PNLD.xsd --xml path/to/sample.xml
+"""
+import argparse
+import base64
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+
+from benchmarks.synthetic_zip import build_pnld_xml, build_pnld_xsd
+from pnld_process.utils.file_handling.helpers.xsd_handling import pnld_xsd_validation
+
+
+def validate_uncached(xml_encoded, xsd_encoded, xml_file_id):
+    """The validation path before the cache: decode + compile the XSD and build a parser per file."""
+    schema = etree.XMLSchema(etree.XML(base64.b64decode(xsd_encoded)))
+    parser = etree.XMLParser(ns_clean=True, remove_blank_text=True)
+    xml_tree = etree.ElementTree(etree.fromstring(base64.b64decode(xml_encoded), parser))
+    return schema.validate(xml_tree)
+
+
+def validate_cached(xml_encoded, xsd_encoded, xml_file_id):
+    messages, xml_tree = pnld_xsd_validation(xml_encoded, xsd_encoded, xml_file_id)
+    return xml_tree is not None and not messages
+
+
+def run(validate, documents, xsd_encoded, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda item: validate(item[1], xsd_encoded, item[0]), enumerate(documents)))
+    elapsed = time.perf_counter() - start
+
+    if not all(results):
+        raise SystemExit(f"{validate.__name__}: {results.count(False)} document(s) failed validation")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--member-kb", type=int, default=8, help="Size of each synthetic XML file")
+    parser.add_argument("--xsd-extra", type=int, default=200, help="Optional restricted elements in the synthetic XSD")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--xsd", help="Real XSD file instead of the synthetic one")
+    parser.add_argument("--xml", help="Real XML file (repeated --files times) instead of synthetic ones")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    xsd_bytes = open(args.xsd, "rb").read() if args.xsd else build_pnld_xsd(args.xsd_extra)
+    xsd_encoded = base64.b64encode(xsd_bytes).decode("ascii")
+
+    if args.xml:
+        documents = [base64.b64encode(open(args.xml, "rb").read()).decode("ascii")] * args.files
+    else:
+        rng = random.Random(0)
+        documents = [base64.b64encode(build_pnld_xml(rng, idx, args.member_kb)).decode("ascii")
+                     for idx in range(args.files)]
+
+    print(f"XSD {len(xsd_bytes) / 1024:.0f} KB, {args.files} files")
+    print(f"{'threads':>7} | {'uncached us/file':>16} | {'cached us/file':>14} | {'speed-up':>8}")
+
+    for threads in args.threads:
+        before = run(validate_uncached, documents, xsd_encoded, threads)
+        after = run(validate_cached, documents, xsd_encoded, threads)
+        print(f"{threads:>7} | {before / args.files * 1e6:>16.0f} | {after / args.files * 1e6:>14.0f} | "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
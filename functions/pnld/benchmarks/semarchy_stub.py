@@ -0,0 +1,74 @@
+"""
+Local stand-in for the Semarchy REST API used by the benchmarks.
+
+POST /loads/CSDS answers like CREATE_LOAD_AND_SUBMIT ({"load": {"loadId", "batchId"}})
+after an optional fixed latency, and keeps the size and record counts of
+every body it receives.
+"""
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SemarchyStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency_seconds=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency_seconds = latency_seconds
+        self.load_ids = itertools.count(1)
+        self.loads = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path.rstrip("/") != "/loads/CSDS":
+            self.send_error(404)
+            return
+
+        records = json.loads(body).get("persistRecords", {})
+        if self.server.latency_seconds:
+            time.sleep(self.server.latency_seconds)
+
+        with self.server.lock:
+            load_id = next(self.server.load_ids)
+            self.server.loads.append({
+                "LoadID": load_id,
+                "Bytes": len(body),
+                "SourceZIP": len(records.get("SourceZIP", [])),
+                "SourceFile": len(records.get("SourceFile", [])),
+            })
+
+        out = json.dumps({"load": {"loadId": load_id, "batchId": load_id}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def running_stub(latency_seconds=0.0):
+    """Serve a SemarchyStub on a background thread for the duration of the block."""
+    stub = SemarchyStub(latency_seconds)
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield stub
+    finally:
+        stub.shutdown()
+        stub.server_close()
@@ -0,0 +1,192 @@
+"""
+Synthetic PNLD-shaped ZIPs for the zip_extract benchmarks.
+
+Each XML member looks like a PNLD offence file (document / pnldref, codes /
+cjsoffencecode, english wording, ancillary dates) padded with offence
+wording up to the requested size. The wording is sliced at random from a
+corpus of offence words, so members compress roughly like real PNLD text
+rather than like zeros or noise, and no two members are identical.
+"""
+import base64
+import functools
+import io
+import random
+import zipfile
+
+COMPRESSION = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+_WORDS = (
+    "being the owner of a vehicle failed to give information relating to the identification "
+    "of the driver as required by section contrary to road traffic act at on did without lawful "
+    "authority or reasonable excuse have with you in a public place an article which had a blade "
+    "or was sharply pointed namely specify date time location value person property"
+).split()
+
+PNLD_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    "<document>"
+    "<pnldref>{pnld_ref}</pnldref>"
+    "<english><title>Synthetic offence {idx}</title>"
+    "<legislation>Contrary to section {idx} of the Synthetic Act 2024.</legislation>"
+    "<standardoffencewording>{wording}</standardoffencewording>"
+    "<standardstatementoffacts>{facts}</standardstatementoffacts></english>"
+    "<codes><cjsoffencecode>{cjs_code}</cjsoffencecode></codes>"
+    "<ancillary><offencestartdate>2024-01-01</offencestartdate>"
+    "<dateoflastupdate>2024-06-01</dateoflastupdate></ancillary>"
+    "</document>"
+)
+
+# XSD accepting PNLD_TEMPLATE, with `extra` optional restricted elements in
+# <ancillary> so that compiling it costs roughly what a full PNLD schema does
+PNLD_XSD_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" elementFormDefault="qualified">'
+    '<xs:simpleType name="code"><xs:restriction base="xs:string"><xs:maxLength value="8"/></xs:restriction></xs:simpleType>'
+    '<xs:element name="document"><xs:complexType><xs:sequence>'
+    '<xs:element name="pnldref" type="xs:string"/>'
+    '<xs:element name="english"><xs:complexType><xs:sequence>'
+    '<xs:element name="title" type="xs:string"/>'
+    '<xs:element name="legislation" type="xs:string"/>'
+    '<xs:element name="standardoffencewording" type="xs:string"/>'
+    '<xs:element name="standardstatementoffacts" type="xs:string" minOccurs="0"/>'
+    '</xs:sequence></xs:complexType></xs:element>'
+    '<xs:element name="codes"><xs:complexType><xs:sequence>'
+    '<xs:element name="cjsoffencecode" type="code"/>'
+    '</xs:sequence></xs:complexType></xs:element>'
+    '<xs:element name="ancillary"><xs:complexType><xs:sequence>'
+    '<xs:element name="offencestartdate" type="xs:date"/>'
+    '<xs:element name="offenceenddate" type="xs:date" minOccurs="0"/>'
+    '<xs:element name="dateoflastupdate" type="xs:date"/>'
+    '{extra}'
+    '</xs:sequence></xs:complexType></xs:element>'
+    '</xs:sequence></xs:complexType></xs:element>'
+    '</xs:schema>'
+)
+
+_XSD_EXTRA_ELEMENT = (
+    '<xs:element name="extra{n}" minOccurs="0"><xs:simpleType><xs:restriction base="xs:string">'
+    '<xs:enumeration value="A{n}"/><xs:enumeration value="B{n}"/><xs:enumeration value="C{n}"/>'
+    '<xs:pattern value="[A-C]{n}"/>'
+    '</xs:restriction></xs:simpleType></xs:element>'
+)
+
+OOXML_MEMBERS = {
+    "[Content_Types].xml": b'<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>',
+    "_rels/.rels": b'<?xml version="1.0"?><Relationships/>',
+    "word/document.xml": b'<?xml version="1.0"?><w:document xmlns:w="urn:w"><w:body/></w:document>',
+}
+
+_CORPUS_CHARS = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _corpus():
+    return " ".join(random.Random(0).choices(_WORDS, k=_CORPUS_CHARS // 5))
+
+
+def _wording(rng, size):
+    """`size` characters of offence-like text, sliced from the corpus at random offsets."""
+    corpus = _corpus()
+    parts = []
+    while size > 0:
+        take = min(size, len(corpus) // 2)
+        start = rng.randrange(len(corpus) - take)
+        parts.append(corpus[start:start + take])
+        size -= take
+    return "".join(parts)
+
+
+def build_pnld_xml(rng, idx, member_kb):
+    """One PNLD-shaped XML member of roughly `member_kb` KB."""
+    wording_size = max(0, member_kb * 1024 - 600)
+    return PNLD_TEMPLATE.format(
+        idx=idx,
+        pnld_ref=f"H{idx % 10_000_000:07d}",
+        cjs_code=f"SY{idx % 100_000:05d}",
+        wording=_wording(rng, wording_size * 3 // 4),
+        facts=_wording(rng, wording_size // 4),
+    ).encode("utf-8")
+
+
+def build_pnld_xsd(extra=200):
+    """A PNLD-shaped XSD that validates build_pnld_xml output."""
+    return PNLD_XSD_TEMPLATE.format(
+        extra="".join(_XSD_EXTRA_ELEMENT.format(n=n) for n in range(extra))
+    ).encode("utf-8")
+
+
+def build_zip(members=20, member_kb=16, compression="deflated", compresslevel=None,
+              decoys=0, seed=0, first_idx=0):
+    """
+    Raw bytes of a PNLD-shaped ZIP with `members` XML files and `decoys`
+    non-XML members (PDF / text noise that zip_extract must skip).
+    """
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, "w", COMPRESSION[compression], compresslevel=compresslevel) as archive:
+        for n in range(members):
+            idx = first_idx + n
+            archive.writestr(f"offence_{idx:06d}.xml", build_pnld_xml(rng, idx, member_kb))
+        for n in range(decoys):
+            archive.writestr(f"attachments/notes_{n:04d}.pdf", rng.randbytes(member_kb * 1024))
+
+    return buffer.getvalue()
+
+
+def build_ooxml_decoy(seed=0, member_kb=16):
+    """Raw bytes of a .docx-shaped archive - a ZIP that zip_extract must reject."""
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in OOXML_MEMBERS.items():
+            archive.writestr(name, content)
+        archive.writestr("word/media/image1.png", rng.randbytes(member_kb * 1024))
+
+    return buffer.getvalue()
+
+
+def encode(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+
+def build_records(zips=8, members=20, member_kb=16, compression="deflated", compresslevel=None,
+                  decoys=0, ooxml=0, seed=0):
+    """
+    SourceZIP notification records: `zips` PNLD ZIPs followed by `ooxml`
+    OOXML decoys. Member indexes never repeat across the batch, so batch
+    de-duplication does not skip any file.
+    """
+    records = []
+
+    for z in range(zips):
+        raw = build_zip(members, member_kb, compression, compresslevel, decoys,
+                        seed=seed + z, first_idx=z * members)
+        records.append({"SourceZIPID": len(records) + 1, "ZIPFileContent": encode(raw), "UploadedBy": "benchmark"})
+
+    for z in range(ooxml):
+        records.append({"SourceZIPID": len(records) + 1, "ZIPFileContent": encode(build_ooxml_decoy(seed + z)),
+                        "UploadedBy": "benchmark"})
+
+    return records
+
+
+def build_encoded_zip(target_mb, member_kb=256, seed=None):
+    """Base64 of one PNLD-shaped ZIP of roughly `target_mb` MB (compressed)."""
+    seed = target_mb if seed is None else seed
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    idx = seed * 100_000
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        while buffer.tell() < target_mb * 1024 * 1024:
+            archive.writestr(f"offence_{idx:06d}.xml", build_pnld_xml(rng, idx, member_kb))
+            idx += 1
+
+    return encode(buffer.getvalue())
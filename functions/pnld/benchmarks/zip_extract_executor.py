@@ -0,0 +1,59 @@
+"""
+Throughput of process_zip_batch for the thread and process backends
+at 1, 2, 4 and 8 workers.
+
+Run from functions/pnld:
+    python -m benchmarks.zip_extract_executor --zips 16 --zip-mb 4 2>/dev/null
+
+(stderr carries the per-file logging of the spawned workers.)
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from benchmarks.synthetic_zip import build_encoded_zip
+from zip_extract.utils.zip_decompression_batch_control import process_zip_batch
+
+
+def run_batch(records, backend, workers):
+    start = time.perf_counter()
+    results = asyncio.run(process_zip_batch(records, max_concurrency=workers, backend=backend))
+    elapsed = time.perf_counter() - start
+    files = sum(len(r["SourceFile"]) for r in results)
+    return elapsed, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zips", type=int, default=16)
+    parser.add_argument("--zip-mb", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    # Distinct seeds so the batch de-duplication does not skip anything
+    records = [
+        {"SourceZIPID": i, "ZIPFileContent": build_encoded_zip(args.zip_mb, seed=i)}
+        for i in range(args.zips)
+    ]
+    total_mb = sum(len(r["ZIPFileContent"]) for r in records) * 3 / 4 / (1024 * 1024)
+
+    print(f"cpu_count={os.cpu_count()} zips={args.zips} archive_mb={total_mb:.1f}")
+    print(f"{'backend':>8} | {'workers':>7} | {'seconds':>8} | {'MB/s':>7} | {'files/s':>8}")
+
+    for backend in ("thread", "process"):
+        # Warm the process pool so spawn start-up is not counted
+        if backend == "process":
+            for workers in args.workers:
+                run_batch(records[:1], backend, workers)
+
+        for workers in args.workers:
+            elapsed, files = run_batch(records, backend, workers)
+            print(f"{backend:>8} | {workers:>7} | {elapsed:>8.2f} | {total_mb / elapsed:>7.1f} | {files / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
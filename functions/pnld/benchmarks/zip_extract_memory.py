@@ -0,0 +1,72 @@
+"""
+Peak RSS of process_zip against archive size.
+
+Each measurement runs in a fresh interpreter so ru_maxrss only reflects that
+one ZIP. The "in-memory" column forces the spool to stay in memory
+(the pre-streaming behaviour); "streaming" uses the configured spool limit.
+
+Run from functions/pnld:
+    python -m benchmarks.zip_extract_memory --sizes 8 32 128
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic_zip import build_encoded_zip
+
+
+CHILD = r"""
+import json, resource, sys, logging
+logging.disable(logging.CRITICAL)
+encoded = open(sys.argv[1]).read()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+from zip_extract.utils.zip_decompression_functions import process_zip
+result = process_zip({"SourceZIPID": 1, "ZIPFileContent": encoded})
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"files": len(result["SourceFile"]), "rss_before_kb": before, "rss_peak_kb": after}))
+"""
+
+
+def run_child(encoded_path, spool_max_bytes):
+    env = dict(os.environ, ZipExtractSpoolMaxBytes=str(spool_max_bytes))
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, encoded_path],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128], help="Archive sizes in MB")
+    parser.add_argument("--spool-max-mb", type=int, default=32, help="Spool limit for the streaming run")
+    args = parser.parse_args()
+
+    print(f"{'archive MB':>10} | {'files':>6} | {'input RSS MB':>12} | {'in-memory peak MB':>17} | {'streaming peak MB':>17}")
+
+    for size in args.sizes:
+        encoded_path = os.path.join(tempfile.gettempdir(), f"bench_zip_{size}.b64")
+        try:
+            with open(encoded_path, "w") as f:
+                f.write(build_encoded_zip(size))
+
+            in_memory = run_child(encoded_path, 1 << 40)
+            streaming = run_child(encoded_path, args.spool_max_mb * 1024 * 1024)
+        finally:
+            os.remove(encoded_path)
+
+        # Absolute peaks; "input RSS" is the interpreter plus the encoded request string
+        def mb(kb):
+            return kb / 1024
+
+        print(
+            f"{size:>10} | {streaming['files']:>6} | {mb(streaming['rss_before_kb']):>12.1f} | "
+            f"{mb(in_memory['rss_peak_kb']):>17.1f} | {mb(streaming['rss_peak_kb']):>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+End-to-end zip_extract benchmark: synthetic PNLD ZIPs through zip_extract.main
+against a local Semarchy stub.
+
+Each run happens in a fresh interpreter (so peak RSS belongs to that run alone)
+that reads the request body from disk, as the Functions host would hand it
+over. Reports MB/s (compressed), files/s, p50 / p95 per-ZIP latency and peak
+RSS, and writes everything as JSON so runs can be compared over time.
+
+Run from functions/pnld:
+    python -m benchmarks.zip_extract_suite
+    python -m benchmarks.zip_extract_suite --scenario many-small mixed-decoys --repeat 3
+    python -m benchmarks.zip_extract_suite --zips 4 --members 500 --member-kb 32 --compression lzma
+    python -m benchmarks.zip_extract_suite --setting ZipExtractExecutor=thread --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.semarchy_stub import running_stub
+from benchmarks.synthetic_zip import COMPRESSION, build_records
+
+SCENARIOS = {
+    "many-small": dict(zips=64, members=20, member_kb=8),
+    "few-large": dict(zips=4, members=400, member_kb=32),
+    "single-huge": dict(zips=1, members=2000, member_kb=16),
+    "stored": dict(zips=16, members=50, member_kb=16, compression="stored"),
+    "mixed-decoys": dict(zips=16, members=40, member_kb=16, decoys=10, ooxml=4),
+}
+
+CHILD = r"""
+import asyncio, json, logging, resource, sys, time
+logging.disable(logging.CRITICAL)
+import azure.functions as func
+import zip_extract
+
+body = open(sys.argv[1], "rb").read()
+req = func.HttpRequest("POST", "/api/zip_extract", body=body)
+del body
+
+started = time.perf_counter()
+response = asyncio.run(zip_extract.main(req))
+wall = time.perf_counter() - started
+
+print(json.dumps({
+    "status_code": response.status_code,
+    "wall_seconds": wall,
+    "response": json.loads(response.get_body()),
+    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "worker_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+}))
+"""
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 4)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(body_path, stub, settings):
+    env = dict(os.environ, SemarchyBaseURL=stub.base_url, SemarchyAPIKey="benchmark", **settings)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, body_path],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    summary = result["response"].get("Summary", {})
+    latencies = [z["ProcessSeconds"] for z in summary.get("ZIPs", []) if z.get("ProcessSeconds")]
+    compressed_mb = summary.get("CompressedBytes", 0) / (1024 * 1024)
+    wall = result["wall_seconds"]
+
+    return {
+        "status_code": result["status_code"],
+        "wall_seconds": round(wall, 4),
+        "mb_per_second": round(compressed_mb / wall, 2),
+        "files_per_second": round(summary.get("FileCount", 0) / wall, 1),
+        "zip_latency_p50_seconds": percentile(latencies, 50),
+        "zip_latency_p95_seconds": percentile(latencies, 95),
+        "peak_rss_mb": round(result["peak_rss_kb"] / 1024, 1),
+        "worker_peak_rss_mb": round(result["worker_peak_rss_kb"] / 1024, 1),
+        "loads": summary.get("LoadCount"),
+        "stage_seconds": {key: summary.get(key) for key in
+                          ("DecodeSeconds", "InflateSeconds", "InspectSeconds", "EncodeSeconds", "UploadSeconds")},
+    }
+
+
+def run_scenario(name, params, repeat, latency_seconds, settings):
+    records = build_records(**params)
+    encoded_bytes = sum(len(r["ZIPFileContent"]) for r in records)
+
+    fd, body_path = tempfile.mkstemp(suffix=".json", prefix=f"bench_{name}_")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"records": records}, f)
+        del records
+
+        with running_stub(latency_seconds) as stub:
+            runs = [run_once(body_path, stub, settings) for _ in range(repeat)]
+    finally:
+        os.remove(body_path)
+
+    def median(key):
+        values = [run[key] for run in runs if run[key] is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        "scenario": name,
+        "params": params,
+        "request_mb": round(encoded_bytes / (1024 * 1024), 2),
+        "median": {key: median(key) for key in (
+            "wall_seconds", "mb_per_second", "files_per_second",
+            "zip_latency_p50_seconds", "zip_latency_p95_seconds", "peak_rss_mb", "worker_peak_rss_mb")},
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), help="Named scenarios (default: all)")
+    parser.add_argument("--zips", type=int, help="Custom scenario: PNLD ZIPs in the batch")
+    parser.add_argument("--members", type=int, default=20, help="Custom scenario: XML members per ZIP")
+    parser.add_argument("--member-kb", type=int, default=16, help="Custom scenario: inflated size of each XML member")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION), default="deflated")
+    parser.add_argument("--level", type=int, help="Custom scenario: compresslevel")
+    parser.add_argument("--decoys", type=int, default=0, help="Custom scenario: non-XML members per ZIP")
+    parser.add_argument("--ooxml", type=int, default=0, help="Custom scenario: OOXML (.docx) decoy ZIPs")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Stub latency per Semarchy load")
+    parser.add_argument("--setting", action="append", default=[], metavar="NAME=VALUE",
+                        help="App Setting passed to the run, e.g. ZipExtractExecutor=thread")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/zip_extract-<time>.json)")
+    args = parser.parse_args()
+
+    settings = dict(setting.split("=", 1) for setting in args.setting)
+
+    if args.zips:
+        scenarios = {"custom": dict(zips=args.zips, members=args.members, member_kb=args.member_kb,
+                                    compression=args.compression, compresslevel=args.level,
+                                    decoys=args.decoys, ooxml=args.ooxml)}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+
+    report = {
+        "benchmark": "zip_extract",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": settings,
+        "stub_latency_ms": args.latency_ms,
+        "results": [],
+    }
+
+    print(f"{'scenario':>14} | {'MB':>7} | {'MB/s':>7} | {'files/s':>8} | {'p50 s':>7} | {'p95 s':>7} | {'peak RSS MB':>11}")
+
+    for name, params in scenarios.items():
+        result = run_scenario(name, params, args.repeat, args.latency_ms / 1000, settings)
+        report["results"].append(result)
+
+        m = result["median"]
+        print(f"{name:>14} | {result['request_mb']:>7.1f} | {m['mb_per_second']:>7.1f} | {m['files_per_second']:>8.1f} | "
+              f"{m['zip_latency_p50_seconds'] or 0:>7.3f} | {m['zip_latency_p95_seconds'] or 0:>7.3f} | "
+              f"{max(m['peak_rss_mb'], m['worker_peak_rss_mb']):>11.1f}")
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"zip_extract-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
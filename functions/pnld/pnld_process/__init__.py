@@ -4,17 +4,122 @@ import logging
 import os
 import requests
 import asyncio
+import functools
 logging.basicConfig(level=logging.DEBUG)
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 
-from pnld_process.utils.file_handling.helpers.xsd_handling import get_xsd
-from pnld_process.utils.define_post_body import pnld_define_post_body, extract_items
+from pnld_process.utils.define_post_body import pnld_define_post_body
+from pnld_process.utils.pnld_results import PnldBatchResult
 from pnld_process.utils.pnld_batch_control import process_pnld_batch, process_pnld_batch_no_rp
 from pnld_process.utils.menu_handling.menu_handling import menu_handling
-from pnld_process.utils.release_package_handling.release_package_handling import get_release_package_id
-from pnld_process.utils.file_handling.duplicate_cjs import detect_duplicate_cjs
+from pnld_process.utils.pnld_bootstrap import start_lookups, resolve_release_package, prepare_batch, discard
+from pnld_process.utils.request_decoding import decode_request_records
+from pnld_process.utils.pnld_journal import open_batch_journal, batch_idempotency_key, LOADED
 from pnld_process.utils.offence_handling.offence_handling import offence_handling
+from pnld_process.utils.telemetry import configure_local_exporter
+
+# Spans and metrics to the console / a file when PnldTelemetryExporter asks for it
+configure_local_exporter()
+
+
+async def file_stage(input_records, rp_task, xsd_task):
+    """
+    Steps 3-4 - Release Package retrieval and file handling (with or without
+    a Release Package). Returns the stage's outputs as the JSON payload the
+    batch journal keeps for a retry.
+    """
+    # Duplicate detection + baseline prefetch need only the records
+    duplicate_records, non_duplicate_records, baselines_task = prepare_batch(input_records, max_concurrency=8)
+
+    # -------------------------------------------------------------
+    # 3. Release Package Retrieval
+    # -------------------------------------------------------------
+    logging.info("RELEASE PACKAGE HANDLING | RETRIEVE | START")
+
+    try:
+        # Created here if none exists - the request has been validated by now
+        rp_id, messages = await resolve_release_package(rp_task)
+    except BaseException:
+        # Neither is awaited on this path; the prefetch is stopped, not left running
+        baselines_task.cancel()
+        discard(xsd_task, baselines_task)
+        raise
+    logging.info(
+        f"RELEASE PACKAGE HANDLING | RETRIEVE | SUCCESS"
+    )
+
+    # -------------------------------------------------------------
+    # 4. File Handling (with or without Release Package)
+    # -------------------------------------------------------------
+    files = {
+        "rp_id": rp_id,
+        "transformed": False,
+        "source_files": [],
+        "messages": messages,
+        "offences": [],
+        "menus": [],
+        "menu_options": [],
+        "duplicate_source_files": [],
+        "duplicate_messages": [],
+    }
+
+    # If no messages at this point, means a successful retrieval of Release Package
+    if not messages:
+        logging.info("FILE HANDLING | START (with_release_package)")
+
+        if non_duplicate_records:
+            # XSD retrieval and baseline prefetch were started during bootstrap
+            logging.info("FILE HANDLING | XSD Retrieval - START")
+            xsd_encoded, baselines = await asyncio.gather(xsd_task, baselines_task)
+            logging.info("FILE HANDLING | XSD Retrieval - SUCCESS")
+
+            # Process XML files
+            logging.info("FILE HANDLING | Batch Processing - START")
+            processed = await process_pnld_batch(
+                non_duplicate_records,
+                xsd_encoded,
+                rp_id,
+                max_concurrency=8,
+                baselines=baselines,
+            )
+            logging.info("FILE HANDLING | Batch Processing - COMPLETE")
+
+            # Structured components, already collated per entity
+            files["transformed"] = True
+            files["source_files"].extend(processed.source_files)
+            files["messages"].extend(processed.messages)
+            files["offences"].extend(processed.offences)
+            files["menus"].extend(processed.menus)
+            files["menu_options"].extend(processed.menu_options)
+
+            logging.info("FILE HANDLING | COMPLETE (with_release_package)")
+
+        else:
+            # Every record is a duplicate - XSD and baselines are not needed
+            discard(xsd_task, baselines_task)
+
+        if duplicate_records:
+            duplicates = PnldBatchResult.collate(duplicate_records)
+            files["duplicate_source_files"] = duplicates.source_files
+            files["duplicate_messages"] = duplicates.messages
+
+    else:
+        # No RP available - run No‑RP workflow
+        logging.info("FILE HANDLING | START (no_release_package)")
+        discard(xsd_task, baselines_task)
+
+        processed = await process_pnld_batch_no_rp(
+            input_records,
+            messages
+        )
+
+        files["source_files"] = processed.source_files
+        files["messages"] = processed.messages
+
+        logging.info("FILE HANDLING | COMPLETE (no_release_package)")
+
+    return files
 
 
 async def main(req: func.HttpRequest) -> func.HttpResponse:
@@ -23,128 +128,128 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
 
     try:
         # -------------------------------------------------------------
-        # 1. Parse Incoming Request
+        # 1. Bootstrap - read-only Release Package + XSD lookups run while
+        #    the request is decoded; each later step waits only on what it needs
         # -------------------------------------------------------------
-        logging.info("REQUEST HANDLING | START")
+        rp_task, xsd_task = start_lookups()
 
-        request_body = req.get_json()
+        # -------------------------------------------------------------
+        # 2. Parse Incoming Request
+        # -------------------------------------------------------------
+        logging.info("REQUEST HANDLING | START")
 
-        if not isinstance(request_body, dict):
+        # Records are read one at a time; each SourceFileContent stays in the
+        # request body until the pipeline picks that file up
+        try:
+            input_records, request_error = await asyncio.to_thread(decode_request_records, req.get_body())
+        except ValueError as e:
+            # Malformed JSON anywhere in the body, SourceFileContent strings included
+            logging.error(f"REQUEST HANDLING | FAILURE (invalid_json: {e})")
+            discard(rp_task, xsd_task)
+            return func.HttpResponse(f"Invalid JSON body: {e}", status_code=400)
+
+        if request_error == "body_is_not_json_object":
             logging.error("REQUEST HANDLING | FAILURE (body_is_not_json_object)")
+            discard(rp_task, xsd_task)
             return func.HttpResponse("Invalid JSON body: expected a JSON object.", status_code=400)
 
-        input_records = request_body.get("records", [])
-        if not isinstance(input_records, list):
+        if request_error == "'records'_not_array":
             logging.error("REQUEST HANDLING | FAILURE ('records'_not_array)")
+            discard(rp_task, xsd_task)
             return func.HttpResponse("Invalid 'records' field: expected an array.", status_code=400)
 
         logging.info(
             f"REQUEST HANDLING | SUCCESS (records_received={len(input_records)})"
         )
 
-        # -------------------------------------------------------------
-        # 2. Release Package Retrieval
-        # -------------------------------------------------------------
-        logging.info("RELEASE PACKAGE HANDLING | RETRIEVE | START")
-
-
-        source_files = []
-        messages = []
-
-        rp_id, messages = get_release_package_id(messages)
-        logging.info(
-            f"RELEASE PACKAGE HANDLING | RETRIEVE | SUCCESS"
+        # A retried batch resumes after the stages it already completed
+        journal = await asyncio.to_thread(
+            open_batch_journal, batch_idempotency_key(req.headers)
         )
-        
-        # -------------------------------------------------------------
-        # 3. File Handling (with or without Release Package)
-        # -------------------------------------------------------------
 
-        # If no messages at this point, means a successful retrieval of Release Package
-        if not messages:
-            logging.info("FILE HANDLING | START (with_release_package)")
-            
-            offences = []
-            menus = []
-            menu_options = []
-
-            # Duplicate detection
-            logging.info("DUPLICATE MANAGEMENT | START")
-            duplicate_records, non_duplicate_records = detect_duplicate_cjs(input_records)
-            logging.info(
-                f"DUPLICATE MANAGEMENT | COMPLETE "
-                f"(duplicates={len(duplicate_records)}, non_duplicates={len(non_duplicate_records)})"
+        if journal.is_complete("post"):
+            logging.info("PNLD PROCESS | COMPLETE (already_submitted)")
+            discard(rp_task, xsd_task)
+            return func.HttpResponse(
+                "PNLD Process already completed for this batch.",
+                status_code=200,
             )
 
-            if non_duplicate_records:
-                # XSD retrieval
-                logging.info("FILE HANDLING | XSD Retrieval - START")
-                xsd_encoded = get_xsd()
-                logging.info("FILE HANDLING | XSD Retrieval - SUCCESS")
-
-                # Process XML files
-                logging.info("FILE HANDLING | Batch Processing - START")
-                processed_records = await process_pnld_batch(
-                    non_duplicate_records,
-                    xsd_encoded,
-                    rp_id,
-                    max_concurrency=8,
-                )
-                logging.info("FILE HANDLING | Batch Processing - COMPLETE")
+        files = journal.payload("files")
+
+        if files is None:
+            files = await file_stage(input_records, rp_task, xsd_task)
+            await asyncio.to_thread(journal.complete, "files", files)
+        else:
+            logging.info("FILE HANDLING | RESUMED (batch_journal)")
+            discard(rp_task, xsd_task)
 
-                # Extract structured components
-                source_files.extend(extract_items(processed_records, 'SourceFile'))
-                messages.extend(extract_items(processed_records, 'SourceFileMessage'))
-                offences.extend(extract_items(processed_records, 'OffenceRevision'))
-                menus.extend(extract_items(processed_records, 'Menu'))
-                menu_options.extend(extract_items(processed_records, 'MenuOptions'))
+        source_files = files["source_files"]
+        messages = files["messages"]
+        offences = files["offences"]
 
-                logging.info("FILE HANDLING | COMPLETE (with_release_package)")
+        # Only a batch whose menu / offence loads all loaded is journalled as posted;
+        # otherwise a retry with the same key runs the failed stages and the post again
+        stages_loaded = True
 
-                # ---------------------------------------------------------
-                # MENU HANDLING
-                # ---------------------------------------------------------
+        if files["transformed"]:
+            # ---------------------------------------------------------
+            # MENU HANDLING
+            # ---------------------------------------------------------
+            menu_stage = journal.payload("menus")
+
+            if menu_stage is None:
                 logging.info("MENU HANDLING | START")
-                source_files, messages, offences = await menu_handling(
-                    menus, menu_options, offences, source_files, messages, rp_id
+                source_files, messages, offences, menu_load = await menu_handling(
+                    files["menus"], files["menu_options"], offences, source_files, messages, files["rp_id"],
+                    resume_load=journal.submitted_load("menus"),
+                    on_submitted=functools.partial(journal.submitted, "menus"),
+                )
+                logging.info(f"MENU HANDLING | COMPLETE (load={menu_load})")
+                stages_loaded = menu_load == LOADED
+                await asyncio.to_thread(journal.record_load, "menus", menu_load, {
+                    "source_files": source_files, "messages": messages, "offences": offences,
+                })
+            else:
+                logging.info("MENU HANDLING | RESUMED (batch_journal)")
+                source_files, messages, offences = (
+                    menu_stage["source_files"], menu_stage["messages"], menu_stage["offences"]
                 )
-                logging.info("MENU HANDLING | COMPLETE")
 
-                # ---------------------------------------------------------
-                # OFFENCE HANDLING
-                # ---------------------------------------------------------
+            # ---------------------------------------------------------
+            # OFFENCE HANDLING
+            # ---------------------------------------------------------
+            offence_stage = journal.payload("offences")
+
+            if offence_stage is None:
                 logging.info("OFFENCE HANDLING | START")
+                offence_load = LOADED
                 if offences:
-                    source_files, messages = offence_handling(
-                        source_files, messages, offences
+                    source_files, messages, offence_load = offence_handling(
+                        source_files, messages, offences,
+                        resume_load=journal.submitted_load("offences"),
+                        on_submitted=functools.partial(journal.submitted, "offences"),
                     )
                 else:
                     logging.info("OFFENCE HANDLING | No Offences")
-                logging.info("OFFENCE HANDLING | COMPLETE")
-
-            # Process duplicates
-            if duplicate_records:
-                logging.info("FILE HANDLING | Duplicate Records - START")
-                source_files.extend(extract_items(duplicate_records, 'SourceFile'))
-                messages.extend(extract_items(duplicate_records, 'SourceFileMessage'))
-                logging.info("FILE HANDLING | Duplicate Records - COMPLETE")
-
-        else:
-            # No RP available - run No‑RP workflow
-            logging.info("FILE HANDLING | START (no_release_package)")
-
-            processed_records = await process_pnld_batch_no_rp(
-                input_records,
-                messages
-            )
-
-            source_files.extend(extract_items(processed_records, 'SourceFile'))
-            messages = extract_items(processed_records, 'SourceFileMessage')
-
-            logging.info("FILE HANDLING | COMPLETE (no_release_package)")
+                logging.info(f"OFFENCE HANDLING | COMPLETE (load={offence_load})")
+                stages_loaded = stages_loaded and offence_load == LOADED
+                await asyncio.to_thread(journal.record_load, "offences", offence_load, {
+                    "source_files": source_files, "messages": messages,
+                })
+            else:
+                logging.info("OFFENCE HANDLING | RESUMED (batch_journal)")
+                source_files, messages = offence_stage["source_files"], offence_stage["messages"]
+
+        # Process duplicates
+        if files["duplicate_source_files"]:
+            logging.info("FILE HANDLING | Duplicate Records - START")
+            source_files.extend(files["duplicate_source_files"])
+            messages.extend(files["duplicate_messages"])
+            logging.info("FILE HANDLING | Duplicate Records - COMPLETE")
 
         # -------------------------------------------------------------
-        # 4. Submit Semarchy POST
+        # 5. Submit Semarchy POST
         # -------------------------------------------------------------
         logging.info("SEMARCHY POST | PREPARE")
 
@@ -175,6 +280,15 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
 
         logging.info(f"SEMARCHY POST | SUCCESS (status={response.status_code})")
 
+        try:
+            load = response.json().get("load", {})
+        except ValueError:
+            load = {}
+        if stages_loaded:
+            await asyncio.to_thread(journal.complete, "post", None, load.get("loadId"), load.get("batchId"))
+        else:
+            logging.warning("PNLD PROCESS | Post not journalled (menu or offence load did not load)")
+
         # -------------------------------------------------------------
         # END — Successful Process
         # -------------------------------------------------------------
@@ -30,17 +30,6 @@ def collate_records(records):
     return result
 
 
-def extract_items(data, key):
-    """
-    Extract and return all values from the array of dicts for the given key.
-    """
-    results = []
-    for item in data:
-        if key in item:
-            results.extend(item[key])
-    return results
-
-
 
 def pnld_define_post_body(source_files, messages):
    
@@ -0,0 +1,56 @@
+import logging
+import asyncio
+
+from pnld_process.utils.file_handling.helpers.pnld_validation import fetch_pnld_baseline
+
+
+def baseline_key(cjs_code, pnld_ref):
+    return (cjs_code, pnld_ref)
+
+
+async def prefetch_baselines(records, max_concurrency=8):
+    """
+    Fetch the Semarchy baseline for every record in the batch up front.
+
+    Uses the CJSCode / PNLDRef captured on the SourceFile at ZIP extraction,
+    so no XML has to be parsed first. Records without both values, and any
+    lookup that fails, are left out - pnld_file_handling then falls back to
+    fetching that baseline itself.
+
+    Returns:
+        dict: {(cjs_code, pnld_ref): baseline_records}
+
+    Logging follows PNLD standard:
+        BASELINE PREFETCH | <step> - <status> (details)
+    """
+
+    # One lookup per distinct CJS Code / PNLD Ref (dict keeps batch order)
+    keys = list(dict.fromkeys(
+        key for key in (baseline_key(item.get("CJSCode"), item.get("PNLDRef")) for item in records)
+        if all(key)
+    ))
+
+    logging.info(
+        f"BASELINE PREFETCH | START (records={len(records)}, lookups={len(keys)})"
+    )
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    baselines = {}
+
+    async def _fetch(key):
+        async with semaphore:
+            try:
+                baselines[key] = await asyncio.to_thread(fetch_pnld_baseline, *key)
+            except Exception as e:
+                logging.warning(
+                    f"BASELINE PREFETCH | Lookup - FAILED "
+                    f"(cjs_code={key[0]}, pnld_ref={key[1]}, error={e})"
+                )
+
+    await asyncio.gather(*(_fetch(key) for key in keys))
+
+    logging.info(
+        f"BASELINE PREFETCH | COMPLETE (fetched={len(baselines)}, failed={len(keys) - len(baselines)})"
+    )
+
+    return baselines
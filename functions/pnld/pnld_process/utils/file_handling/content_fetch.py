@@ -0,0 +1,30 @@
+import os
+import logging
+
+from shared_code.content_fetch import fetch_named_query_content
+
+
+def needs_content_fetch(xml_record):
+    """Claim-check mode: the notification carries the SourceFileID but not the content."""
+    return xml_record.get("SourceFileContent") is None and xml_record.get("SourceFileID") is not None
+
+
+def fetch_file_content(xml_file_id, pool_size=8):
+    """
+    Call the Semarchy Source File Content Named Query (PnldProcessContentQuery,
+    default GetSourceFileContent) and return the Base64 content of one SourceFile.
+    Raises on HTTP errors or when the file is not found.
+    """
+    query = os.getenv("PnldProcessContentQuery", "GetSourceFileContent")
+    content = fetch_named_query_content(query, {"SOURCE_FILE_ID": xml_file_id}, "SourceFileContent", (5, 60), pool_size)
+
+    if content is None:
+        raise LookupError(f"No content returned for SourceFileID {xml_file_id}")
+
+    return content
+
+
+def with_content(xml_record, pool_size=8):
+    """Copy of the record with its content fetched (the notification record is left as it was)."""
+    logging.info(f"FILE HANDLING | Content Fetch - START (file_id={xml_record.get('SourceFileID')})")
+    return {**xml_record, "SourceFileContent": fetch_file_content(xml_record.get("SourceFileID"), pool_size)}
@@ -1,11 +1,12 @@
 import logging
 from collections import Counter
 from pnld_process.utils.message_handling import add_message
+from pnld_process.utils.pnld_results import PnldFileResult
 
 def detect_duplicate_cjs(records):
     """
     Detects duplicate CJS codes and returns:
-      - duplicate_records: records that must be marked Failed
+      - duplicate_records: a Failed PnldFileResult per duplicate record
       - non_duplicates:    records that proceed to normal processing
 
     Logging follows PNLD standard:
@@ -40,12 +41,6 @@ def detect_duplicate_cjs(records):
             f"(file_id={xml_file_id}, cjs_code={cjs_code})"
         )
 
-        source_file = [{
-            "SourceFileID": xml_file_id,
-            "FID_SourceStatus": "Failed",
-            "MessageCount": 1,
-        }]
-
         source_file_message = add_message(
             messages=[],
             file_id=xml_file_id,
@@ -56,12 +51,7 @@ def detect_duplicate_cjs(records):
             resolution='NDST to review Batch'
         )
 
-        duplicate_output = {
-            "SourceFile": source_file,
-            "SourceFileMessage": source_file_message,
-        }
-
-        duplicate_records.append(duplicate_output)
+        duplicate_records.append(PnldFileResult.failed(xml_file_id, source_file_message))
 
     logging.info(
         f"DUPLICATE MANAGEMENT | COMPLETE "
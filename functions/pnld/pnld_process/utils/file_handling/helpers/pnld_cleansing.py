@@ -1,6 +1,7 @@
 import re
 import math
 import json
+import functools
 from pnld_process.utils.message_handling import add_message
 
 # ---------- Validation helpers ----------
@@ -163,13 +164,64 @@ def cleanse_text(
 
     return updated_text, messages, match_count
 
+# ---------- Config ----------
+
+CLEANSE_CONFIG = 'config/cleanse_pnld.json'
+
+
+@functools.lru_cache(maxsize=None)
+def load_cleanse_rules(config_location):
+    """Cleanse rules, read once per process and path. Callers must not mutate them."""
+    with open(config_location, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_cleanse_rules(config_location, regex_flags=0):
+    """
+    Cleanse rules in SortOrder, each as (rule_id, human_message, pattern,
+    group_index, replace_val, scope_cols) with its regex compiled and its
+    replacement group validated - once per process, path and flags.
+    Raises ValueError for an invalid pattern or group (not cached).
+    """
+    compiled = []
+
+    # Sort by SortOrder so the chained effect respects rule order
+    for rule in sorted(load_cleanse_rules(config_location), key=lambda r: r.get("SortOrder", 0)):
+        rule_id     = rule["RuleID"]
+        group_index = rule["RegexReplacementGroupIndex"]
+
+        # Compile regex with proper error handling
+        try:
+            pattern = re.compile(rule["DetectionRegex"], flags=regex_flags)
+        except re.error as ex:
+            raise ValueError(f'Invalid Regex Pattern within Config for Rule {rule_id} - {ex}')
+
+        # Validate group availability
+        try:
+            validate_regex(pattern, group_index, pattern_id=rule_id)
+        except (ValueError, TypeError) as ex:
+            raise ValueError(f'Invalid Regex Group Configuration for Rule {rule_id} - {ex}')
+
+        compiled.append((
+            rule_id,
+            rule["HumanReadableText"],
+            pattern,
+            group_index,
+            rule.get("ReplaceValue", ""),
+            tuple(rule.get("Scope", [])),
+        ))
+
+    return tuple(compiled)
+
+
 # ---------- Orchestrator: apply a list of rules to a RECORD DICT (with chaining) ----------
 
 def cleanse_record(
     record,
     xml_file_id,
     *,
-    config_location='config/cleanse_pnld.json',
+    config_location=CLEANSE_CONFIG,
     regex_flags=0,   # e.g., re.MULTILINE | re.IGNORECASE
     context_chars=10
 ):
@@ -184,34 +236,12 @@ def cleanse_record(
     if not isinstance(record, dict):
         raise TypeError("record must be a dict representing a single record, e.g., {'col1': 'value'}")
     
-    # Load in Detection Config
-    with open(config_location, "r", encoding="utf-8") as f:
-        rules = json.load(f)
+    # Load in Detection Config (read, sorted and compiled once per process)
+    rules = compile_cleanse_rules(config_location, regex_flags)
 
     messages = []
 
-    # Sort by SortOrder so the chained effect respects rule order
-    rules_sorted = sorted(rules, key=lambda r: r.get("SortOrder", 0))
-
-    for rule in rules_sorted:
-        rule_id         = rule["RuleID"]
-        human_message   = rule["HumanReadableText"]
-        pattern_str     = rule["DetectionRegex"]
-        group_index     = rule["RegexReplacementGroupIndex"]
-        replace_val     = rule.get("ReplaceValue", "")
-        scope_cols      = rule.get("Scope", [])
-
-        # Compile regex with proper error handling
-        try:
-            pattern = re.compile(pattern_str, flags=regex_flags)
-        except re.error as ex:
-            raise ValueError(f'Invalid Regex Pattern within Config for Rule {rule_id} - {ex}')
-
-        # Validate group availability
-        try:
-            validate_regex(pattern, group_index, pattern_id=rule_id)
-        except (ValueError, TypeError) as ex:
-            raise ValueError(f'Invalid Regex Group Configuration for Rule {rule_id} - {ex}')
+    for rule_id, human_message, pattern, group_index, replace_val, scope_cols in rules:
 
         # Apply to each scoped key with chaining
         for key in scope_cols:
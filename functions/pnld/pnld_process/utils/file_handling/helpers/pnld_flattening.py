@@ -2,6 +2,8 @@ from lxml import etree
 import os
 import json
 import hashlib
+import functools
+import threading
 
 
 def calculate_hash(record, exclude_keys):
@@ -31,8 +33,48 @@ def calculate_hash(record, exclude_keys):
 
 
 
+FLATTEN_CONFIG = "config/flatten_pnld.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_flatten_config(config_path):
+    """Flatten config, read once per process and path. Callers must not mutate it."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Compiled XPaths, one set per thread (as for the XSD schema in xsd_handling)
+_per_thread = threading.local()
+
+
+def compiled_flatten_xpaths(config_path):
+    """
+    [(parent XPath, [(column, XPath), ...]), ...] for the flatten config,
+    compiled once per thread and config path rather than on every file.
+    Parents without an element_path or columns are left out.
+    """
+    compiled = getattr(_per_thread, "xpaths", None)
+    if compiled is None:
+        compiled = _per_thread.xpaths = {}
+
+    parents = compiled.get(config_path)
+    if parents is None:
+        config = load_flatten_config(config_path)
+        namespaces = config.get("namespaces")
+        parents = compiled[config_path] = [
+            (
+                etree.XPath(parent_cfg["element_path"], namespaces=namespaces),
+                [(col_name, etree.XPath(rel_xpath, namespaces=namespaces))
+                 for col_name, rel_xpath in parent_cfg["columns"].items()],
+            )
+            for parent_cfg in config.get("parents", [])
+            if parent_cfg.get("element_path") and parent_cfg.get("columns")
+        ]
+    return parents
+
+
 def flatten_pnld(xml,
-                config_location="config/flatten_pnld.json"):
+                config_location=FLATTEN_CONFIG):
     """
     Flatten XML into a single record by merging data from multiple parent paths.
     If a field in the config is missing in the XML, assign None.
@@ -40,14 +82,11 @@ def flatten_pnld(xml,
     join_delimiter="; "
     multivalue_strategy="first"
 
-    # Load Config file
+    # Load Config file (read once per process, XPaths compiled once per thread)
     config_path = os.path.join(os.getcwd(), config_location)
-
-    with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
+    config = load_flatten_config(config_path)
 
     parents = config.get("parents", [])
-    namespaces = config.get("namespaces")
 
     if not parents:
         raise ValueError("Config must include 'parents' list with element_path and columns.")
@@ -59,21 +98,16 @@ def flatten_pnld(xml,
             record[col_name] = None
 
     # Populate values from XML
-    for parent_cfg in parents:
-        element_path = parent_cfg.get("element_path")
-        columns = parent_cfg.get("columns", {})
-
-        if not element_path or not columns:
-            continue
+    for element_xpath, columns in compiled_flatten_xpaths(config_path):
 
-        row_elements = xml.xpath(element_path, namespaces=namespaces)
+        row_elements = element_xpath(xml)
         elem = row_elements[0] if row_elements else None
 
-        for col_name, rel_xpath in columns.items():
+        for col_name, column_xpath in columns:
             if elem is None:
                 continue  # Keep None if element not found
 
-            result = elem.xpath(rel_xpath, namespaces=namespaces)
+            result = column_xpath(elem)
 
             normalized = []
             for item in result:
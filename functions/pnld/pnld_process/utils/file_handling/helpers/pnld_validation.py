@@ -201,6 +201,24 @@ def compute_md5_hash(record, exclude_keys):
 
 
 
+def fetch_pnld_baseline(cjs_code, pnld_ref):
+    """
+    Call the Semarchy Baseline Named Query (GetOffenceRevisionPNLD) and
+    return the existing OffenceRevision records for the CJS Code / PNLD Ref.
+    """
+    baseline_url = (
+        f'{os.getenv("SemarchyBaseURL")}/named-query/CSDS/GetOffenceRevisionPNLD/GD'
+        f'?CJS_CODE={cjs_code}&PNLD_REF={pnld_ref}'
+    )
+    headers = {"API-Key": os.getenv("SemarchyAPIKey")}
+
+    response = requests.get(baseline_url, headers=headers, timeout=10)
+    response.raise_for_status()
+
+    body = response.json()
+    return body.get("records", [])
+
+
 def validate_pnld(
     pnld_ref,
     cjs_code,
@@ -209,13 +227,15 @@ def validate_pnld(
     last_update,
     title,
     md5_hash,
-    xml_file_id
+    xml_file_id,
+    baseline_records=None
 ):
     """
     Validate PNLD baseline data against provided XML values.
 
     - Performs date consistency checks.
-    - Calls the Semarchy Baseline Named Query to fetch existing records.
+    - Calls the Semarchy Baseline Named Query to fetch existing records,
+      unless `baseline_records` were already prefetched for this file.
     - Determines ingestion type (NEW / UPDATE-<version> / INVALID).
     - Returns: (messages, ingestion_type)
     """
@@ -275,17 +295,8 @@ def validate_pnld(
     # ----------------------------------------------------------------------
     # Fetch baseline
     # ----------------------------------------------------------------------
-    baseline_url = (
-        f'{os.getenv("SemarchyBaseURL")}/named-query/CSDS/GetOffenceRevisionPNLD/GD'
-        f'?CJS_CODE={cjs_code}&PNLD_REF={pnld_ref}'
-    )
-    headers = {"API-Key": os.getenv("SemarchyAPIKey")}
-
-    response = requests.get(baseline_url, headers=headers, timeout=10)
-    response.raise_for_status()
-
-    body = response.json()
-    baseline_records = body.get("records", [])
+    if baseline_records is None:
+        baseline_records = fetch_pnld_baseline(cjs_code, pnld_ref)
 
     # ----------------------------------------------------------------------
     # Baseline relational validation
@@ -3,9 +3,28 @@ import re
 import hashlib
 
 
+# --- Split type detection configuration ---
+# Example:
+# [
+#   {"Type": "Alpha", "Regex": "^[A-Z]+$", "SortOrder": 1},
+#   {"Type": "Numeric", "Regex": "^[0-9]+$", "SortOrder": 2}
+# ]
+SPLIT_TYPE_CONFIG = [
+    {"Type": "Menu", "Regex": r"\([A-Za-z0-9]+\)\_\[", "SortOrder": 1},
+    {"Type": "Terminal Entry", "Regex": r"\*\*\(\.\.SPECIFY [A-Za-z0-9\s]+\.\.\)", "SortOrder": 2},
+    {"Type": "Text", "Regex": r".+?", "SortOrder": 3}
+]
+
+# --- Sorted so lower SortOrder (higher priority) runs first, compiled once per process ---
+_SPLIT_TYPE_RULES = [
+    (r["Type"], re.compile(r["Regex"], flags=re.DOTALL))
+    for r in sorted(SPLIT_TYPE_CONFIG, key=lambda r: r.get("SortOrder", 0))
+]
+
+
 def detect_split_type(text):
     """
-    Returns the 'Type' for the first matching rule in config.
+    Returns the 'Type' for the first matching rule in SPLIT_TYPE_CONFIG.
 
     Parameters
     ----------
@@ -17,31 +36,10 @@ def detect_split_type(text):
     str or None
         The 'Type' of the first matched rule, or None if no match is found.
     """
-    # --- Load detection configuration ---
-    # Example:
-    # [
-    #   {"Type": "Alpha", "Regex": "^[A-Z]+$", "SortOrder": 1},
-    #   {"Type": "Numeric", "Regex": "^[0-9]+$", "SortOrder": 2}
-    # ]
-    config = [
-        {"Type": "Menu", "Regex": r"\([A-Za-z0-9]+\)\_\[", "SortOrder": 1},
-        {"Type": "Terminal Entry", "Regex": r"\*\*\(\.\.SPECIFY [A-Za-z0-9\s]+\.\.\)", "SortOrder": 2},
-        {"Type": "Text", "Regex": r".+?", "SortOrder": 3}
-    ]
-
-    # --- Sort rules so lower SortOrder (higher priority) runs first ---
-    rules = sorted(config, key=lambda r: r.get("SortOrder", 0))
-
-    # --- Compile regex patterns once for efficiency ---
-    compiled = [
-        {"Type": r["Type"], "Pattern": re.compile(r["Regex"], flags=re.DOTALL)}
-        for r in rules
-    ]
-
     # --- Evaluate the text against each rule in priority order ---
-    for r in compiled:
-        if r["Pattern"].search(text or ""):
-            return r["Type"]
+    for split_type, pattern in _SPLIT_TYPE_RULES:
+        if pattern.search(text or ""):
+            return split_type
 
     # --- No rule matched ---
     return None
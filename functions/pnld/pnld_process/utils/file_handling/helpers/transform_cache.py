@@ -0,0 +1,242 @@
+import os
+import json
+import stat
+import hashlib
+import logging
+import tempfile
+import threading
+import functools
+
+from pnld_process.utils.pnld_settings import (
+    TRANSFORM_CACHE_BACKEND,
+    TRANSFORM_CACHE_DIR,
+    TRANSFORM_CACHE_MAX_BYTES,
+)
+from pnld_process.utils.file_handling.helpers.pnld_flattening import FLATTEN_CONFIG
+from pnld_process.utils.file_handling.helpers.pnld_cleansing import CLEANSE_CONFIG
+from pnld_process.utils.telemetry import record_transform_cache
+
+# Bump when parse_pnld_file / apply_transforms change what a cached entry holds
+CACHE_FORMAT = 3
+
+# Code that produces a cached entry: file_handling (helpers included) and the
+# message builder. Its source is part of the ruleset version, so a deployment
+# that changes a transform does not serve entries the old code computed.
+_FILE_HANDLING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CODE_PATHS = (
+    _FILE_HANDLING_DIR,
+    os.path.join(os.path.dirname(_FILE_HANDLING_DIR), "message_handling.py"),
+)
+
+# Eviction brings the cache back under this share of its size, so it does not run on every store
+_EVICT_TO = 0.9
+
+
+class DiskLruCache:
+    """
+    JSON values in one file each under `directory`, bounded to `max_bytes`.
+
+    A read touches the file's mtime, so eviction (oldest mtime first) is least
+    recently used. Writes go to a temporary file that is renamed into place,
+    so several processes can share the directory; the size is tracked per
+    process and corrected by the directory scan each eviction makes.
+
+    Entries are plain JSON (never pickle), so a file planted in the directory
+    can at worst be a wrong entry, not code. The directory is created private
+    (0o700) and the cache is not used when it is owned by another user or
+    writable by others.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self._usable = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _directory_usable(self):
+        """Create the directory (private) once and check nobody else can write to it."""
+        if self._usable is None:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            info = os.stat(self.directory)
+            owned = not hasattr(os, "getuid") or info.st_uid == os.getuid()
+            self._usable = owned and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+            if not self._usable:
+                logging.warning(
+                    f"TRANSFORM CACHE | Directory not private - cache disabled "
+                    f"(dir={self.directory}, mode={oct(info.st_mode & 0o777)}, uid={info.st_uid})"
+                )
+        return self._usable
+
+    def get(self, name):
+        """Cached value, or None."""
+        if not self._directory_usable():
+            return None
+
+        path = self._path(name)
+        try:
+            with open(path, "rb") as f:
+                value = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated or unreadable entry - drop it and recompute
+            logging.warning(f"TRANSFORM CACHE | Read - FAILED ({name}: {e})")
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted meanwhile
+        return value
+
+    def put(self, name, value):
+        if not self._directory_usable():
+            return
+
+        data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += len(data)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """([(mtime, size, path), ...], total size) of the cached entries."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        entries, total = self._scan()
+        target = self.max_bytes * _EVICT_TO
+        evicted = 0
+
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                evicted += 1
+
+        self._size = total
+        logging.info(f"TRANSFORM CACHE | Eviction - COMPLETE (evicted={evicted}, bytes={total})")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+def _code_files(paths=_CODE_PATHS):
+    """The .py files under `paths`, in a stable order."""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+    return files
+
+
+@functools.lru_cache(maxsize=None)
+def ruleset_version(flatten_config=FLATTEN_CONFIG, cleanse_config=CLEANSE_CONFIG):
+    """
+    Digest of the flatten config, cleanse rules, cache format and the source
+    of the code that produces a cached entry (see _CODE_PATHS).
+    """
+    digest = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    for path in (flatten_config, cleanse_config, *_code_files()):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def transform_cache_key(xml_bytes, xsd_digest):
+    """Key of one file's cached outputs: decoded XML, XSD and ruleset version."""
+    return hashlib.sha256(
+        f"{hashlib.sha256(xml_bytes).hexdigest()}:{xsd_digest}:{ruleset_version()}".encode()
+    ).hexdigest()
+
+
+def _build_cache():
+    if TRANSFORM_CACHE_BACKEND == "off":
+        return None
+    if TRANSFORM_CACHE_BACKEND != "disk":
+        logging.warning(f"TRANSFORM CACHE | Unknown backend '{TRANSFORM_CACHE_BACKEND}' - using 'disk'")
+    return DiskLruCache(TRANSFORM_CACHE_DIR, TRANSFORM_CACHE_MAX_BYTES)
+
+
+# One cache per worker process (entries are shared through the directory)
+transform_cache = _build_cache()
+
+
+def transform_cache_enabled():
+    return transform_cache is not None
+
+
+def cache_lookup(stage, key):
+    """Cached output of `stage` ('parse' or 'transform') for `key`, or None."""
+    if transform_cache is None or key is None:
+        return None
+
+    try:
+        value = transform_cache.get(f"{stage}-{key}")
+    except OSError as e:
+        logging.warning(f"TRANSFORM CACHE | {stage.capitalize()} Lookup - FAILED ({e})")
+        value = None
+
+    record_transform_cache(stage, "hit" if value is not None else "miss")
+    return value
+
+
+def cache_store(stage, key, value):
+    """Store the output of `stage` for `key`; a failed write only costs the next lookup."""
+    if transform_cache is None or key is None:
+        return
+
+    try:
+        transform_cache.put(f"{stage}-{key}", value)
+    except Exception as e:
+        logging.warning(f"TRANSFORM CACHE | {stage.capitalize()} Store - FAILED ({e})")
+
+
+def restamp_messages(messages, xml_file_id):
+    """Cached messages, re-addressed to the file being processed now."""
+    for message in messages:
+        message["FID_SourceFile"] = xml_file_id
+    return messages
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from pnld_process.utils.file_handling.helpers.xsd_handling import get_xsd, xsd_digest
+from pnld_process.utils.pnld_settings import XSD_CACHE_SECONDS, XSD_MAX_STALE_SECONDS
+from pnld_process.utils.telemetry import record_xsd_fetch, record_xsd_age
+
+
+@dataclass(frozen=True)
+class XsdEntry:
+    """The PNLD XSD as last fetched, identified by the SHA-256 of its Base64 content."""
+    xsd_encoded: str
+    digest: str
+    etag: str = None
+    fetched_at: float = 0.0  # time.monotonic() of the last successful fetch or revalidation
+
+    @property
+    def age_seconds(self):
+        return time.monotonic() - self.fetched_at
+
+
+class XsdCache:
+    """
+    Module-level XSD cache for warm instances.
+
+    - Within `ttl_seconds` the cached XSD is returned without any call.
+    - Up to `max_stale_seconds` it is still returned, and one background
+      refresh is started.
+    - Beyond that (or on a cold instance) the caller fetches it, and
+      concurrent callers wait for that one fetch.
+
+    Refreshes revalidate: the ETag (if Semarchy sent one) goes out as
+    If-None-Match, and a body with the same digest keeps the existing
+    entry's content, so compiled schemas keyed by digest stay valid.
+    """
+
+    def __init__(self, fetch=get_xsd, ttl_seconds=XSD_CACHE_SECONDS, max_stale_seconds=XSD_MAX_STALE_SECONDS):
+        self._fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max(max_stale_seconds, ttl_seconds)
+        self._entry = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        """Current XsdEntry. Raises if no usable copy exists and the fetch fails."""
+        entry = self._entry
+
+        if entry is not None and entry.age_seconds <= self.ttl_seconds:
+            record_xsd_age(entry.age_seconds, 'hit')
+            return entry
+
+        if entry is not None and entry.age_seconds <= self.max_stale_seconds:
+            self._refresh_in_background()
+            record_xsd_age(entry.age_seconds, 'stale')
+            return entry
+
+        with self._fetch_lock:
+            # Another caller may have fetched it while this one waited
+            entry = self._entry
+            if entry is None or entry.age_seconds > self.ttl_seconds:
+                entry = self._refresh()
+
+        record_xsd_age(entry.age_seconds, 'fetched')
+        return entry
+
+    def get_xsd(self):
+        """Base64 XSD, as get_xsd used to return it."""
+        return self.get().xsd_encoded
+
+    def _refresh(self):
+        current = self._entry
+        started = time.perf_counter()
+
+        try:
+            xsd_encoded, etag = self._fetch(etag=current.etag if current else None)
+        except Exception:
+            record_xsd_fetch(time.perf_counter() - started, 'failed')
+            raise
+
+        seconds = time.perf_counter() - started
+
+        if xsd_encoded is None and current is not None:
+            outcome = 'not_modified'
+            entry = replace(current, fetched_at=time.monotonic())
+        else:
+            if not xsd_encoded:
+                raise ValueError("ExportSourceXSD returned no XSDFileContent")
+
+            digest = xsd_digest(xsd_encoded)
+            if current is not None and current.digest == digest:
+                outcome = 'unchanged'
+                entry = replace(current, etag=etag, fetched_at=time.monotonic())
+            else:
+                outcome = 'changed'
+                entry = XsdEntry(xsd_encoded, digest, etag, time.monotonic())
+
+        record_xsd_fetch(seconds, outcome)
+        self._entry = entry
+        return entry
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                with self._fetch_lock:
+                    if self._entry is None or self._entry.age_seconds > self.ttl_seconds:
+                        self._refresh()
+            except Exception as e:
+                # The stale copy stays in use until max_stale_seconds
+                logging.warning(f"XSD CACHE | Background Refresh - FAILED ({e})")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name='xsd_refresh', daemon=True).start()
+
+
+# One cache per worker process
+xsd_cache = XsdCache()
+
+
+def get_cached_xsd():
+    """Base64 XSD from the worker's cache (see XsdCache)."""
+    return xsd_cache.get_xsd()
@@ -1,27 +1,87 @@
 from lxml import etree
 import base64
+import hashlib
+import threading
 import requests
 import os
 from pnld_process.utils.message_handling import add_message
+from pnld_process.utils.pnld_settings import XSD_FETCH_TIMEOUT_SECONDS
 
-def get_xsd():
+def get_xsd(etag=None, timeout=XSD_FETCH_TIMEOUT_SECONDS):
+    """
+    Call the Semarchy ExportSourceXSD Named Query.
+
+    Returns (xsd_encoded, etag). When `etag` is given it is sent as
+    If-None-Match; a 304 answer returns (None, etag) - the caller's copy is
+    still current.
+    """
 
     xsd_get_url = f'{os.getenv("SemarchyBaseURL")}/named-query/CSDS/ExportSourceXSD/GD'
     api_key = os.getenv('SemarchyAPIKey')
     get_headers = {'API-Key': api_key}
+    if etag:
+        get_headers['If-None-Match'] = etag
+
+    response = requests.get(url=xsd_get_url, headers=get_headers, timeout=(5, timeout))
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
 
-    # Make the GET request with Basic Authentication
-    response = requests.get(url=xsd_get_url, headers=get_headers)
     api_body = response.json()
 
     xsd_details = api_body.get('records', [])[0]
     xsd_encoded = xsd_details.get('XSDFileContent')
 
-    return xsd_encoded
+    return xsd_encoded, response.headers.get('ETag')
 
-from lxml import etree
+# Compiled schema and parser, one of each per thread: lxml parsers must not be
+# shared between threads, and an XMLSchema keeps its error_log on the instance
+_per_thread = threading.local()
+
+
+def xsd_digest(xsd_encoded):
+    """SHA-256 of the Base64 XSD - identifies a schema version across caches and processes."""
+    return hashlib.sha256(xsd_encoded.encode("ascii")).hexdigest()
+
+
+def thread_xsd_digest(xsd_encoded):
+    """xsd_digest, hashed once per thread for the same `xsd_encoded` object."""
+    memo = getattr(_per_thread, "digest", None)
+    if memo is None or memo[0] is not xsd_encoded:
+        memo = _per_thread.digest = (xsd_encoded, xsd_digest(xsd_encoded))
+    return memo[1]
+
+
+def get_compiled_schema(xsd_encoded):
+    """
+    XMLSchema for the Base64 XSD, compiled once per thread and XSD digest.
+
+    The same `xsd_encoded` object (as handed out by the XSD cache) is
+    recognised without hashing; a different object with the same SHA-256
+    reuses the compiled schema too. Raises XMLSyntaxError /
+    XMLSchemaParseError for an invalid XSD, which is not cached.
+    """
+    cached = getattr(_per_thread, "schema", None)
+
+    if cached is not None and cached[0] is xsd_encoded:
+        return cached[2]
+
+    digest = xsd_digest(xsd_encoded)
+    if cached is not None and cached[1] == digest:
+        _per_thread.schema = (xsd_encoded, digest, cached[2])
+        return cached[2]
+
+    schema = etree.XMLSchema(etree.XML(base64.b64decode(xsd_encoded)))
+    _per_thread.schema = (xsd_encoded, digest, schema)
+    return schema
 
 
+def get_xml_parser():
+    """This thread's PNLD XML parser (ns_clean, remove_blank_text)."""
+    parser = getattr(_per_thread, "parser", None)
+    if parser is None:
+        parser = _per_thread.parser = etree.XMLParser(ns_clean=True, remove_blank_text=True)
+    return parser
 
 
 def pnld_xsd_validation(xml_encoded, xsd_encoded, xml_file_id):
@@ -35,14 +95,12 @@ def pnld_xsd_validation(xml_encoded, xsd_encoded, xml_file_id):
     messages = []
     valid_flag = False
 
-    # Decode the Base64 XSD file
-    xsd_bytes = base64.b64decode(xsd_encoded)
-    xml_bytes = base64.b64decode(xml_encoded)
+    # Decode the Base64 XML file (unless the caller already has)
+    xml_bytes = xml_encoded if isinstance(xml_encoded, bytes) else base64.b64decode(xml_encoded)
 
-    # 1) Parse XSD safely
+    # 1) Compiled XSD (cached per thread and digest)
     try:
-        xsd_doc = etree.XML(xsd_bytes)  # parse XSD bytes into an Element
-        schema = etree.XMLSchema(xsd_doc)
+        schema = get_compiled_schema(xsd_encoded)
     except (etree.XMLSyntaxError, etree.XMLSchemaParseError) as e:
         messages = add_message(
                     messages=messages,
@@ -57,8 +115,7 @@ def pnld_xsd_validation(xml_encoded, xsd_encoded, xml_file_id):
 
     # 2) Parse XML safely
     try:
-        parser = etree.XMLParser(ns_clean=True, remove_blank_text=True)
-        xml_root = etree.fromstring(xml_bytes, parser)
+        xml_root = etree.fromstring(xml_bytes, get_xml_parser())
         xml_tree = etree.ElementTree(xml_root)  # validate the full document
     except etree.XMLSyntaxError as e:
         # XML is not even well-formed; capture all syntax errors
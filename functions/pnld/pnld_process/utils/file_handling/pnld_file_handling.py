@@ -1,10 +1,11 @@
 import logging
 import html
+import base64
 import traceback
 from datetime import datetime
 from lxml import etree
 
-from pnld_process.utils.file_handling.helpers.xsd_handling import pnld_xsd_validation
+from pnld_process.utils.file_handling.helpers.xsd_handling import pnld_xsd_validation, thread_xsd_digest
 from pnld_process.utils.file_handling.helpers.pnld_flattening import flatten_pnld
 from pnld_process.utils.file_handling.helpers.pnld_cleansing import cleanse_record
 from pnld_process.utils.file_handling.helpers.pnld_validation import (
@@ -16,7 +17,17 @@ from pnld_process.utils.file_handling.helpers.sow_sof_transform.pnld_transform i
     extract_terminal_entries,
 )
 from pnld_process.utils.file_handling.helpers.pnld_define_offence import define_offence
+from pnld_process.utils.file_handling.baseline_prefetch import baseline_key
+from pnld_process.utils.file_handling.helpers.transform_cache import (
+    transform_cache_enabled,
+    transform_cache_key,
+    cache_lookup,
+    cache_store,
+    restamp_messages,
+)
 from pnld_process.utils.message_handling import add_message
+from pnld_process.utils.pnld_results import PnldFileResult
+from pnld_process.utils.telemetry import FileStages
 
 from pnld_process.utils.file_handling.helpers.pnld_collate_terminal_entries import (
     keep_lowest_entry_per_md5,
@@ -43,6 +54,25 @@ def log(ctx, message):
     logging.info(f"FILE HANDLING | {ctx} | {message}")
 
 
+def content_size(xml_raw):
+    """Decoded size in bytes of SourceFileContent (Base64 text is sized without decoding it)."""
+    if not xml_raw:
+        return 0
+    if isinstance(xml_raw, (bytes, bytearray)):
+        return len(xml_raw)
+    return len(xml_raw) * 3 // 4 - xml_raw[-2:].count("=")
+
+
+def finish_stages(stages, result):
+    """Attach the file's stage timings, with its outcome, to its PnldFileResult."""
+    stages.set(
+        pnld_outcome=result.source_file.get("FID_SourceStatus", "Success"),
+        pnld_messages=len(result.messages),
+    )
+    result.stages = stages
+    return result
+
+
 def unique_dicts(dict_list):
     """Remove duplicate dicts while preserving order."""
     seen = set()
@@ -73,13 +103,38 @@ def format_terminal_entries(terminal_entries):
     return formatted
 
 
+
+def unexpected_failure(ctx, xml_file_id, messages):
+    """Failed result for an exception raised while processing a file (call from an except block)."""
+    logging.exception(f"FILE HANDLING | {ctx} | UNHANDLED EXCEPTION")
+
+    messages = add_message(
+        messages,
+        file_id=xml_file_id,
+        code="ER-SUPP-UNEXPECTED-001",
+        msg_type="ERROR",
+        issue="Unexpected error when transforming file",
+        cause=traceback.format_exc(),
+        resolution="CONTACT SUPPORT TEAM",
+    )
+
+    return PnldFileResult.failed(xml_file_id, messages)
+
+
 # ----------------------------------------------------------------------
-# Main Pipeline
+# Pipeline stages
 # ----------------------------------------------------------------------
-def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
+def parse_pnld_file(xml_record, xsd_encoded, progress_tag):
     """
-    Orchestrates the full PNLD pipeline for a single XML file.
-    See original function docstring for full contract.
+    Stage 1 (CPU) - XSD validation, flattening and baseline parsing.
+
+    Returns (result, None) when the file is already finished (failed XSD
+    validation or an unexpected error), otherwise (None, state): a plain,
+    picklable dict carried to the baseline lookup and transform_pnld_file.
+
+    With the transformation cache on, a file whose decoded XML was already
+    validated and flattened against the same XSD and ruleset is not
+    validated or flattened again.
     """
 
     xml_file_id = xml_record.get("SourceFileID")
@@ -92,37 +147,51 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
     log(ctx, "File Received - START")
 
     messages = []
+    stages = FileStages(pnld_file_id=xml_file_id, pnld_batch_id=batch_id, pnld_file_bytes=content_size(xml_raw))
 
     try:
-        # --------------------------------------------------------------
-        # STEP 1 — XSD VALIDATION
-        # --------------------------------------------------------------
-        log(ctx, "XSD Validation - START")
-        xsd_messages, xml_doc = pnld_xsd_validation(xml_raw, xsd_encoded, xml_file_id)
-        messages.extend(xsd_messages)
-
-        if xsd_messages:
-            log(ctx, f"XSD Validation - FAILED (errors={len(xsd_messages)})")
-            return {
-                "SourceFile": [{
-                    "SourceFileID": xml_file_id,
-                    "FID_SourceStatus": "Failed",
-                    "MessageCount": len(messages)
-                }],
-                "SourceFileMessage": messages,
-                "OffenceRevision": [],
-                "Menu": [],
-                "MenuOptions": [],
-            }
-
-        log(ctx, "XSD Validation - SUCCESS")
-
-        # --------------------------------------------------------------
-        # STEP 2 — FLATTEN XML → DICT
-        # --------------------------------------------------------------
-        log(ctx, "XML Flattening - START")
-        record = flatten_pnld(xml_doc)
-        log(ctx, "XML Flattening - SUCCESS")
+        cache_key = None
+        record = None
+
+        if transform_cache_enabled():
+            # Decoded once here: the digest keys the cache, validation takes the bytes
+            xml_raw = base64.b64decode(xml_raw)
+            cache_key = transform_cache_key(xml_raw, thread_xsd_digest(xsd_encoded))
+            record = cache_lookup("parse", cache_key)
+
+        stages.set(pnld_parse_cached=record is not None)
+
+        if record is not None:
+            log(ctx, "XSD Validation + XML Flattening - CACHED")
+        else:
+            # --------------------------------------------------------------
+            # STEP 1 — XSD VALIDATION
+            # --------------------------------------------------------------
+            log(ctx, "XSD Validation - START")
+            with stages.stage("xsd_validation") as span:
+                xsd_messages, xml_doc = pnld_xsd_validation(xml_raw, xsd_encoded, xml_file_id)
+                span["pnld.errors"] = len(xsd_messages)
+                if xsd_messages:
+                    span["pnld.outcome"] = "failed"
+
+            messages.extend(xsd_messages)
+
+            if xsd_messages:
+                log(ctx, f"XSD Validation - FAILED (errors={len(xsd_messages)})")
+                return finish_stages(stages, PnldFileResult.failed(xml_file_id, messages)), None
+
+            log(ctx, "XSD Validation - SUCCESS")
+
+            # --------------------------------------------------------------
+            # STEP 2 — FLATTEN XML → DICT
+            # --------------------------------------------------------------
+            log(ctx, "XML Flattening - START")
+            with stages.stage("flattening") as span:
+                record = flatten_pnld(xml_doc)
+                span["pnld.populated_columns"] = sum(1 for value in record.values() if value is not None)
+            log(ctx, "XML Flattening - SUCCESS")
+
+            cache_store("parse", cache_key, record)
 
         # --------------------------------------------------------------
         # STEP 3 — BASELINE PARSING
@@ -135,73 +204,65 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
         end_date = safe_date(record["offenceenddate"])
         last_update = safe_date(record["dateoflastupdate"])
 
-        # --------------------------------------------------------------
-        # STEP 4 — INGESTION VALIDATION
-        # --------------------------------------------------------------
-        log(ctx, "Ingestion Validation - START")
-
-        md5_hash = compute_md5_hash(
-            record, ["offenceenddate", "dateoflastupdate", "sow_raw", "sof_raw"]
-        )
-        record["md5_hash"] = md5_hash
-
-        ingestion_msgs, ingestion_type = validate_pnld(
-            pnld_ref, cjs_code, start_date, end_date, last_update,
-            title, md5_hash, xml_file_id
-        )
-
-        messages.extend(ingestion_msgs)
+        return None, {
+            "xml_file_id": xml_file_id,
+            "uploaded_by": uploaded_by,
+            "ctx": ctx,
+            "messages": messages,
+            "record": record,
+            "pnld_ref": pnld_ref,
+            "cjs_code": cjs_code,
+            "title": title,
+            "start_date": start_date,
+            "end_date": end_date,
+            "last_update": last_update,
+            "cache_key": cache_key,
+            "stages": stages,
+        }
 
-        if ingestion_msgs:
-            log(ctx, f"Ingestion Validation - FAILED (errors={len(ingestion_msgs)})")
+    except Exception:
+        return finish_stages(stages, unexpected_failure(ctx, xml_file_id, messages)), None
 
-            # Detect special scheduling completion case
-            has_completion = any(
-                m.get("FID_SourceFile") == xml_file_id
-                and m.get("MessageType") == "COMPLETION"
-                for m in messages
-            )
 
-            status = (
-                "Scheduling Complete - No Transformation"
-                if has_completion and len(messages) == 1
-                else "Failed"
-            )
+def state_baseline_key(state):
+    """Baseline key (cjs_code, pnld_ref) of a parsed file, as read from its XML."""
+    return baseline_key(state["cjs_code"], state["pnld_ref"])
 
-            return {
-                "SourceFile": [{
-                    "SourceFileID": xml_file_id,
-                    "FID_SourceStatus": status,
-                    "MessageCount": len(messages)
-                }],
-                "SourceFileMessage": messages,
-                "OffenceRevision": [],
-                "Menu": [],
-                "MenuOptions": [],
-            }
 
-        log(ctx, "Ingestion Validation - SUCCESS")
+def apply_transforms(ctx, record, cjs_code, xml_file_id, stages):
+    """
+    Steps 5-7 of transform_pnld_file - cleanse, terminal entries + menus and
+    text validation. They depend only on the flattened record and the
+    cleanse rules, so their outputs are what the transformation cache keeps.
+    Each step is timed in `stages` (FileStages).
+
+    Returns a dict: record, cleanse_messages, entries, menus, menu_options
+    and text_errors (None when there are too many terminal entries for the
+    file to get that far).
+    """
 
-        # --------------------------------------------------------------
-        # STEP 5 — CLEANSE + HTML UNESCAPE
-        # --------------------------------------------------------------
-        log(ctx, "XML Cleanse - START")
+    # --------------------------------------------------------------
+    # STEP 5 — CLEANSE + HTML UNESCAPE
+    # --------------------------------------------------------------
+    log(ctx, "XML Cleanse - START")
 
+    with stages.stage("cleansing") as span:
         record["SOW"] = html.unescape(record["sow_raw"])
         record["SOF"] = (
             html.unescape(record["sof_raw"]) if record["sof_raw"] is not None else None
         )
 
         record, cleanse_msgs = cleanse_record(record, xml_file_id)
-        messages.extend(cleanse_msgs)
+        span["pnld.rule_hits"] = len(cleanse_msgs)
 
-        log(ctx, f"XML Cleanse - SUCCESS (cleanses={len(cleanse_msgs)})")
+    log(ctx, f"XML Cleanse - SUCCESS (cleanses={len(cleanse_msgs)})")
 
-        # --------------------------------------------------------------
-        # STEP 6 — TERMINAL ENTRIES + MENUS
-        # --------------------------------------------------------------
-        log(ctx, "Terminal Entry Extraction - START")
+    # --------------------------------------------------------------
+    # STEP 6 — TERMINAL ENTRIES + MENUS
+    # --------------------------------------------------------------
+    log(ctx, "Terminal Entry Extraction - START")
 
+    with stages.stage("terminal_entries") as span:
         entry_counter = 0
         all_entries = []
         menus = []
@@ -250,6 +311,140 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
 
         menus, menu_opts, all_entries = process_menus(cjs_code, all_entries, menus, menu_opts)
 
+        span["pnld.entries"] = len(all_entries)
+        span["pnld.menus"] = len(menus)
+        span["pnld.menu_options"] = len(menu_opts)
+        if len(all_entries) > 30:
+            span["pnld.outcome"] = "failed"
+
+    outputs = {
+        "record": record,
+        "cleanse_messages": cleanse_msgs,
+        "entries": all_entries,
+        "menus": menus,
+        "menu_options": menu_opts,
+        "text_errors": None,
+    }
+
+    if len(all_entries) > 30:
+        return outputs
+
+    # --------------------------------------------------------------
+    # STEP 7 — TEXT VALIDATION
+    # --------------------------------------------------------------
+    log(ctx, "Text Validation - START")
+
+    with stages.stage("text_validation") as span:
+        text_errors = []
+
+        # Validate SOW + SOW menu options
+        text_errors.extend(validate_text_pnld(record["SOW"], "SOW", xml_file_id))
+        for opt in opts_sow:
+            text_errors.extend(validate_text_pnld(opt["OptionText"], "SOWMENU", xml_file_id))
+
+        # Validate SOF + SOF menu options
+        if record["SOF"]:
+            text_errors.extend(validate_text_pnld(record["SOF"], "SOF", xml_file_id))
+            for opt in opts_sof:
+                text_errors.extend(validate_text_pnld(opt["OptionText"], "SOFMENU", xml_file_id))
+
+        text_errors = unique_dicts(text_errors)
+        span["pnld.errors"] = len(text_errors)
+        if text_errors:
+            span["pnld.outcome"] = "failed"
+
+    outputs["text_errors"] = text_errors
+    return outputs
+
+
+def transform_pnld_file(state, rp_id, baseline_records=None):
+    """
+    Stage 3 (CPU) - ingestion validation against the baseline, cleanse,
+    terminal entries + menus, text validation and output assembly.
+
+    `baseline_records` is the Semarchy baseline for this file; when None,
+    validate_pnld fetches it itself. The cleanse and SOW/SOF outputs come
+    from the transformation cache when this content was transformed before.
+    """
+
+    xml_file_id = state["xml_file_id"]
+    uploaded_by = state["uploaded_by"]
+    ctx = state["ctx"]
+    messages = state["messages"]
+    record = state["record"]
+    pnld_ref = state["pnld_ref"]
+    cjs_code = state["cjs_code"]
+    title = state["title"]
+    start_date = state["start_date"]
+    end_date = state["end_date"]
+    last_update = state["last_update"]
+    stages = state.get("stages") or FileStages(pnld_file_id=xml_file_id)
+
+    try:
+        # --------------------------------------------------------------
+        # STEP 4 — INGESTION VALIDATION
+        # --------------------------------------------------------------
+        log(ctx, "Ingestion Validation - START")
+
+        with stages.stage("ingestion_validation") as span:
+            md5_hash = compute_md5_hash(
+                record, ["offenceenddate", "dateoflastupdate", "sow_raw", "sof_raw"]
+            )
+            record["md5_hash"] = md5_hash
+
+            ingestion_msgs, ingestion_type = validate_pnld(
+                pnld_ref, cjs_code, start_date, end_date, last_update,
+                title, md5_hash, xml_file_id,
+                baseline_records=baseline_records
+            )
+            span["pnld.errors"] = len(ingestion_msgs)
+            span["pnld.ingestion_type"] = ingestion_type
+            if ingestion_msgs:
+                span["pnld.outcome"] = "failed"
+
+        messages.extend(ingestion_msgs)
+
+        if ingestion_msgs:
+            log(ctx, f"Ingestion Validation - FAILED (errors={len(ingestion_msgs)})")
+
+            # Detect special scheduling completion case
+            has_completion = any(
+                m.get("FID_SourceFile") == xml_file_id
+                and m.get("MessageType") == "COMPLETION"
+                for m in messages
+            )
+
+            status = (
+                "Scheduling Complete - No Transformation"
+                if has_completion and len(messages) == 1
+                else "Failed"
+            )
+
+            return finish_stages(stages, PnldFileResult.failed(xml_file_id, messages, status=status))
+
+        log(ctx, "Ingestion Validation - SUCCESS")
+
+        # --------------------------------------------------------------
+        # STEPS 5-7 — CLEANSE, TERMINAL ENTRIES + MENUS, TEXT VALIDATION
+        # --------------------------------------------------------------
+        cache_key = state.get("cache_key")
+        outputs = cache_lookup("transform", cache_key)
+        stages.set(pnld_transform_cached=outputs is not None)
+
+        if outputs is not None:
+            log(ctx, "XML Cleanse + Terminal Entry Extraction + Text Validation - CACHED")
+            restamp_messages(outputs["cleanse_messages"], xml_file_id)
+            restamp_messages(outputs["text_errors"] or [], xml_file_id)
+        else:
+            outputs = apply_transforms(ctx, record, cjs_code, xml_file_id, stages)
+            cache_store("transform", cache_key, outputs)
+
+        record = outputs["record"]
+        all_entries = outputs["entries"]
+        menus = outputs["menus"]
+        menu_opts = outputs["menu_options"]
+        messages.extend(outputs["cleanse_messages"])
+
         if len(all_entries) > 30:
             log(ctx, "Too Many Terminal Entries - FAILED")
 
@@ -263,17 +458,7 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
                 resolution="NSD to report back to PNLD to correct data at source.",
             )
 
-            return {
-                "SourceFile": [{
-                    "SourceFileID": xml_file_id,
-                    "FID_SourceStatus": "Failed",
-                    "MessageCount": len(messages)
-                }],
-                "SourceFileMessage": messages,
-                "OffenceRevision": [],
-                "Menu": [],
-                "MenuOptions": [],
-            }
+            return finish_stages(stages, PnldFileResult.failed(xml_file_id, messages))
 
         formatted_entries = format_terminal_entries(all_entries)
 
@@ -283,53 +468,30 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
             f"(entries={len(all_entries)}, menus={len(menus)}, options={len(menu_opts)})"
         )
 
-        # --------------------------------------------------------------
-        # STEP 7 — TEXT VALIDATION
-        # --------------------------------------------------------------
-        log(ctx, "Text Validation - START")
-
-        text_errors = []
-
-        # Validate SOW + SOW menu options
-        text_errors.extend(validate_text_pnld(record["SOW"], "SOW", xml_file_id))
-        for opt in opts_sow:
-            text_errors.extend(validate_text_pnld(opt["OptionText"], "SOWMENU", xml_file_id))
-
-        # Validate SOF + SOF menu options
-        if record["SOF"]:
-            text_errors.extend(validate_text_pnld(record["SOF"], "SOF", xml_file_id))
-            for opt in opts_sof:
-                text_errors.extend(validate_text_pnld(opt["OptionText"], "SOFMENU", xml_file_id))
-
-        text_errors = unique_dicts(text_errors)
+        text_errors = outputs["text_errors"]
         messages.extend(text_errors)
 
         if text_errors:
             log(ctx, f"Text Validation - FAILED (errors={len(text_errors)})")
-            return {
-                "SourceFile": [{
-                    "SourceFileID": xml_file_id,
-                    "FID_SourceStatus": "Failed",
-                    "MessageCount": len(messages)
-                }],
-                "SourceFileMessage": messages,
-                "OffenceRevision": [],
-                "Menu": [],
-                "MenuOptions": [],
-            }
+            return finish_stages(stages, PnldFileResult.failed(xml_file_id, messages))
 
         log(ctx, "Text Validation - SUCCESS")
 
         # --------------------------------------------------------------
         # STEP 8 — SUCCESS OUTPUT ASSEMBLY
         # --------------------------------------------------------------
-        offence_record = define_offence(
-            record, formatted_entries, ingestion_type, uploaded_by, rp_id
-        )
-        offence_record["xml_file_id"] = xml_file_id
+        with stages.stage("output_assembly") as span:
+            offence_record = define_offence(
+                record, formatted_entries, ingestion_type, uploaded_by, rp_id
+            )
+            offence_record["xml_file_id"] = xml_file_id
+
+            for m in menus:
+                m["xml_file_id"] = xml_file_id
 
-        for m in menus:
-            m["xml_file_id"] = xml_file_id
+            span["pnld.messages"] = len(messages)
+            span["pnld.menus"] = len(menus)
+            span["pnld.menu_options"] = len(menu_opts)
 
         log(
             ctx,
@@ -337,41 +499,39 @@ def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag):
             f"(messages={len(messages)}, menus={len(menus)}, options={len(menu_opts)})"
         )
 
-        return {
-            "SourceFile": [{
+        return finish_stages(stages, PnldFileResult(
+            {
                 "SourceFileID": xml_file_id,
                 "MessageCount": len(messages),
-            }],
-            "SourceFileMessage": messages,
-            "OffenceRevision": [offence_record],
-            "Menu": menus,
-            "MenuOptions": menu_opts,
-        }
+            },
+            messages,
+            offence_record,
+            menus,
+            menu_opts,
+        ))
 
     # --------------------------------------------------------------
     # GLOBAL UNHANDLED EXCEPTION HANDLER
     # --------------------------------------------------------------
     except Exception:
-        logging.exception(f"FILE HANDLING | {ctx} | UNHANDLED EXCEPTION")
+        return finish_stages(stages, unexpected_failure(ctx, xml_file_id, messages))
 
-        messages = add_message(
-            messages,
-            file_id=xml_file_id,
-            code="ER-SUPP-UNEXPECTED-001",
-            msg_type="ERROR",
-            issue="Unexpected error when transforming file",
-            cause=traceback.format_exc(),
-            resolution="CONTACT SUPPORT TEAM",
-        )
 
-        return {
-            "SourceFile": [{
-                "SourceFileID": xml_file_id,
-                "FID_SourceStatus": "Failed",
-                "MessageCount": len(messages)
-            }],
-            "SourceFileMessage": messages,
-            "OffenceRevision": [],
-            "Menu": [],
-            "MenuOptions": [],
-        }
\ No newline at end of file
+# ----------------------------------------------------------------------
+# Main Pipeline
+# ----------------------------------------------------------------------
+def pnld_file_handling(xml_record, xsd_encoded, rp_id, progress_tag, baselines=None):
+    """
+    Orchestrates the full PNLD pipeline for a single XML file:
+    parse_pnld_file, the baseline lookup, then transform_pnld_file.
+
+    `baselines` holds prefetched Semarchy baselines keyed by (cjs_code, pnld_ref)
+    (see prefetch_baselines); a file not found there fetches its own.
+    """
+    result, state = parse_pnld_file(xml_record, xsd_encoded, progress_tag)
+    if result is not None:
+        return result
+
+    baseline_records = (baselines or {}).get(state_baseline_key(state))
+
+    return transform_pnld_file(state, rp_id, baseline_records)
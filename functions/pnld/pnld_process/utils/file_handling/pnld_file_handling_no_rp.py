@@ -8,6 +8,7 @@ import hashlib
 # Domain-specific helpers (not used here but imported for consistency)
 from pnld_process.utils.file_handling.helpers.xsd_handling import pnld_xsd_validation
 from pnld_process.utils.file_handling.helpers.pnld_define_offence import define_offence
+from pnld_process.utils.pnld_results import PnldFileResult
 
 
 def pnld_file_handling_no_rp(xml_record, rp_messages, logging_id):
@@ -36,11 +37,11 @@ def pnld_file_handling_no_rp(xml_record, rp_messages, logging_id):
     # ---------------------------
     # Build failed SourceFile block
     # ---------------------------
-    source_file = [{
+    source_file = {
         "SourceFileID": xml_file_id,
         "FID_SourceStatus": "Failed",
         "MessageCount": 1,
-    }]
+    }
 
     # ---------------------------
     # Add failure message
@@ -48,18 +49,9 @@ def pnld_file_handling_no_rp(xml_record, rp_messages, logging_id):
     for message in rp_messages:
         message["FID_SourceFile"]=xml_file_id
 
-    # ---------------------------
-    # No offence revision output
-    # ---------------------------
-    offence_revision = []
-
     logging.info(f"FILE HANDLING | {ctx} | No-RP Path - COMPLETE")
 
     # ---------------------------
-    # Return consistent shape
+    # No offence revision output
     # ---------------------------
-    return {
-        "SourceFile": source_file,
-        "SourceFileMessage": rp_messages,
-        "OffenceRevision": offence_revision,
-    }
\ No newline at end of file
+    return PnldFileResult(source_file, rp_messages)
\ No newline at end of file
@@ -3,14 +3,32 @@ import os
 import logging
 import time
 
-def post_menus(menus, menu_options, rp_id):
+def post_menus(menus, menu_options, rp_id, on_submitted=None):
     """
     Submits PNLD Menu data and Menu Options to Semarchy using the CREATE_LOAD_AND_SUBMIT API action.
     Handles submission, validation, and polling of load status.
 
+    `on_submitted(load_id, batch_id)` is called once Semarchy has accepted
+    the load, before polling (the batch journal records it there).
+
     Logging format:
         MENU HANDLING | <step> - <status> (details)
     """
+    load_id, batch_id = submit_menus(menus, menu_options, rp_id)
+
+    if on_submitted is not None:
+        on_submitted(load_id, batch_id)
+
+    return poll_menus(load_id)
+
+
+def submit_menus(menus, menu_options, rp_id):
+    """
+    Submit the Menu load (CREATE_LOAD_AND_SUBMIT) without waiting for it.
+
+    Returns:
+        (load_id, batch_id)
+    """
 
     logging.info(
         f"MENU HANDLING | POST MENUS | START "
@@ -100,6 +118,14 @@ def post_menus(menus, menu_options, rp_id):
         logging.error(f"MENU HANDLING | POST MENUS | LOAD VALIDATION - FAILED ({msg})")
         raise ValueError(msg)
 
+    return load_id, batch_id
+
+
+def poll_menus(load_id):
+    """Poll a Menu load until it reaches a terminal state and return that status."""
+    base_url = f'{os.getenv("SemarchyBaseURL")}/loads/CSDS'
+    headers = {"API-Key": os.getenv("SemarchyAPIKey")}
+
     # ------------------------------------------
     # Poll load status
     # ------------------------------------------
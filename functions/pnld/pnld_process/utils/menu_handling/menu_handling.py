@@ -1,15 +1,29 @@
 from pnld_process.utils.menu_handling.helpers.menu_search import extract_unique_menu_and_options
 from pnld_process.utils.menu_handling.helpers.menu_search import create_menu_id_mapping
-from pnld_process.utils.menu_handling.helpers.post_menus import post_menus
+from pnld_process.utils.menu_handling.helpers.post_menus import post_menus, poll_menus
 from pnld_process.utils.menu_handling.helpers.handle_missing_menus import handle_missing_menus
+from pnld_process.utils.pnld_journal import LOADED, LOAD_FAILED, LOAD_PENDING
 import logging
 
 
-async def menu_handling(menus, menu_options, offences, source_files, messages, rp_id):
+async def menu_handling(menus, menu_options, offences, source_files, messages, rp_id,
+                        resume_load=None, on_submitted=None):
     """
     Handles menu extraction, lookup of menu IDs, posting new menus,
     updating offence revisions, and resolving any missing menu issues.
 
+    `resume_load` is the (load_id, batch_id) of a Menu load an earlier
+    invocation of this batch submitted: it is waited for before the lookup,
+    so its menus are found as existing rather than posted again.
+    `on_submitted` is passed to post_menus.
+
+    Returns (source_files, messages, offences, load_outcome). A failed POST
+    still degrades the offences (their menu IDs become None), so
+    `load_outcome` tells the batch journal whether the Menu load actually
+    loaded: LOADED when there was nothing to post or it finished DONE /
+    WARNING, LOAD_FAILED for another terminal status, LOAD_PENDING when the
+    POST or its polling raised.
+
     Logging follows a consistent pattern across all PNLD processing components:
         "<Context> | <Step> - <Status> (counts/details)"
     """
@@ -27,12 +41,22 @@ async def menu_handling(menus, menu_options, offences, source_files, messages, r
     )
 
     post_status = None  # Track Semarchy POST status for new menus
+    load_outcome = LOADED
 
     # ---------------------------------------------------------
     # Only continue if any menus exist (excluding DATE menus)
     # ---------------------------------------------------------
     if len(all_menus) > 0:
 
+        if resume_load:
+            logging.info(f"MENU HANDLING | Resume - START (load_id={resume_load[0]})")
+            try:
+                resumed_status = poll_menus(resume_load[0])
+                logging.info(f"MENU HANDLING | Resume - COMPLETE (status={resumed_status})")
+            except Exception as e:
+                # Menus it did not load are found missing below and posted again
+                logging.warning(f"MENU HANDLING | Resume - FAILED ({e})")
+
         # ---------------------------------------------------------
         # STEP 2 — Lookup existing Semarchy menu IDs
         # ---------------------------------------------------------
@@ -67,13 +91,14 @@ async def menu_handling(menus, menu_options, offences, source_files, messages, r
             logging.info("MENU HANDLING | New Menu POST - START")
 
             try:
-                post_status = post_menus(new_menus, new_menu_options, rp_id)
+                post_status = post_menus(new_menus, new_menu_options, rp_id, on_submitted=on_submitted)
                 logging.info(
                     f"MENU HANDLING | New Menu POST - SUCCESS "
                     f"(status={post_status})"
                 )
             except Exception as e:
                 logging.error(f"MENU HANDLING | New Menu POST - FAILED ({e})")
+                load_outcome = LOAD_PENDING
 
             # If posted successfully, re‑lookup mappings for new menus
             if post_status in ["DONE", "WARNING"]:
@@ -87,6 +112,9 @@ async def menu_handling(menus, menu_options, offences, source_files, messages, r
 
                 menu_id_mapping.update(new_menu_mappings)
 
+            elif post_status is not None:
+                load_outcome = LOAD_FAILED
+
         else:
             logging.info("MENU HANDLING | New Menu POST - SKIPPED (no new menus)")
 
@@ -139,4 +167,4 @@ async def menu_handling(menus, menu_options, offences, source_files, messages, r
         logging.info("MENU HANDLING | Missing Menu Check - COMPLETE")
 
 
-    return source_files, messages, offences
\ No newline at end of file
+    return source_files, messages, offences, load_outcome
@@ -3,10 +3,13 @@ import os
 import logging
 import time
 
-def post_offences(offences):
+def post_offences(offences, on_submitted=None):
     """
     Submit Offence Revision records to Semarchy and poll until the load completes.
 
+    `on_submitted(load_id, batch_id)` is called once Semarchy has accepted
+    the load, before polling (the batch journal records it there).
+
     Returns:
         (load_status, batch_id)
 
@@ -16,6 +19,21 @@ def post_offences(offences):
     Logging format:
         OFFENCE HANDLING | <step> - <status> (details)
     """
+    load_id, batch_id = submit_offences(offences)
+
+    if on_submitted is not None:
+        on_submitted(load_id, batch_id)
+
+    return poll_offences(load_id, batch_id)
+
+
+def submit_offences(offences):
+    """
+    Submit the Offence Revision load (CREATE_LOAD_AND_SUBMIT) without waiting for it.
+
+    Returns:
+        (load_id, batch_id)
+    """
 
     # Remove non-persisted helper field(s)
     offences = [{k: v for k, v in off.items() if k != "xml_file_id"} for off in offences]
@@ -96,6 +114,19 @@ def post_offences(offences):
         )
         raise ValueError(msg)
 
+    return load_id, batch_id
+
+
+def poll_offences(load_id, batch_id):
+    """
+    Poll an Offence Revision load until it reaches a terminal state.
+
+    Returns:
+        (load_status, batch_id)
+    """
+    base_url = f'{os.getenv("SemarchyBaseURL")}/loads/CSDS'
+    headers = {"API-Key": os.getenv("SemarchyAPIKey")}
+
     # ------------------------------------------
     # Poll load status
     # ------------------------------------------
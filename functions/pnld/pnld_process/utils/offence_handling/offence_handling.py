@@ -1,14 +1,26 @@
-from pnld_process.utils.offence_handling.helpers.post_offence import post_offences
+from pnld_process.utils.offence_handling.helpers.post_offence import post_offences, poll_offences
 from pnld_process.utils.offence_handling.helpers.get_offence import get_offences
 from pnld_process.utils.offence_handling.helpers.update_files import update_files
+from pnld_process.utils.pnld_journal import LOADED, LOAD_FAILED, LOAD_PENDING
 
 import logging
 
-def offence_handling(source_files, messages, offences):
+def offence_handling(source_files, messages, offences, resume_load=None, on_submitted=None):
     """
     Handles POSTing offences to Semarchy, retrieving processed offences,
     and updating source file/message structures.
 
+    `resume_load` is the (load_id, batch_id) of an Offence Revision load an
+    earlier invocation of this batch submitted: it is polled instead of
+    submitting the offences again. `on_submitted` is passed to post_offences.
+
+    Returns (source_files, messages, load_outcome). Failures are still
+    written to the files / messages (update_files), so `load_outcome` tells
+    the batch journal whether the Offence Revision load actually loaded:
+    LOADED when it finished DONE / WARNING and its offences were read back,
+    LOAD_FAILED for another terminal status, LOAD_PENDING when the POST,
+    polling or the GET raised.
+
     Logging format is consistent with PNLD convention:
       OFFENCE HANDLING | <step> - <status> (details)
     """
@@ -28,7 +40,11 @@ def offence_handling(source_files, messages, offences):
     logging.info("OFFENCE HANDLING | POST | START")
 
     try:
-        load_status, batch_id = post_offences(offences)
+        if resume_load:
+            logging.info(f"OFFENCE HANDLING | POST | RESUME (load_id={resume_load[0]}, batch_id={resume_load[1]})")
+            load_status, batch_id = poll_offences(*resume_load)
+        else:
+            load_status, batch_id = post_offences(offences, on_submitted=on_submitted)
 
         logging.info(
             f"OFFENCE HANDLING | POST | SUCCESS "
@@ -77,7 +93,7 @@ def offence_handling(source_files, messages, offences):
 
             logging.info("OFFENCE HANDLING | UPDATE FILES | COMPLETE")
             logging.info("OFFENCE HANDLING | COMPLETE")
-            return source_files, messages
+            return source_files, messages, LOAD_PENDING if error_message else LOADED
 
         # Unexpected terminal state
         else:
@@ -96,7 +112,7 @@ def offence_handling(source_files, messages, offences):
             )
 
             logging.info("OFFENCE HANDLING | COMPLETE (Unexpected Status Path)")
-            return source_files, messages
+            return source_files, messages, LOAD_FAILED
 
     # -------------------------------------------------------
     # STEP 3 — POST failure path
@@ -112,4 +128,4 @@ def offence_handling(source_files, messages, offences):
         )
 
         logging.info("OFFENCE HANDLING | COMPLETE (POST Failure Path)")
-        return source_files, messages
\ No newline at end of file
+        return source_files, messages, LOAD_PENDING
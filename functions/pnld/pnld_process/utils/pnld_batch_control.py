@@ -1,40 +1,167 @@
 import logging
 import asyncio
 
-from pnld_process.utils.file_handling.pnld_file_handling import pnld_file_handling
-
-
-async def process_pnld_batch(input_records, xsd_encoded, rp_id, max_concurrency=8):
+from pnld_process.utils.file_handling.pnld_file_handling import (
+    parse_pnld_file,
+    transform_pnld_file,
+    state_baseline_key,
+    unexpected_failure,
+)
+from pnld_process.utils.file_handling.helpers.pnld_validation import fetch_pnld_baseline
+from pnld_process.utils.file_handling.content_fetch import needs_content_fetch, with_content
+from pnld_process.utils.request_decoding import load_content
+from pnld_process.utils.pnld_executor import (
+    resolve_pnld_executor,
+    acquire_pnld_process_pool,
+    release_pnld_process_pool,
+    discard_pnld_process_pool,
+    run_parse_pnld_file,
+    run_transform_pnld_file,
+    compact_pnld_input,
+)
+from pnld_process.utils.pnld_pipeline import run_pipeline
+from pnld_process.utils.pnld_results import PnldBatchResult
+from pnld_process.utils.telemetry import BatchStageTelemetry
+from pnld_process.utils.pnld_settings import PIPELINE_NETWORK_CONCURRENCY, PIPELINE_QUEUE_SIZE
+
+
+async def process_pnld_batch(input_records, xsd_encoded, rp_id, max_concurrency=8, baselines=None, backend=None):
     """
-    Process each XML record concurrently using asyncio.
-    Calls process_pnld(xml_file, xsd) in a thread pool for non-blocking execution.
+    Process the XML records through a staged pipeline with bounded queues
+    (PnldPipelineQueueSize) between the stages:
+
+      1. intake     (network)  - decode SourceFileContent from the request body,
+                                 or fetch it for claim-check records
+      2. parse      (CPU)      - XSD validation, flattening (parse_pnld_file)
+      3. baseline   (network)  - Semarchy baseline, unless prefetched
+      4. transform  (CPU)      - ingestion validation, cleanse, transforms (transform_pnld_file)
+
+    CPU stages run in threads (max_concurrency each) or, for the process
+    backend (PnldProcessExecutor), in pre-warmed worker processes that already
+    hold the compiled XSD and config. Network stages run
+    PnldPipelineNetworkConcurrency lookups at a time, so CPU work overlaps
+    with the lookups instead of threads idling on them.
+    `baselines` are the prefetched Semarchy baselines.
+
+    Each file's stage timings become spans and pnld.file_stage.duration
+    histogram values as it completes; per-stage latency of the batch is
+    logged at the end (BatchStageTelemetry).
+
+    Returns a PnldBatchResult, collated as each file completes.
     """
-    semaphore = asyncio.Semaphore(max_concurrency)
-    queue = asyncio.Queue()
-    
-    async def _worker(idx, xml_file):
-        async with semaphore:
+    backend, workers = resolve_pnld_executor(input_records, backend)
+    logging.info(f"FILE HANDLING | Executor - {backend} (workers={workers or max_concurrency}, files={len(input_records)})")
+
+    if backend == 'process':
+        # Loads multiprocessing, so it is only imported when the process backend runs
+        from concurrent.futures.process import BrokenProcessPool
+
+        pool, digest = await asyncio.to_thread(acquire_pnld_process_pool, workers, xsd_encoded)
+        cpu_concurrency = workers
+    else:
+        cpu_concurrency = max_concurrency
+
+    loop = asyncio.get_running_loop()
+    total = len(input_records)
+    batch = PnldBatchResult(total)
+    stage_telemetry = BatchStageTelemetry(total)
+
+    async def _in_process(fn, *args):
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died - the next batch starts a fresh pool
+            discard_pnld_process_pool(pool)
+            raise
+
+    def _finish(item, result):
+        logging.info(f"FILE HANDLING | {item['tag']} - COMPLETE")
+        batch.add(item["index"], result)
+        stage_telemetry.add(result.stages)
+
+    def _failed(item, stage):
+        # A stage raised (content fetch, a dead process worker, ...) - the file
+        # still gets its Failed SourceFile row and ER-SUPP-UNEXPECTED-001
+        _finish(item, unexpected_failure(f"{item['tag']} | FileID={item['file_id']} | Stage={stage}", item["file_id"], []))
+
+    async def _intake(item):
+        logging.info(f"FILE HANDLING | {item['tag']} - START")
+        # Content decoded from the request body only now; the parse stage
+        # drops the decoded string, so only the files in flight hold one
+        # (the body itself is kept by the request for the whole invocation)
+        item["record"] = load_content(item["record"])
+        if needs_content_fetch(item["record"]):
+            # Claim-check mode - content is fetched by SourceFileID
+            try:
+                item["record"] = await asyncio.to_thread(with_content, item["record"], PIPELINE_NETWORK_CONCURRENCY)
+            except Exception:
+                # Reported on the file (Failed, ER-SUPP-UNEXPECTED-001) so it can be resubmitted
+                _finish(item, unexpected_failure(f"{item['tag']} | FileID={item['file_id']} | Content Fetch", item["file_id"], []))
+                return None
+        return item
+
+    async def _parse(item):
+        xml_file = item.pop("record")
+        if backend == 'process':
+            # Only the fields this file needs cross the process boundary
+            result, state = await _in_process(run_parse_pnld_file, compact_pnld_input(xml_file), digest, item["tag"])
+        else:
+            result, state = await asyncio.to_thread(parse_pnld_file, xml_file, xsd_encoded, item["tag"])
+
+        if result is not None:
+            _finish(item, result)
+            return None
+
+        item["state"] = state
+        return item
+
+    async def _baseline(item):
+        key = state_baseline_key(item["state"])
+        if baselines and key in baselines:
+            item["baseline"] = baselines[key]
+        elif all(key):
             try:
-                logging.info(f"FILE HANDLING | [{idx}/{len(input_records)}] - START")
-                processed_record = await asyncio.to_thread(pnld_file_handling, xml_file, xsd_encoded, rp_id, f'[{idx}/{len(input_records)}]')
-                logging.info(f"FILE HANDLING | [{idx}/{len(input_records)}] - COMPLETE")
-                await queue.put(processed_record)
+                item["baseline"] = await asyncio.to_thread(fetch_pnld_baseline, *key)
             except Exception as e:
-                logging.exception((f"FILE HANDLING | [{idx}/{len(input_records)}] - ERROR - {e}"))
+                # transform_pnld_file fetches it again and reports the failure on the file
+                logging.warning(f"FILE HANDLING | {item['tag']} - Baseline Lookup - FAILED ({e})")
+        return item
 
-    # Create tasks
-    tasks = [asyncio.create_task(_worker(idx, xml_file))
-             for idx, xml_file in enumerate(input_records, start=1)]
+    async def _transform(item):
+        if backend == 'process':
+            result = await _in_process(run_transform_pnld_file, item["state"], rp_id, item.get("baseline"))
+        else:
+            result = await asyncio.to_thread(transform_pnld_file, item["state"], rp_id, item.get("baseline"))
+        _finish(item, result)
 
-    # Wait for all workers to finish
-    await asyncio.gather(*tasks)
+    items = (
+        {
+            "index": idx - 1,
+            "tag": f"[{idx}/{total}]",
+            "file_id": xml_file.get("SourceFileID") if isinstance(xml_file, dict) else None,
+            "record": xml_file,
+        }
+        for idx, xml_file in enumerate(input_records, start=1)
+    )
 
-    # Collect results from queue
-    processed_records = []
-    while not queue.empty():
-        processed_records.append(await queue.get())
-    
-    return processed_records
+    try:
+        await run_pipeline(
+            items,
+            [
+                ("intake", _intake, PIPELINE_NETWORK_CONCURRENCY),
+                ("parse", _parse, cpu_concurrency),
+                ("baseline", _baseline, PIPELINE_NETWORK_CONCURRENCY),
+                ("transform", _transform, cpu_concurrency),
+            ],
+            PIPELINE_QUEUE_SIZE,
+            on_error=_failed,
+        )
+    finally:
+        stage_telemetry.finish()
+        if backend == 'process':
+            release_pnld_process_pool(pool)
+
+    return batch.finish()
 
 
 
@@ -51,9 +178,10 @@ async def process_pnld_batch_no_rp(input_records, rp_messages, max_concurrency=8
     """
     Process each XML record concurrently using asyncio.
     Calls process_pnld(xml_file, xsd) in a thread pool for non-blocking execution.
+    Returns a PnldBatchResult.
     """
     semaphore = asyncio.Semaphore(max_concurrency)
-    queue = asyncio.Queue()
+    batch = PnldBatchResult(len(input_records))
     
     async def _worker(idx, xml_file):
         async with semaphore:
@@ -61,9 +189,11 @@ async def process_pnld_batch_no_rp(input_records, rp_messages, max_concurrency=8
                 logging.info(f"[{idx}/{len(input_records)}] - Processing XML - START")
                 processed_record = await asyncio.to_thread(pnld_file_handling_no_rp, xml_file, rp_messages, f'[{idx}/{len(input_records)}]')
                 logging.info(f"[{idx}/{len(input_records)}] - Processing XML - COMPLETE")
-                await queue.put(processed_record)
-            except Exception as e:
-                logging.exception(f"Error processing XML [{idx}]: {e}")
+                batch.add(idx - 1, processed_record)
+            except Exception:
+                # Still reported on the file (logged by unexpected_failure)
+                file_id = xml_file.get("SourceFileID") if isinstance(xml_file, dict) else None
+                batch.add(idx - 1, unexpected_failure(f"[{idx}/{len(input_records)}] | FileID={file_id}", file_id, []))
 
     # Create tasks
     tasks = [asyncio.create_task(_worker(idx, xml_file))
@@ -72,9 +202,4 @@ async def process_pnld_batch_no_rp(input_records, rp_messages, max_concurrency=8
     # Wait for all workers to finish
     await asyncio.gather(*tasks)
 
-    # Collect results from queue
-    processed_records = []
-    while not queue.empty():
-        processed_records.append(await queue.get())
-    
-    return processed_records
\ No newline at end of file
+    return batch.finish()
\ No newline at end of file
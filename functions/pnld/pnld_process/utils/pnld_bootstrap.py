@@ -0,0 +1,87 @@
+import logging
+import asyncio
+
+from pnld_process.utils.file_handling.helpers.xsd_cache import get_cached_xsd
+from pnld_process.utils.release_package_handling.release_package_handling import get_release_package_id
+from pnld_process.utils.release_package_handling.helpers.release_package_resolver import resolver
+from pnld_process.utils.file_handling.duplicate_cjs import detect_duplicate_cjs
+from pnld_process.utils.file_handling.baseline_prefetch import prefetch_baselines
+
+
+def start_lookups():
+    """
+    Start the request-independent, read-only lookups - Release Package and
+    XSD - in threads, so they run while the request body is still being
+    decoded.
+
+    Nothing is created here: a request that fails validation or was already
+    completed must not leave a new Release Package behind. Creation, when
+    none exists, is left to resolve_release_package.
+
+    Returns:
+        (rp_task, xsd_task) - rp_task resolves to (rp_id, rp_status) as
+        get_release_package returns it, xsd_task to the Base64 XSD.
+    """
+    logging.info("BOOTSTRAP | Lookups - START (release_package, xsd)")
+
+    rp_task = asyncio.create_task(asyncio.to_thread(resolver.lookup))
+    xsd_task = asyncio.create_task(asyncio.to_thread(get_cached_xsd))
+
+    return rp_task, xsd_task
+
+
+async def resolve_release_package(rp_task):
+    """
+    The batch's Release Package from the early lookup, created (and looked
+    up again) only if none exists. Call once the request is validated and
+    the batch is known not to be complete already.
+
+    Returns:
+        (rp_id, messages) as get_release_package_id returns them.
+    """
+    try:
+        found = await rp_task
+    except Exception as e:
+        # get_release_package_id looks again and reports it if it still fails
+        logging.warning(f"BOOTSTRAP | Release Package Lookup - FAILED ({e})")
+        found = None
+
+    return await asyncio.to_thread(get_release_package_id, [], found)
+
+
+def prepare_batch(input_records, max_concurrency=8):
+    """
+    Duplicate detection, then the baseline prefetch for the non-duplicate
+    records started as a task. Needs only the decoded records, so it runs
+    while the Release Package lookup may still be in flight.
+
+    Returns:
+        (duplicate_records, non_duplicate_records, baselines_task)
+    """
+    logging.info("DUPLICATE MANAGEMENT | START")
+    duplicate_records, non_duplicate_records = detect_duplicate_cjs(input_records)
+    logging.info(
+        f"DUPLICATE MANAGEMENT | COMPLETE "
+        f"(duplicates={len(duplicate_records)}, non_duplicates={len(non_duplicate_records)})"
+    )
+
+    baselines_task = asyncio.create_task(
+        prefetch_baselines(non_duplicate_records, max_concurrency=max_concurrency)
+    )
+
+    return duplicate_records, non_duplicate_records, baselines_task
+
+
+def discard(*tasks):
+    """
+    Bootstrap results that turned out not to be needed (e.g. the XSD on the
+    no-Release-Package path). Threads cannot be interrupted, so the lookups
+    are left to finish; any error they raise is logged instead of surfacing
+    as an unretrieved task exception.
+    """
+    def _consume(task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"BOOTSTRAP | Unused Lookup - FAILED ({task.exception()})")
+
+    for task in tasks:
+        task.add_done_callback(_consume)
@@ -0,0 +1,188 @@
+import os
+import logging
+import threading
+
+from pnld_process.utils.pnld_settings import EXECUTOR_BACKEND, PROCESS_MIN_FILES_PER_WORKER
+from pnld_process.utils.file_handling.pnld_file_handling import parse_pnld_file, transform_pnld_file
+from pnld_process.utils.file_handling.helpers.xsd_handling import xsd_digest
+from pnld_process.utils.pnld_warmup import preload_rules, preload_thread
+
+BACKENDS = ('thread', 'process', 'auto')
+
+# Fields pnld_file_handling actually reads - anything else in the notification is not sent to workers
+PNLD_INPUT_KEYS = ('SourceFileID', 'SourceFileContent', 'BatchID', 'UploadedBy')
+
+# One pre-warmed process pool for the life of the worker instance (spawn and
+# XSD compilation are expensive). It is replaced when the XSD changes or a
+# batch needs more workers; a replaced pool is shut down once the last batch
+# using it releases it.
+_process_pool = None  # (workers, xsd_digest, pool)
+_process_pool_users = {}  # pool -> batches holding it
+_process_pool_lock = threading.Lock()
+
+# Set in each process worker by _init_worker
+_worker_xsd = None
+_worker_xsd_digest = None
+
+
+def compact_pnld_input(xml_record):
+    """Reduce a SourceFile notification record to the small, picklable dict pnld_file_handling needs."""
+    return {key: xml_record.get(key) for key in PNLD_INPUT_KEYS}
+
+
+def resolve_pnld_executor(input_records, backend=None):
+    """
+    Pick the executor backend and process count for a batch.
+
+    - thread:  pnld_file_handling in threads (the caller's max_concurrency).
+    - process: one process per core, but no more than one per
+               PnldProcessMinFilesPerWorker files.
+    - auto:    process when that sizing gives more than one worker, else thread.
+
+    Returns (backend, workers); workers is None for the thread backend.
+    """
+    backend = (backend or EXECUTOR_BACKEND).lower()
+    if backend not in BACKENDS:
+        logging.warning(f"FILE HANDLING | Executor - Unknown backend '{backend}' - using 'thread'")
+        backend = 'thread'
+
+    if backend == 'thread':
+        return 'thread', None
+
+    cpu_count = os.cpu_count() or 1
+    file_workers = max(1, len(input_records) // max(1, PROCESS_MIN_FILES_PER_WORKER))
+    process_workers = max(1, min(cpu_count, file_workers))
+
+    if backend == 'process' or process_workers > 1:
+        return 'process', process_workers
+
+    return 'thread', None
+
+
+def _init_worker(xsd_encoded, digest, log_level):
+    """
+    Runs once in each spawned worker: compile the XSD, build the parser and
+    flatten XPaths, and load the flatten / cleanse config (and their cache
+    version) before the first file arrives - as warm_up does for threads.
+    """
+    global _worker_xsd, _worker_xsd_digest
+
+    logging.basicConfig(level=log_level)
+    _worker_xsd, _worker_xsd_digest = xsd_encoded, digest
+
+    preload_rules()
+    preload_thread(xsd_encoded)
+
+
+def _ready():
+    return os.getpid()
+
+
+def _check_worker_xsd(digest):
+    if digest != _worker_xsd_digest:
+        raise RuntimeError(f"Worker XSD {_worker_xsd_digest} does not match batch XSD {digest}")
+
+
+def run_parse_pnld_file(xml_record, digest, progress_tag):
+    """Process worker entry point: parse_pnld_file against the XSD loaded at start-up."""
+    _check_worker_xsd(digest)
+    return parse_pnld_file(xml_record, _worker_xsd, progress_tag)
+
+
+def run_transform_pnld_file(state, rp_id, baseline_records):
+    """Process worker entry point: transform_pnld_file."""
+    return transform_pnld_file(state, rp_id, baseline_records)
+
+
+def _usable_pool(workers, digest):
+    # Called with the lock held
+    if _process_pool is not None and _process_pool[0] >= workers and _process_pool[1] == digest:
+        return _process_pool[2]
+    return None
+
+
+def _hold(pool):
+    _process_pool_users[pool] = _process_pool_users.get(pool, 0) + 1
+    return pool
+
+
+def acquire_pnld_process_pool(workers, xsd_encoded):
+    """
+    Return the shared, pre-warmed ProcessPoolExecutor, with at least
+    `workers` processes initialised for this XSD, and its digest. Release it
+    with release_pnld_process_pool when the batch ends.
+
+    A new pool is started (every worker up and warm before it is used) when
+    there is none, the XSD changed or the batch needs more processes; the
+    start-up runs outside the lock, so batches on the current pool are not
+    held up by it. Uses the spawn start method - the Functions host is
+    multi-threaded, so forking it is not safe.
+    """
+    # Not imported at module level: the thread backend never needs multiprocessing
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, wait
+
+    global _process_pool
+
+    digest = xsd_digest(xsd_encoded)
+
+    with _process_pool_lock:
+        pool = _usable_pool(workers, digest)
+        if pool is not None:
+            return _hold(pool), digest
+
+    logging.info(f"FILE HANDLING | Executor - Starting process pool (workers={workers})")
+    started = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(xsd_encoded, digest, logging.getLogger().getEffectiveLevel()),
+    )
+    # Start every worker now rather than one per queued file
+    wait([started.submit(_ready) for _ in range(workers)])
+
+    with _process_pool_lock:
+        pool = _usable_pool(workers, digest)
+        if pool is None:
+            if _process_pool is not None:
+                logging.info(f"FILE HANDLING | Executor - Replacing process pool (workers={_process_pool[0]} -> {workers})")
+                _retire_pool(_process_pool[2])
+            _process_pool = (workers, digest, started)
+            pool = started
+        held = _hold(pool)
+
+    if pool is not started:
+        # Another batch installed a suitable pool while this one started
+        started.shutdown(wait=False)
+
+    return held, digest
+
+
+def release_pnld_process_pool(pool):
+    """A batch is done with `pool`; a replaced pool is shut down after its last batch."""
+    with _process_pool_lock:
+        users = _process_pool_users.get(pool, 1) - 1
+        if users > 0:
+            _process_pool_users[pool] = users
+            return
+        _process_pool_users.pop(pool, None)
+        retired = _process_pool is None or pool is not _process_pool[2]
+
+    if retired:
+        pool.shutdown(wait=False)
+
+
+def discard_pnld_process_pool(pool):
+    """Forget a pool (e.g. after BrokenProcessPool) so the next batch starts a fresh one."""
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None and pool is _process_pool[2]:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _retire_pool(pool):
+    # Called with the lock held; batches still holding the pool keep using it
+    if pool not in _process_pool_users:
+        pool.shutdown(wait=False)
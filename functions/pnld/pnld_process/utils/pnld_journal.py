@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+
+from pnld_process.utils.pnld_settings import JOURNAL_BACKEND, JOURNAL_PATH, JOURNAL_RETENTION_HOURS
+
+# Outcome of a stage's Semarchy load, as reported by menu_handling / offence_handling
+LOADED = 'loaded'            # finished DONE or WARNING - the stage can be completed
+LOAD_FAILED = 'load_failed'  # finished in another terminal status - a retry submits it again
+LOAD_PENDING = 'pending'     # not submitted, or not seen to finish - a retry polls or submits it
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_journal (
+    batch_key   TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    load_id     TEXT,
+    batch_id    TEXT,
+    payload     TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (batch_key, stage)
+)
+"""
+
+
+def batch_idempotency_key(headers):
+    """
+    Idempotency key of a batch: the caller's Idempotency-Key header, or None.
+
+    Only an explicit key is journalled. The same files are legitimately
+    sent again (e.g. after a Release Package is set back to Open), and
+    nothing in the records tells such a re-run from a retry.
+    """
+    key = headers.get('Idempotency-Key') if headers is not None else None
+    if key and key.strip():
+        return key.strip()
+    return None
+
+
+class SqliteJournalStore:
+    """
+    Journal rows in a local SQLite file (WAL, so worker processes and
+    concurrent invocations can share it). Rows older than
+    `retention_seconds` are removed when the store is first opened.
+
+    The file is local to the instance: a retry routed to another instance
+    does not see it and processes the batch from the start.
+    """
+
+    def __init__(self, path, retention_seconds):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        with self._lock:
+            if not self._ready:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute(_SCHEMA)
+                    conn.execute(
+                        'DELETE FROM batch_journal WHERE updated_at < ?',
+                        (time.time() - self.retention_seconds,),
+                    )
+                self._ready = True
+
+        return closing(sqlite3.connect(self.path, timeout=30))
+
+    def load(self, batch_key):
+        """{stage: {status, load_id, batch_id, payload}} recorded for the batch."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT stage, status, load_id, batch_id, payload FROM batch_journal WHERE batch_key = ?',
+                (batch_key,),
+            ).fetchall()
+
+        return {
+            stage: {'status': status, 'load_id': load_id, 'batch_id': batch_id, 'payload': payload}
+            for stage, status, load_id, batch_id, payload in rows
+        }
+
+    def save(self, batch_key, stage, entry):
+        with self._connect() as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO batch_journal '
+                '(batch_key, stage, status, load_id, batch_id, payload, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (batch_key, stage, entry['status'], entry['load_id'], entry['batch_id'],
+                 entry['payload'], time.time()),
+            )
+
+
+class BatchJournal:
+    """
+    Stages of one batch as recorded by this and earlier invocations with the
+    same idempotency key.
+
+    - submitted(stage, load_id, batch_id): a Semarchy load was accepted; a
+      retry polls it (submitted_load) instead of submitting again.
+    - complete(stage, payload): the stage is done; a retry takes its payload
+      (JSON) and resumes at the next stage.
+    - failed(stage): the stage's load finished without loading its records;
+      a retry runs the stage again and submits a new load.
+
+    Journal writes are best effort: a failure is logged and only costs the
+    resume, never the invocation.
+    """
+
+    def __init__(self, batch_key, store=None):
+        self.batch_key = batch_key
+        self._store = store
+        self._entries = {}
+
+        if store is not None:
+            try:
+                self._entries = store.load(batch_key)
+            except Exception as e:
+                logging.warning(f"BATCH JOURNAL | Load - FAILED ({e})")
+
+        if self._entries:
+            logging.info(
+                f"BATCH JOURNAL | Resume (batch_key={batch_key}, "
+                f"stages={ {stage: entry['status'] for stage, entry in self._entries.items()} })"
+            )
+
+    def is_complete(self, stage):
+        entry = self._entries.get(stage)
+        return entry is not None and entry['status'] == 'complete'
+
+    def payload(self, stage):
+        """Payload recorded when `stage` completed, or None."""
+        if not self.is_complete(stage):
+            return None
+        payload = self._entries[stage]['payload']
+        return json.loads(payload) if payload is not None else None
+
+    def load_ids(self, stage):
+        """(load_id, batch_id) recorded for the stage, or None."""
+        entry = self._entries.get(stage)
+        if entry is None or entry['load_id'] is None:
+            return None
+        return entry['load_id'], entry['batch_id']
+
+    def submitted_load(self, stage):
+        """(load_id, batch_id) of a load submitted for a stage that did not complete, or None."""
+        if self.is_complete(stage):
+            return None
+        return self.load_ids(stage)
+
+    def submitted(self, stage, load_id, batch_id):
+        logging.info(f"BATCH JOURNAL | {stage} - SUBMITTED (load_id={load_id}, batch_id={batch_id})")
+        self._save(stage, {
+            'status': 'submitted',
+            'load_id': None if load_id is None else str(load_id),
+            'batch_id': None if batch_id is None else str(batch_id),
+            'payload': None,
+        })
+
+    def failed(self, stage):
+        logging.info(f"BATCH JOURNAL | {stage} - LOAD FAILED")
+        self._save(stage, {'status': 'failed', 'load_id': None, 'batch_id': None, 'payload': None})
+
+    def record_load(self, stage, load_outcome, payload=None):
+        """Complete `stage` only if its load was LOADED; forget a failed load so a retry submits it again."""
+        if load_outcome == LOADED:
+            self.complete(stage, payload)
+        elif load_outcome == LOAD_FAILED:
+            self.failed(stage)
+        else:
+            logging.info(f"BATCH JOURNAL | {stage} - NOT COMPLETE (load {load_outcome})")
+
+    def complete(self, stage, payload=None, load_id=None, batch_id=None):
+        previous = self._entries.get(stage) or {}
+        logging.info(f"BATCH JOURNAL | {stage} - COMPLETE")
+
+        try:
+            encoded = json.dumps(payload) if payload is not None else None
+        except (TypeError, ValueError) as e:
+            logging.warning(f"BATCH JOURNAL | {stage} - NOT RECORDED ({e})")
+            return
+
+        self._save(stage, {
+            'status': 'complete',
+            'load_id': str(load_id) if load_id is not None else previous.get('load_id'),
+            'batch_id': str(batch_id) if batch_id is not None else previous.get('batch_id'),
+            'payload': encoded,
+        })
+
+    def _save(self, stage, entry):
+        self._entries[stage] = entry
+        if self._store is None:
+            return
+        try:
+            self._store.save(self.batch_key, stage, entry)
+        except Exception as e:
+            logging.warning(f"BATCH JOURNAL | {stage} - WRITE FAILED ({e})")
+
+
+def _build_store():
+    if JOURNAL_BACKEND == 'off':
+        return None
+    if JOURNAL_BACKEND != 'sqlite':
+        logging.warning(f"BATCH JOURNAL | Unknown backend '{JOURNAL_BACKEND}' - using 'sqlite'")
+    return SqliteJournalStore(JOURNAL_PATH, JOURNAL_RETENTION_HOURS * 3600)
+
+
+# One store per worker process
+journal_store = _build_store()
+
+
+def open_batch_journal(batch_key):
+    """
+    BatchJournal for the batch; an in-memory one (nothing resumed or
+    recorded) when the journal is off or the request has no idempotency key.
+    """
+    if batch_key is None:
+        return BatchJournal(None)
+    return BatchJournal(batch_key, journal_store)
@@ -0,0 +1,68 @@
+import logging
+import asyncio
+
+# Marks the end of the input on a stage queue
+_END = object()
+
+
+async def run_pipeline(items, stages, queue_size, on_error=None):
+    """
+    Push `items` through `stages` - a list of (name, handle, concurrency) - with
+    a bounded asyncio.Queue of `queue_size` between consecutive stages.
+
+    Each stage runs `concurrency` workers calling `await handle(item)`. The
+    returned item goes on to the next stage; None means the item is finished
+    (the handler has recorded its result). When a handler raises, the item
+    leaves the pipeline and `on_error(item, stage_name)` is called from the
+    except block, so the caller can record a result for it (without
+    `on_error` the exception is only logged). When a stage falls behind, its inbox fills and the
+    stage before it waits - backpressure reaches all the way to `items`.
+
+    `items` may be an iterable or an async iterable; each item is a dict with
+    a 'tag' used in the log.
+    """
+    queues = [asyncio.Queue(maxsize=max(1, queue_size)) for _ in stages]
+
+    async def _feed():
+        try:
+            if hasattr(items, "__aiter__"):
+                async for item in items:
+                    await queues[0].put(item)
+            else:
+                for item in items:
+                    await queues[0].put(item)
+        finally:
+            # Even if reading the input fails, the stages drain and stop
+            await queues[0].put(_END)
+
+    async def _stage(position, name, handle, concurrency):
+        inbox = queues[position]
+        outbox = queues[position + 1] if position + 1 < len(queues) else None
+
+        async def _run():
+            while True:
+                item = await inbox.get()
+                if item is _END:
+                    # Let the other workers of this stage see it too
+                    await inbox.put(_END)
+                    return
+                try:
+                    item = await handle(item)
+                except Exception as e:
+                    if on_error is None:
+                        logging.exception(f"FILE HANDLING | {item.get('tag')} - ERROR ({name}) - {e}")
+                    else:
+                        on_error(item, name)
+                    continue
+                if item is not None and outbox is not None:
+                    await outbox.put(item)
+
+        await asyncio.gather(*(_run() for _ in range(max(1, concurrency))))
+        if outbox is not None:
+            await outbox.put(_END)
+
+    await asyncio.gather(
+        _feed(),
+        *(_stage(position, name, handle, concurrency)
+          for position, (name, handle, concurrency) in enumerate(stages)),
+    )
@@ -0,0 +1,99 @@
+import logging
+
+# Shared empty value for the entities a file does not produce (never mutated)
+_NONE = ()
+
+
+class PnldFileResult:
+    """
+    Outcome of processing one PNLD file.
+
+    - `source_file`: its SourceFile record
+    - `messages`: SourceFileMessage records
+    - `offence`: its OffenceRevision record, or None
+    - `menus` / `menu_options`: Menu and MenuOptions records
+    - `stages`: FileStages timings of the file (never posted to Semarchy), or None
+
+    Records are already in Semarchy's shape; PnldBatchResult gathers them
+    per entity, so no per-file dict of lists is built.
+    """
+
+    __slots__ = ("source_file", "messages", "offence", "menus", "menu_options", "stages")
+
+    def __init__(self, source_file, messages=_NONE, offence=None, menus=_NONE, menu_options=_NONE):
+        self.source_file = source_file
+        self.messages = messages
+        self.offence = offence
+        self.menus = menus
+        self.menu_options = menu_options
+        self.stages = None
+
+    @classmethod
+    def failed(cls, xml_file_id, messages, status="Failed"):
+        """A file that produced no offence: its status and messages only."""
+        return cls(
+            {
+                "SourceFileID": xml_file_id,
+                "FID_SourceStatus": status,
+                "MessageCount": len(messages),
+            },
+            messages,
+        )
+
+    def to_dict(self):
+        """The per-file dict returned before PnldFileResult (SourceFile, SourceFileMessage, ...)."""
+        return {
+            "SourceFile": [self.source_file],
+            "SourceFileMessage": list(self.messages),
+            "OffenceRevision": [self.offence] if self.offence is not None else [],
+            "Menu": list(self.menus),
+            "MenuOptions": list(self.menu_options),
+        }
+
+
+class PnldBatchResult:
+    """
+    Per-entity records of a batch, collated as each file completes.
+
+    SourceFile and OffenceRevision hold at most one record per file, so they
+    are sized for the batch up front and filled at the file's position (the
+    output keeps batch order whatever order files finish in); the other
+    entities are appended. Call finish() once every file has been added.
+    """
+
+    __slots__ = ("source_files", "messages", "offences", "menus", "menu_options")
+
+    def __init__(self, size=0):
+        self.source_files = [None] * size
+        self.offences = [None] * size
+        self.messages = []
+        self.menus = []
+        self.menu_options = []
+
+    @classmethod
+    def collate(cls, results):
+        """PnldBatchResult of an already complete list of PnldFileResult."""
+        batch = cls(len(results))
+        for index, result in enumerate(results):
+            batch.add(index, result)
+        return batch.finish()
+
+    def add(self, index, result):
+        """Collate the PnldFileResult of the file at `index` (0-based) in the batch."""
+        self.source_files[index] = result.source_file
+        self.offences[index] = result.offence
+        self.messages.extend(result.messages)
+        self.menus.extend(result.menus)
+        self.menu_options.extend(result.menu_options)
+
+    def finish(self):
+        """Drop the positions of files without a SourceFile / OffenceRevision."""
+        self.source_files = [record for record in self.source_files if record is not None]
+        self.offences = [record for record in self.offences if record is not None]
+
+        logging.info(
+            f"FILE HANDLING | Collation - SUCCESS (source_files={len(self.source_files)}, "
+            f"messages={len(self.messages)}, offences={len(self.offences)}, "
+            f"menus={len(self.menus)}, menu_options={len(self.menu_options)})"
+        )
+        return self
@@ -0,0 +1,79 @@
+import os
+import logging
+import tempfile
+
+
+def int_setting(name, default):
+    """
+    Read an integer Application Setting, falling back to `default`
+    when it is missing or not a valid integer.
+    """
+    raw = os.getenv(name)
+
+    if raw is None or raw.strip() == "":
+        return default
+
+    try:
+        return int(raw)
+    except ValueError:
+        logging.warning(f"PNLD SETTINGS | Invalid integer for {name} ({raw!r}) - using default {default}")
+        return default
+
+
+# Seconds an Open Release Package ID is reused before it is looked up again (0 disables the cache)
+RP_CACHE_SECONDS = int_setting("PnldReleasePackageCacheSeconds", 30)
+
+# Lock serialising Release Package creation: "blob" (lease across all instances),
+# "local" (this host only) or "auto" (blob when AzureWebJobsStorage is a real account)
+RP_LOCK_BACKEND = (os.getenv("PnldReleasePackageLock") or "auto").strip().lower()
+
+# Blob container holding the Release Package creation lease
+RP_LOCK_CONTAINER = os.getenv("PnldReleasePackageLockContainer") or "pnld-locks"
+
+# Seconds to wait for the creation lock before giving up
+RP_LOCK_WAIT_SECONDS = int_setting("PnldReleasePackageLockWaitSeconds", 120)
+
+# Seconds a cached XSD is used as-is; after that it is still served while a background refresh runs
+XSD_CACHE_SECONDS = int_setting("PnldXsdCacheSeconds", 900)
+
+# Seconds after which a cached XSD is no longer served and is fetched before use
+XSD_MAX_STALE_SECONDS = int_setting("PnldXsdMaxStaleSeconds", 3600)
+
+# Read timeout for the ExportSourceXSD named query
+XSD_FETCH_TIMEOUT_SECONDS = int_setting("PnldXsdFetchTimeoutSeconds", 30)
+
+# Executor backend for process_pnld_batch: "thread", "process" or "auto"
+EXECUTOR_BACKEND = (os.getenv("PnldProcessExecutor") or "thread").strip().lower()
+
+# Files needed per extra process worker (below this, IPC outweighs the extra core)
+PROCESS_MIN_FILES_PER_WORKER = int_setting("PnldProcessMinFilesPerWorker", 4)
+
+# Concurrent network-bound pipeline steps (content fetch, baseline lookup) in process_pnld_batch
+PIPELINE_NETWORK_CONCURRENCY = int_setting("PnldPipelineNetworkConcurrency", 8)
+
+# Files held between two pipeline stages before the earlier stage waits
+PIPELINE_QUEUE_SIZE = int_setting("PnldPipelineQueueSize", 16)
+
+# Transformation cache for re-submitted files: "disk" (local to the instance) or "off"
+TRANSFORM_CACHE_BACKEND = (os.getenv("PnldTransformCache") or "disk").strip().lower()
+
+# Directory of the disk transformation cache
+TRANSFORM_CACHE_DIR = os.getenv("PnldTransformCacheDir") or os.path.join(tempfile.gettempdir(), "pnld-transform-cache")
+
+# Size of the disk transformation cache; least recently used entries are evicted beyond it
+TRANSFORM_CACHE_MAX_BYTES = int_setting("PnldTransformCacheMaxBytes", 268435456)
+
+# Batch journal used to resume a retried invocation: "sqlite" (file local to the instance) or "off"
+JOURNAL_BACKEND = (os.getenv("PnldBatchJournal") or "sqlite").strip().lower()
+
+# SQLite file of the batch journal
+JOURNAL_PATH = os.getenv("PnldBatchJournalPath") or os.path.join(tempfile.gettempdir(), "pnld-batch-journal.sqlite3")
+
+# Hours a batch's journal entries are kept for retries
+JOURNAL_RETENTION_HOURS = int_setting("PnldBatchJournalRetentionHours", 24)
+
+# Local telemetry exporter for spans and metrics when Application Insights is not set up: "console", "file" or "none"
+TELEMETRY_EXPORTER = (os.getenv("PnldTelemetryExporter") or "none").strip().lower()
+
+# JSON-lines file written by the "file" telemetry exporter
+TELEMETRY_FILE = os.getenv("PnldTelemetryFile") or os.path.join(tempfile.gettempdir(), "pnld-telemetry.jsonl")
@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+
+from pnld_process.utils.file_handling.helpers.xsd_cache import get_cached_xsd
+from pnld_process.utils.file_handling.helpers.xsd_handling import (
+    get_compiled_schema,
+    get_xml_parser,
+    thread_xsd_digest,
+)
+from pnld_process.utils.file_handling.helpers.pnld_flattening import FLATTEN_CONFIG, compiled_flatten_xpaths
+from pnld_process.utils.file_handling.helpers.pnld_cleansing import CLEANSE_CONFIG, compile_cleanse_rules
+from pnld_process.utils.file_handling.helpers.transform_cache import ruleset_version
+from pnld_process.utils.release_package_handling.helpers.release_package_resolver import resolver
+
+# Seconds a warm-up thread waits for the others before the barrier gives up - kept
+# short, as a waiting thread is a default-executor thread that no other work can use
+_THREAD_BARRIER_SECONDS = 2
+
+# Default-executor threads never taken by the warm-up, so to_thread calls made
+# meanwhile (e.g. a batch arriving early) are not queued behind the barrier
+_FREE_THREADS = 2
+
+
+def preload_rules():
+    """
+    Per-process artefacts: the flatten config, the cleanse rules (read,
+    sorted and compiled) and the ruleset version of the transformation cache.
+    """
+    compiled_flatten_xpaths(os.path.join(os.getcwd(), FLATTEN_CONFIG))
+    compile_cleanse_rules(CLEANSE_CONFIG)
+    ruleset_version()
+
+
+def preload_thread(xsd_encoded):
+    """
+    Per-thread artefacts: the XML parser, the flatten XPaths and, when the
+    XSD is known, its compiled XMLSchema and digest.
+    """
+    get_xml_parser()
+    compiled_flatten_xpaths(os.path.join(os.getcwd(), FLATTEN_CONFIG))
+    if xsd_encoded is not None:
+        get_compiled_schema(xsd_encoded)
+        thread_xsd_digest(xsd_encoded)
+
+
+def default_thread_count():
+    """Threads of asyncio's default executor, which runs the pipeline's CPU stages on the thread backend."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def preload_thread_count(threads=None):
+    """Threads to preload: `threads` (default: all), always leaving _FREE_THREADS of the executor free."""
+    limit = max(1, default_thread_count() - _FREE_THREADS)
+    return min(threads or limit, limit)
+
+
+async def _preload_threads(xsd_encoded, threads):
+    """
+    Run preload_thread on `threads` distinct threads of the default executor.
+    Each waits at a barrier once done, so no thread picks up a second call;
+    returns the number of threads preloaded. Callers keep `threads` below
+    the executor's size (see preload_thread_count).
+    """
+    barrier = threading.Barrier(threads)
+
+    def _preload():
+        preload_thread(xsd_encoded)
+        try:
+            barrier.wait(timeout=_THREAD_BARRIER_SECONDS)
+        except threading.BrokenBarrierError:
+            pass  # fewer threads than expected - the rest compile on first use
+        return threading.get_ident()
+
+    idents = await asyncio.gather(*(asyncio.to_thread(_preload) for _ in range(threads)))
+    return len(set(idents))
+
+
+async def warm_up(threads=None):
+    """
+    Load and compile everything the first batch on this instance would
+    otherwise pay for inside its own latency:
+
+      - XSD fetched into the worker's cache
+      - Open Release Package looked up (never created - that is left to a batch)
+      - flatten config, compiled cleanse rules and ruleset version
+      - compiled XSD, XML parser and flatten XPaths on the executor threads
+        (all but _FREE_THREADS of them; the rest compile on first use)
+
+    Each step is best effort: a failure is logged and leaves that step to
+    the first batch. Returns {step: seconds} of the steps that succeeded.
+    """
+    threads = preload_thread_count(threads)
+    timings = {}
+    logging.info(f"WARMUP | START (threads={threads})")
+
+    async def _step(name, run):
+        start = time.perf_counter()
+        try:
+            result = await run
+        except Exception as e:
+            logging.warning(f"WARMUP | {name} - FAILED ({e})")
+            return None
+        timings[name] = round(time.perf_counter() - start, 3)
+        logging.info(f"WARMUP | {name} - SUCCESS (seconds={timings[name]})")
+        return result
+
+    # Network lookups and config compilation overlap
+    xsd_encoded, _, _ = await asyncio.gather(
+        _step("xsd", asyncio.to_thread(get_cached_xsd)),
+        _step("release_package", asyncio.to_thread(resolver.lookup)),
+        _step("rules", asyncio.to_thread(preload_rules)),
+    )
+
+    preloaded = await _step("threads", _preload_threads(xsd_encoded, threads))
+
+    logging.info(f"WARMUP | COMPLETE (threads_preloaded={preloaded}, steps={timings})")
+    return timings
@@ -0,0 +1,184 @@
+import os
+import logging
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from pnld_process.utils.pnld_settings import RP_LOCK_BACKEND, RP_LOCK_CONTAINER, RP_LOCK_WAIT_SECONDS
+
+LOCK_NAME = "pnld-release-package-creation"
+
+
+class LocalCreationLock:
+    """
+    Local stand-in for the blob lease, for development and tests.
+
+    Serialises creation between threads of this worker and, through an
+    flock on a file in the temp directory, between worker processes on the
+    same host. It does not reach other instances of the Function App.
+    """
+
+    def __init__(self, path=None, wait_seconds=RP_LOCK_WAIT_SECONDS):
+        self.path = path or os.path.join(tempfile.gettempdir(), f"{LOCK_NAME}.lock")
+        self.wait_seconds = wait_seconds
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.wait_seconds
+
+        if not self._thread_lock.acquire(timeout=self.wait_seconds):
+            raise TimeoutError(f"Release Package creation lock not acquired within {self.wait_seconds}s")
+
+        if fcntl is None:
+            return self
+
+        self._file = open(self.path, "a")
+        while True:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self._release()
+                    raise TimeoutError(f"Release Package creation lock not acquired within {self.wait_seconds}s")
+                time.sleep(0.1)
+
+    def __exit__(self, *exc):
+        self._release()
+
+    def _release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+class BlobLeaseLock:
+    """
+    Creation lock shared by every instance of the Function App: a lease on
+    an empty blob in the AzureWebJobsStorage account.
+
+    The lease is taken for 60s and renewed every 20s while held, so a
+    worker that dies mid-creation releases it within a minute. One instance
+    is shared by the worker's threads: a thread lock serialises them before
+    the lease is taken, as the lease, renewal thread and stop event are
+    per holder.
+    """
+
+    LEASE_SECONDS = 60
+    RENEW_SECONDS = 20
+
+    def __init__(self, connection_string, container=RP_LOCK_CONTAINER, wait_seconds=RP_LOCK_WAIT_SECONDS):
+        # Imported here so the package is only needed where the blob lock is used
+        from azure.storage.blob import BlobServiceClient
+
+        service = BlobServiceClient.from_connection_string(connection_string)
+        self._container = service.get_container_client(container)
+        self._blob = self._container.get_blob_client(LOCK_NAME)
+        self.wait_seconds = wait_seconds
+        self._thread_lock = threading.Lock()
+        self._lease = None
+        self._stop_renewal = threading.Event()
+        self._renewal = None
+
+    def _ensure_blob(self):
+        from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+        try:
+            self._blob.upload_blob(b"", overwrite=False)
+        except ResourceExistsError:
+            pass
+        except ResourceNotFoundError:
+            try:
+                self._container.create_container()
+            except ResourceExistsError:
+                pass
+            try:
+                self._blob.upload_blob(b"", overwrite=False)
+            except ResourceExistsError:
+                pass
+
+    def __enter__(self):
+        from azure.core.exceptions import HttpResponseError
+
+        deadline = time.monotonic() + self.wait_seconds
+
+        if not self._thread_lock.acquire(timeout=self.wait_seconds):
+            raise TimeoutError(f"Release Package creation lock not acquired within {self.wait_seconds}s")
+
+        try:
+            self._ensure_blob()
+            while True:
+                try:
+                    self._lease = self._blob.acquire_lease(lease_duration=self.LEASE_SECONDS)
+                    break
+                except HttpResponseError as e:
+                    # 409 - another instance holds the lease
+                    if e.status_code != 409 or time.monotonic() >= deadline:
+                        raise
+                    time.sleep(1)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+        logging.info("RELEASE PACKAGE HANDLING | Creation Lock - ACQUIRED (blob_lease)")
+        self._stop_renewal.clear()
+        self._renewal = threading.Thread(target=self._renew, daemon=True)
+        self._renewal.start()
+        return self
+
+    def _renew(self):
+        lease = self._lease
+        while not self._stop_renewal.wait(self.RENEW_SECONDS):
+            try:
+                lease.renew()
+            except Exception as e:
+                logging.warning(f"RELEASE PACKAGE HANDLING | Creation Lock - RENEW FAILED ({e})")
+                return
+
+    def __exit__(self, *exc):
+        self._stop_renewal.set()
+        if self._renewal is not None:
+            self._renewal.join()
+        try:
+            self._lease.release()
+        except Exception as e:
+            # An unreleased lease expires on its own after LEASE_SECONDS
+            logging.warning(f"RELEASE PACKAGE HANDLING | Creation Lock - RELEASE FAILED ({e})")
+        self._lease = None
+        self._renewal = None
+        self._thread_lock.release()
+
+
+def _blob_available(connection_string):
+    if not connection_string or connection_string.startswith("UseDevelopmentStorage"):
+        return False
+    try:
+        import azure.storage.blob  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_creation_lock(backend=RP_LOCK_BACKEND):
+    """
+    Lock serialising Release Package creation, chosen by PnldReleasePackageLock.
+    "auto" uses the blob lease when AzureWebJobsStorage points at a real
+    account and azure-storage-blob is installed, otherwise the local lock.
+    """
+    connection_string = os.getenv("AzureWebJobsStorage")
+
+    if backend == "blob" or (backend == "auto" and _blob_available(connection_string)):
+        return BlobLeaseLock(connection_string)
+
+    if backend not in ("auto", "local"):
+        logging.warning(f"RELEASE PACKAGE HANDLING | Unknown lock backend {backend!r} - using local")
+
+    return LocalCreationLock()
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from pnld_process.utils.pnld_settings import RP_CACHE_SECONDS
+from pnld_process.utils.release_package_handling.helpers.get_release_package import get_release_package
+from pnld_process.utils.release_package_handling.helpers.release_package_lock import get_creation_lock
+
+
+class _Flight:
+    """One Release Package lookup in progress, shared by every caller that joins it."""
+
+    __slots__ = ("started", "future")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.future = Future()
+
+
+class ReleasePackageResolver:
+    """
+    Release Package lookups shared across the invocations of one worker.
+
+    - Single-flight: concurrent lookups join the one already in progress
+      instead of each calling GetReleasePackagePNLD.
+    - An Open Release Package ID is reused for `ttl_seconds`.
+    - Creation runs under `creation_lock` and first checks again, so
+      notifications arriving together create one Release Package, not one each.
+
+    Thread-safe; pnld_process calls it from worker threads.
+    """
+
+    def __init__(self, retrieve=get_release_package, ttl_seconds=RP_CACHE_SECONDS, creation_lock=None):
+        self._retrieve = retrieve
+        self.ttl_seconds = ttl_seconds
+        self._creation_lock = creation_lock
+        self._lock = threading.Lock()
+        self._flight = None
+        self._cached = None  # (rp_id, rp_status, expires_at)
+        self._changed_at = 0.0
+
+    @property
+    def creation_lock(self):
+        # Built on first use, so a blob lock is only set up when a creation is needed
+        with self._lock:
+            if self._creation_lock is None:
+                self._creation_lock = get_creation_lock()
+            return self._creation_lock
+
+    def invalidate(self):
+        """Forget the cached ID; lookups already in flight are no longer joined."""
+        with self._lock:
+            self._cached = None
+            self._changed_at = time.monotonic()
+
+    def lookup(self):
+        """
+        (rp_id, rp_status) as get_release_package returns it, from the cache,
+        a lookup already in flight, or a new one. Raises what it raises.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is not None and self._cached[2] > now:
+                logging.info("RELEASE PACKAGE HANDLING | Retrieval - CACHED")
+                return self._cached[0], self._cached[1]
+
+            flight = self._flight
+            leader = flight is None or flight.started < self._changed_at
+            if leader:
+                flight = self._flight = _Flight()
+
+        if not leader:
+            logging.info("RELEASE PACKAGE HANDLING | Retrieval - JOINED (lookup in flight)")
+            return flight.future.result()
+
+        try:
+            result = self._retrieve()
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._flight is flight:
+                    self._flight = None
+
+        with self._lock:
+            # Only an Open package is reused, and only if nothing changed during the lookup
+            if result[1] == "Open" and self.ttl_seconds > 0 and flight.started >= self._changed_at:
+                self._cached = (result[0], result[1], time.monotonic() + self.ttl_seconds)
+
+        flight.future.set_result(result)
+        return result
+
+    def create_if_missing(self, create):
+        """
+        Call `create` under the creation lock unless a Release Package exists
+        by the time the lock is held. Returns True if `create` was called.
+        """
+        with self.creation_lock:
+            # Another invocation or instance may have created one while we waited:
+            # trust a cached Open package, otherwise look again (not joining any
+            # lookup that started before the lock was held)
+            with self._lock:
+                cached = self._cached is not None and self._cached[2] > time.monotonic()
+            if not cached:
+                self.invalidate()
+                rp_id, rp_status = self.lookup()
+
+            if cached or rp_id is not None or rp_status is not None:
+                logging.info(
+                    "RELEASE PACKAGE HANDLING | Creation - SKIPPED (created by another invocation)"
+                )
+                return False
+
+            try:
+                create()
+            finally:
+                self.invalidate()
+
+        return True
+
+
+# One resolver per worker process
+resolver = ReleasePackageResolver()
@@ -1,12 +1,16 @@
-from pnld_process.utils.release_package_handling.helpers.get_release_package import get_release_package
+from pnld_process.utils.release_package_handling.helpers.release_package_resolver import resolver
 from pnld_process.utils.release_package_handling.helpers.create_release_package import create_release_package
 from pnld_process.utils.message_handling import add_message
 
 
-def get_release_package_id(messages):
+def get_release_package_id(messages, found=None):
     """
     Retrieves an open PNLD Release Package ID.
     If none exists, attempts to create one and then retrieve it again.
+    `found` is the (rp_id, rp_status) of a lookup already made, which then
+    replaces the first attempt.
+    Lookups go through the worker's shared resolver (single-flight, short
+    TTL cache) and creation is serialised by its creation lock.
     Logs detailed error messages into `messages` on any failure.
     Returns:
         (rp_id, messages)
@@ -16,7 +20,7 @@ def get_release_package_id(messages):
     # 1 - First attempt to retrieve an existing Release Package
     # ------------------------------------------------------------------
     try:
-        rp_id, rp_status = get_release_package()
+        rp_id, rp_status = found if found is not None else resolver.lookup()
     except Exception as e:
         messages = add_message(
             messages=messages,
@@ -34,9 +38,9 @@ def get_release_package_id(messages):
     # ------------------------------------------------------------------
     if rp_id is None and rp_status is None:
 
-        # Attempt creation
+        # Attempt creation (skipped if another invocation created one meanwhile)
         try:
-            create_release_package()
+            resolver.create_if_missing(create_release_package)
         except Exception as e:
             messages = add_message(
                 messages=messages,
@@ -51,7 +55,7 @@ def get_release_package_id(messages):
 
         # Attempt retrieval again
         try:
-            rp_id, rp_status = get_release_package()
+            rp_id, rp_status = resolver.lookup()
         except Exception as e:
             messages = add_message(
                 messages=messages,
@@ -0,0 +1,262 @@
+import re
+import json
+import logging
+
+# JSON insignificant whitespace
+_WS = re.compile(rb'[ \t\n\r]*')
+
+# Bytes that open or close a nested value (Base64 content contains none of them)
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+
+# First byte after a number / true / false / null
+_SCALAR_END = re.compile(rb'[ \t\n\r,}\]]')
+
+# Bytes a JSON string can hold as they are: printable ASCII but the backslash
+# (Base64 content has no others, so it never needs decoding to be checked)
+_PLAIN = bytes(range(0x20, 0x7F)).replace(b"\\", b"")
+
+# Record field whose value is left in the request body until the file is processed
+CONTENT_KEY = "SourceFileContent"
+
+
+class RequestBodyError(ValueError):
+    """
+    The request body is not valid JSON. Carries only the byte offset of the
+    problem, so raising it never copies or decodes the (multi-MB) body.
+    """
+
+    def __init__(self, msg, pos):
+        super().__init__(f"{msg}: byte {pos}")
+        self.msg = msg
+        self.pos = pos
+
+
+class BodyContent:
+    """
+    A record's SourceFileContent, still in the request body.
+
+    Holds the body and the span of the JSON string, so the Base64 text is only
+    decoded (load_content) when the pipeline picks the file up. The body is
+    the bytes the HttpRequest already keeps for the whole invocation, so the
+    span costs no copy; what is bounded per file is the decoded string, which
+    is released with the file once it has been parsed. The string was
+    checked during the scan (_checked_string), so decoding it does not fail.
+    """
+
+    __slots__ = ("body", "start", "end")
+
+    def __init__(self, body, start, end):
+        self.body = body
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def decode(self):
+        return json.loads(self.body[self.start:self.end])
+
+
+def load_content(xml_record):
+    """
+    The record with its SourceFileContent decoded from the request body.
+    Records that do not reference the body are returned as they are.
+    """
+    content = xml_record.get(CONTENT_KEY)
+    if not isinstance(content, BodyContent):
+        return xml_record
+    return {**xml_record, CONTENT_KEY: content.decode()}
+
+
+def _skip_ws(body, pos):
+    return _WS.match(body, pos).end()
+
+
+def _expect(body, pos, chars):
+    pos = _skip_ws(body, pos)
+    if pos >= len(body) or body[pos] not in chars:
+        raise RequestBodyError(f"Expecting one of {chars.decode()!r}", pos)
+    return pos
+
+
+def _loads(body, start, end):
+    """
+    json.loads of body[start:end], decoded as strict UTF-8 as req.get_json
+    does. A JSONDecodeError is raised again with its position in the body.
+    """
+    try:
+        return json.loads(body[start:end].decode("utf-8"))
+    except json.JSONDecodeError as e:
+        raise RequestBodyError(e.msg, start + len(e.doc[:e.pos].encode("utf-8"))) from None
+
+
+def _string_end(body, start):
+    """Index after the closing quote of the JSON string opening at `start`."""
+    pos = start + 1
+    while True:
+        end = body.find(b'"', pos)
+        if end < 0:
+            raise RequestBodyError("Unterminated string", start)
+
+        # A quote preceded by an odd number of backslashes is escaped
+        backslashes = 0
+        while body[end - 1 - backslashes] == 0x5C:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end + 1
+        pos = end + 1
+
+
+def _value_end(body, start):
+    """Index after the JSON value starting at `start` (not decoded)."""
+    first = body[start:start + 1]
+
+    if first == b'"':
+        return _string_end(body, start)
+
+    if first in (b'{', b'['):
+        depth = 0
+        pos = start
+        while True:
+            match = _STRUCTURAL.search(body, pos)
+            if match is None:
+                raise RequestBodyError("Unterminated value", start)
+            pos = match.start()
+            char = body[pos:pos + 1]
+            if char == b'"':
+                pos = _string_end(body, pos)
+                continue
+            depth += 1 if char in (b'{', b'[') else -1
+            pos += 1
+            if depth == 0:
+                return pos
+
+    match = _SCALAR_END.search(body, start)
+    return match.start() if match else len(body)
+
+
+def _members(body, pos):
+    """
+    Yield (key, value_start, value_end) for the object opening at `pos`,
+    then return the index after its closing brace.
+    """
+    pos = _skip_ws(body, pos + 1)
+    if body[pos:pos + 1] == b'}':
+        return pos + 1
+
+    while True:
+        pos = _expect(body, pos, b'"')
+        key_end = _string_end(body, pos)
+        key = _loads(body, pos, key_end)
+
+        pos = _expect(body, key_end, b':')
+        value_start = _skip_ws(body, pos + 1)
+        value_end = _value_end(body, value_start)
+        yield key, value_start, value_end
+
+        pos = _expect(body, value_end, b',}')
+        if body[pos:pos + 1] == b'}':
+            return pos + 1
+        pos += 1
+
+
+def _checked_string(body, start, end):
+    """
+    Check the JSON string at body[start:end] as json.loads would (escapes,
+    control characters, UTF-8), so malformed content fails the request
+    rather than its file later. Plain printable ASCII - all Base64 content -
+    is valid as it is, which bytes.translate finds far faster than a regex
+    search (from a transient copy of the raw bytes, not a decoded string);
+    only a string with escapes or other bytes is decoded, and dropped.
+    """
+    if body[start + 1:end - 1].translate(None, _PLAIN):
+        _loads(body, start, end)
+
+
+def _record(body, start):
+    """One notification record; SourceFileContent is kept as a BodyContent span."""
+    if body[start:start + 1] != b'{':
+        return _loads(body, start, _value_end(body, start))
+
+    record = {}
+    for key, value_start, value_end in _members(body, start):
+        if key == CONTENT_KEY and body[value_start:value_start + 1] == b'"':
+            _checked_string(body, value_start, value_end)
+            record[key] = BodyContent(body, value_start, value_end)
+        else:
+            record[key] = _loads(body, value_start, value_end)
+    return record
+
+
+def _records(body, start):
+    """Records of the array opening at `start`, decoded one at a time."""
+    records = []
+
+    pos = _skip_ws(body, start + 1)
+    if body[pos:pos + 1] == b']':
+        return records
+
+    while True:
+        pos = _skip_ws(body, pos)
+        end = _value_end(body, pos)
+        records.append(_record(body, pos))
+
+        pos = _expect(body, end, b',]')
+        if body[pos:pos + 1] == b']':
+            return records
+        pos += 1
+
+
+def decode_request_records(body):
+    """
+    Decode the 'records' of a pnld_process request body without decoding the
+    SourceFileContent strings: each record's small attributes are read, and
+    its content is left in `body` as a BodyContent span (see load_content).
+
+    Returns:
+        (records, error) - error is None, 'body_is_not_json_object' or
+        "'records'_not_array", as the REQUEST HANDLING log reports it.
+
+    Raises:
+        ValueError: when the body is not valid JSON, exactly when req.get_json
+        would (RequestBodyError, or UnicodeDecodeError for invalid UTF-8).
+        Values the request does not use are still checked with json.loads.
+        benchmarks.pnld_request_decoding checks both against json.loads.
+    """
+    body = bytes(body or b"")
+
+    pos = _skip_ws(body, 0)
+    if body[pos:pos + 1] != b'{':
+        _loads(body, 0, len(body))  # raises for invalid JSON
+        return None, "body_is_not_json_object"
+
+    records = []
+    members = _members(body, pos)
+    try:
+        while True:
+            key, value_start, value_end = next(members)
+            if key != "records":
+                _loads(body, value_start, value_end)  # unused, but must be valid JSON
+                continue
+            if body[value_start:value_start + 1] != b'[':
+                _loads(body, value_start, value_end)  # raises for invalid JSON
+                records = None
+            else:
+                records = _records(body, value_start)
+    except StopIteration as done:
+        end = done.value
+
+    if _skip_ws(body, end) != len(body):
+        raise RequestBodyError("Extra data", end)
+
+    if records is None:
+        return None, "'records'_not_array"
+
+    content_bytes = sum(len(r.get(CONTENT_KEY)) for r in records
+                        if isinstance(r, dict) and isinstance(r.get(CONTENT_KEY), BodyContent))
+    logging.info(
+        f"REQUEST HANDLING | Decode - SUCCESS (records={len(records)}, "
+        f"deferred_content_bytes={content_bytes})"
+    )
+
+    return records, None
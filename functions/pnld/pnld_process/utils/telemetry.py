@@ -0,0 +1,239 @@
+import os
+import json
+import math
+import time
+import logging
+from contextlib import contextmanager
+
+from pnld_process.utils.pnld_settings import TELEMETRY_EXPORTER, TELEMETRY_FILE
+
+try:
+    from opentelemetry import metrics, trace
+except ImportError:  # opentelemetry-api not installed - values are still logged
+    metrics = trace = None
+
+_meter = metrics.get_meter('pnld_process') if metrics is not None else None
+_tracer = trace.get_tracer('pnld_process') if trace is not None else None
+
+if _meter is not None:
+    _xsd_fetch_seconds = _meter.create_histogram(
+        'pnld.xsd.fetch.duration', unit='s',
+        description='ExportSourceXSD named query latency',
+    )
+    _xsd_age_seconds = _meter.create_histogram(
+        'pnld.xsd.age', unit='s',
+        description='Age of the XSD handed to file processing (staleness of the cached copy)',
+    )
+    _transform_cache_lookups = _meter.create_counter(
+        'pnld.transform_cache.lookups', unit='1',
+        description='Transformation cache lookups by stage and outcome (hit rate = hit / all)',
+    )
+    _file_stage_seconds = _meter.create_histogram(
+        'pnld.file_stage.duration', unit='s',
+        description='Duration of one pnld_file_handling stage for one file, by stage and outcome',
+    )
+else:
+    _xsd_fetch_seconds = _xsd_age_seconds = _transform_cache_lookups = _file_stage_seconds = None
+
+
+def record_xsd_fetch(seconds, outcome):
+    """
+    One ExportSourceXSD call. `outcome` is 'changed', 'unchanged' (same
+    digest as the cached copy), 'not_modified' (HTTP 304) or 'failed'.
+    """
+    logging.info(f"XSD CACHE | Fetch - {outcome.upper()} (seconds={seconds:.3f})")
+
+    if _xsd_fetch_seconds is not None:
+        _xsd_fetch_seconds.record(seconds, {'pnld.xsd.outcome': outcome})
+
+
+def record_xsd_age(seconds, source):
+    """
+    Staleness of the XSD returned to a caller. `source` is 'hit' (within the
+    TTL), 'stale' (past the TTL, refresh running in the background) or 'fetched'.
+    """
+    logging.info(f"XSD CACHE | Lookup - {source.upper()} (age_seconds={seconds:.1f})")
+
+    if _xsd_age_seconds is not None:
+        _xsd_age_seconds.record(seconds, {'pnld.xsd.source': source})
+
+
+def record_transform_cache(stage, outcome):
+    """
+    One transformation cache lookup. `stage` is 'parse' (XSD validation +
+    flattening) or 'transform' (cleanse, SOW/SOF transforms, text validation);
+    `outcome` is 'hit' or 'miss'.
+    """
+    logging.info(f"TRANSFORM CACHE | {stage.capitalize()} Lookup - {outcome.upper()}")
+
+    if _transform_cache_lookups is not None:
+        _transform_cache_lookups.add(1, {'pnld.transform_cache.stage': stage, 'pnld.transform_cache.outcome': outcome})
+
+
+class FileStages:
+    """
+    Timed pnld_file_handling stages of one file.
+
+    Recorded where the file is processed (a thread, or a process worker with
+    no exporter of its own) and carried back on its state / PnldFileResult;
+    BatchStageTelemetry then creates the spans in the host with the recorded
+    start and end times, as record_zip_span does for zip_extract.
+
+    - `attributes`: of the file (ID, byte size, cache use, outcome)
+    - `stages`: (name, start_ns, end_ns, attributes) in the order they ran
+    """
+
+    __slots__ = ("attributes", "stages")
+
+    def __init__(self, **attributes):
+        self.attributes = {}
+        self.stages = []
+        self.set(**attributes)
+
+    def set(self, **attributes):
+        """Set file attributes (`pnld_` prefix becomes `pnld.`); None values are dropped."""
+        self.attributes.update(_attributes(attributes))
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time one stage. Yields its attributes dict: add counts to it, and set
+        'pnld.outcome' to 'failed' when the stage rejects the file. An
+        exception records 'error' and is re-raised.
+        """
+        attributes = {'pnld.outcome': 'success'}
+        start_ns = time.time_ns()
+        try:
+            yield attributes
+        except BaseException:
+            attributes['pnld.outcome'] = 'error'
+            raise
+        finally:
+            self.stages.append((name, start_ns, time.time_ns(), _attributes(attributes)))
+
+
+def _attributes(attributes):
+    # OpenTelemetry attributes cannot be None; pnld_file_id -> pnld.file_id
+    return {key.replace('pnld_', 'pnld.', 1): value for key, value in attributes.items() if value is not None}
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class BatchStageTelemetry:
+    """
+    Stage timings of one batch. As each file completes (add), its stages are
+    recorded in the pnld.file_stage.duration histogram and as spans - a
+    'pnld_process.file' span per file with a 'pnld_process.file.<stage>'
+    child per stage, under one 'pnld_process.file_batch' span. finish() logs
+    count, p50, p95, p99 and max per stage for the batch and returns them.
+    """
+
+    def __init__(self, files):
+        self._durations = {}
+        self._span = None
+        self._context = None
+
+        if _tracer is not None:
+            self._span = _tracer.start_span('pnld_process.file_batch', attributes={'pnld.files': files})
+            self._context = trace.set_span_in_context(self._span)
+
+    def add(self, file_stages):
+        if file_stages is None or not file_stages.stages:
+            return
+
+        for name, start_ns, end_ns, attributes in file_stages.stages:
+            seconds = (end_ns - start_ns) / 1e9
+            self._durations.setdefault(name, []).append(seconds)
+            if _file_stage_seconds is not None:
+                _file_stage_seconds.record(seconds, {'pnld.stage': name, 'pnld.outcome': attributes['pnld.outcome']})
+
+        if _tracer is None:
+            return
+
+        file_span = _tracer.start_span(
+            'pnld_process.file', context=self._context,
+            start_time=file_stages.stages[0][1], attributes=file_stages.attributes,
+        )
+        file_context = trace.set_span_in_context(file_span)
+        for name, start_ns, end_ns, attributes in file_stages.stages:
+            span = _tracer.start_span(
+                f'pnld_process.file.{name}', context=file_context,
+                start_time=start_ns, attributes=attributes,
+            )
+            span.end(end_time=end_ns)
+        file_span.end(end_time=file_stages.stages[-1][2])
+
+    def finish(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms, max_ms, total_ms}} of the batch, slowest p99 first."""
+        summary = {}
+        for name, durations in self._durations.items():
+            ordered = sorted(durations)
+            summary[name] = {
+                'count': len(ordered),
+                **{f'p{int(q * 100)}_ms': round(_percentile(ordered, q) * 1e3, 2) for q in (0.5, 0.95, 0.99)},
+                'max_ms': round(ordered[-1] * 1e3, 2),
+                'total_ms': round(sum(ordered) * 1e3, 2),
+            }
+        summary = dict(sorted(summary.items(), key=lambda item: -item[1]['p99_ms']))
+
+        logging.info(f"FILE HANDLING | Stage Latency - SUMMARY {json.dumps(summary)}")
+
+        if self._span is not None:
+            self._span.end()
+        return summary
+
+
+def configure_local_exporter(exporter=TELEMETRY_EXPORTER, path=TELEMETRY_FILE):
+    """
+    Export spans and metrics without Application Insights (PnldTelemetryExporter):
+    'console' writes them to stdout, 'file' appends them to `path`, one JSON
+    object per line. Needs opentelemetry-sdk; a provider the host has already
+    set is left in place. Returns True when an exporter was installed.
+    """
+    if exporter in ('', 'none'):
+        return False
+    if exporter not in ('console', 'file'):
+        logging.warning(f"PNLD TELEMETRY | Unknown exporter '{exporter}' - nothing exported")
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+    except ImportError:
+        logging.warning("PNLD TELEMETRY | Exporter - opentelemetry-sdk not installed, nothing exported")
+        return False
+
+    if not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+        logging.info("PNLD TELEMETRY | Exporter - tracer provider already configured, local exporter not installed")
+        return False
+
+    if exporter == 'file':
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        out = open(path, 'a', encoding='utf-8', buffering=1)
+    else:
+        out = None
+
+    stream = {'out': out} if out is not None else {}
+    resource = Resource.create({'service.name': 'pnld_process'})
+
+    # One JSON object per line, so the file can be read back by benchmarks.pnld_stage_report
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+        formatter=lambda span: span.to_json(indent=None) + os.linesep, **stream,
+    )))
+    trace.set_tracer_provider(tracer_provider)
+
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[
+        PeriodicExportingMetricReader(ConsoleMetricExporter(
+            formatter=lambda data: data.to_json(indent=None) + os.linesep, **stream,
+        )),
+    ]))
+
+    logging.info(f"PNLD TELEMETRY | Exporter - {exporter.upper()} ({path if out is not None else 'stdout'})")
+    return True
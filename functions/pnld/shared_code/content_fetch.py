@@ -0,0 +1,51 @@
+import os
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# One pooled session for the life of the worker instance, shared by zip_extract and pnld_process
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=8):
+    """
+    Shared requests.Session with a connection pool of at least `pool_size`.
+
+    A caller needing a larger pool than the current session has gets a new
+    session; requests already in flight finish on the old one.
+    """
+    global _session, _session_pool_size
+    pool_size = max(1, pool_size)
+    with _session_lock:
+        if _session is None or _session_pool_size < pool_size:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pool_size = session, pool_size
+        return _session
+
+
+def fetch_named_query_content(query, params, content_key, timeout, pool_size=8):
+    """
+    Call a Semarchy Named Query (GD) for one record and return its
+    `content_key` value, or None when no record or no content came back.
+    Raises on HTTP errors.
+
+    The body is read in full - the Base64 content is needed as one string -
+    and parsed from the raw bytes, so only the body and the parsed content
+    are held, and the body only until the response is closed.
+    """
+    url = f'{os.getenv("SemarchyBaseURL")}/named-query/CSDS/{query}/GD'
+    headers = {"API-Key": os.getenv("SemarchyAPIKey")}
+
+    with get_session(pool_size).get(url, params=params, headers=headers, timeout=timeout) as response:
+        response.raise_for_status()
+        records = json.loads(response.content).get("records", [])
+
+    if not records:
+        return None
+    return records[0].get(content_key)
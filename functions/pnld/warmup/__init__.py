@@ -0,0 +1,16 @@
+import azure.functions as func
+import logging
+logging.basicConfig(level=logging.DEBUG)
+
+from pnld_process.utils.pnld_warmup import warm_up
+
+
+async def main(warmupContext: func.Context) -> None:
+    logging.info('Warmup has been activated.')
+
+    # Preload the pnld_process rule, XSD and XPath artefacts before this
+    # instance receives traffic; nothing here is allowed to fail the instance
+    try:
+        await warm_up()
+    except Exception as e:
+        logging.warning(f"WARMUP | FAILED ({e})")
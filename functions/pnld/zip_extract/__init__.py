@@ -1,14 +1,20 @@
 import azure.functions as func
 import logging
 import os
+import json
+import time
 import requests
 import asyncio
 logging.basicConfig(level=logging.DEBUG)
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 
-from zip_extract.utils.helpers.zip_define_post_body import zip_define_post_body
+from zip_extract.utils.zip_upload import upload_zip_records, outcomes_by_zip, PipelinedUploader
+from zip_extract.utils.zip_settings import UPLOAD_MODE
+from zip_extract.utils.zip_telemetry import summarise_batch
+from zip_extract.utils.zip_outcomes import select_retry_records, build_zip_outcomes
 from zip_extract.utils.zip_decompression_batch_control import process_zip_batch
+from zip_extract.utils.helpers.zip_deduplication import SourceFileDeduplicator
 
 
 async def main(req: func.HttpRequest) -> func.HttpResponse:
@@ -16,7 +22,7 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
 
     try:
 
-        # 1) ROCESS ZIP
+        # 1) PARSE REQUEST
         # Parse JSON body
         request_body = req.get_json()
         if not isinstance(request_body, dict):
@@ -37,10 +43,19 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
 
         logging.info(f"Request parsing successful. Records count: {len(input_records)}")
 
-        # Process each ZIP asynchronously
-        processed_records = await process_zip_batch(input_records, max_concurrency=8)
-
-        # 2) PREPARE & SEND Semarchy POST
+        # Re-run mode - only the listed ZIPs are re-processed (e.g. RetrySourceZIPIDs from a previous response)
+        retry_zip_ids = request_body.get("retrySourceZIPIDs")
+        skipped_zip_ids, unknown_zip_ids = [], []
+        if retry_zip_ids is not None:
+            if not isinstance(retry_zip_ids, list):
+                logging.error("Invalid 'retrySourceZIPIDs' field: expected a list.")
+                return func.HttpResponse(
+                    "Invalid 'retrySourceZIPIDs' field: expected an array.",
+                    status_code=400
+                )
+            input_records, skipped_zip_ids, unknown_zip_ids = select_retry_records(input_records, retry_zip_ids)
+
+        # 2) PREPARE Semarchy POST
         # Prepare Semarchy POST request
         post_url = f'{os.getenv("SemarchyBaseURL")}/loads/CSDS'
         api_key = os.getenv("SemarchyAPIKey")
@@ -52,32 +67,65 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
             )
 
         post_headers = {"API-Key": api_key}
-        post_body = zip_define_post_body(processed_records)
-
-        logging.info("Semarchy POST request generated.")
-        logging.debug(f"POST Body: {post_body}")
 
-        # Send POST request
-        post_response = requests.post(
-            url=post_url,
-            json=post_body, 
-            headers=post_headers, 
-            timeout=(5, 60)
+        # 3) PROCESS ZIP & SEND Semarchy POST
+        started = time.perf_counter()
+        # Repeated XML content is only skipped once a load holding the original has succeeded
+        deduplicator = SourceFileDeduplicator()
+        if UPLOAD_MODE == 'batch':
+            # Extract every ZIP, then send size-bounded loads (each ZIP kept whole) with bounded parallelism
+            processed_records = await process_zip_batch(input_records, deduplicator=deduplicator)
+            load_outcomes = await upload_zip_records(processed_records, post_url, post_headers, deduplicator)
+        else:
+            # Pipelined - loads are sent as ZIPs finish, while the remaining archives are still inflating
+            uploader = PipelinedUploader(post_url, post_headers, deduplicator)
+            processed_records = await process_zip_batch(
+                input_records, on_result=uploader.add, deduplicator=deduplicator, on_budget_wait=uploader.flush,
             )
-        logging.info("POST request sent.")
+            load_outcomes = await uploader.close()
+        logging.info(f"ZIP Batch - Duplicate Child Files Skipped: {deduplicator.skipped_count} of {deduplicator.duplicate_count}")
 
-        if post_response.status_code == 200:
-            logging.info(f"Semarchy POST Response: {post_response.status_code}")
-            return func.HttpResponse(
-                f"ZIP Extract executed successfully. Data uploaded to Semarchy - {post_response.status_code}",
-                status_code=200
-            )
+        zip_outcomes = outcomes_by_zip(load_outcomes)
+        failed_loads = [outcome for outcome in load_outcomes if outcome['StatusCode'] != 200]
+
+        logging.info(f"Semarchy Loads - Complete (loads={len(load_outcomes)}, failed={len(failed_loads)}, zips={len(zip_outcomes)})")
+
+        # 4) RESPOND with the per-ZIP outcome manifest and the batch summary (per-ZIP sizes and stage timings)
+        summary = summarise_batch(processed_records, load_outcomes, time.perf_counter() - started)
+        logging.info(f"ZIP Batch - Summary: {json.dumps({k: v for k, v in summary.items() if k != 'ZIPs'})}")
+
+        outcomes, retry_zip_ids = build_zip_outcomes(processed_records, load_outcomes)
+        failed_zips = [outcome['SourceZIPID'] for outcome in outcomes if outcome['Extraction'] in ('failed', 'deferred')]
+        if failed_zips:
+            logging.error(f"ZIP Batch - Extraction failed for {len(failed_zips)} ZIP(s): {failed_zips}")
+
+        if not failed_loads:
+            message = f"ZIP Extract executed successfully. Data uploaded to Semarchy - {len(load_outcomes)} load(s)"
+            if failed_zips:
+                message += f" - extraction failed for {len(failed_zips)} ZIP(s), see Outcomes"
+            status_code = 200
         else:
-            logging.error(f"Semarchy POST failed: {post_response.status_code} - {post_response.text}")
-            return func.HttpResponse(
-                f"ZIP Extract executed successfully, but upload failed - {post_response.status_code} - {post_response.text}",
-                status_code=500
+            failed_summary = "; ".join(
+                f"ZIPs {outcome['SourceZIPIDs']} - {outcome['StatusCode']} - {outcome['Error']}"
+                for outcome in failed_loads
             )
+            logging.error(f"Semarchy POST failed for {len(failed_loads)} load(s): {failed_summary}")
+            message = f"ZIP Extract executed successfully, but upload failed for {len(failed_loads)} of {len(load_outcomes)} load(s) - {failed_summary}"
+            status_code = 500
+
+        return func.HttpResponse(
+            json.dumps({
+                'Message': message,
+                'Outcomes': outcomes,
+                # Send these back as retrySourceZIPIDs (with the same records) to re-process only them
+                'RetrySourceZIPIDs': retry_zip_ids,
+                'SkippedSourceZIPIDs': skipped_zip_ids,
+                'UnknownSourceZIPIDs': unknown_zip_ids,
+                'Summary': summary,
+            }),
+            status_code=status_code,
+            mimetype='application/json'
+        )
 
     # CAPTURE EXCEPTIONS 
     except requests.exceptions.HTTPError as http_err:
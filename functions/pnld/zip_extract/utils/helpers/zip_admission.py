@@ -0,0 +1,184 @@
+import io
+import re
+import base64
+import asyncio
+import zipfile
+import logging
+
+from zip_extract.utils.helpers.zip_manifest import ZipManifest
+
+_NON_ALPHABET = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+class _OutsideTail(Exception):
+    """Raised when zipfile tries to read before the decoded tail."""
+
+
+class _TailView(io.RawIOBase):
+    """
+    Read-only file object exposing only the last bytes of a decoded ZIP at
+    their real offsets. Enough for zipfile to read the end-of-central-directory
+    record and the central directory without decoding the whole archive.
+    """
+
+    def __init__(self, tail, total_size):
+        self._tail = tail
+        self._offset = total_size - len(tail)
+        self._size = total_size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        self._pos = max(0, pos)
+        return self._pos
+
+    def read(self, size=-1):
+        if self._pos >= self._size:
+            return b''
+        if self._pos < self._offset:
+            raise _OutsideTail()
+        end = self._size if size is None or size < 0 else min(self._size, self._pos + size)
+        data = self._tail[self._pos - self._offset:end - self._offset]
+        self._pos = end
+        return data
+
+
+def decoded_length(encoded):
+    """Length of the bytes `encoded` decodes to, or None if it is not plain (unwrapped) Base64."""
+    if not encoded or len(encoded) % 4 or _NON_ALPHABET.search(encoded):
+        return None
+    padding = 2 if encoded.endswith('==') else 1 if encoded.endswith('=') else 0
+    return len(encoded) // 4 * 3 - padding
+
+
+def peek_zip_manifest(encoded, tail_bytes):
+    """
+    Build a ZipManifest by decoding only the last `tail_bytes` of the archive.
+
+    Returns (manifest, status) where status is:
+      - 'ok':        manifest built from the central directory
+      - 'not_zip':   no end-of-central-directory record - process_zip will fail it
+      - 'unknown':   central directory is larger than the tail, or the content is
+                     not plain Base64 - the caller must estimate
+    """
+    total_size = decoded_length(encoded)
+    if total_size is None:
+        return None, 'unknown'
+
+    tail_chars = min(len(encoded), -(-tail_bytes // 3) * 4)
+    tail = base64.b64decode(encoded[len(encoded) - tail_chars:])
+
+    try:
+        with zipfile.ZipFile(_TailView(tail, total_size), 'r') as zip_ref:
+            return ZipManifest.from_zipfile(zip_ref), 'ok'
+    except _OutsideTail:
+        return None, 'unknown'
+    except (zipfile.BadZipFile, OSError, ValueError):
+        return None, 'not_zip'
+
+
+def estimate_zip_cost(zip_record, tail_bytes, assumed_inflation_ratio, spool_max_bytes, encode_chunk_bytes):
+    """
+    Memory cost used for admission, in bytes: the decoded archive kept in the
+    in-memory spool (up to `spool_max_bytes`), the Base64 of every XML member
+    (held on the result until it is uploaded), and the encode buffers - one
+    chunk and its Base64, plus a second copy of the largest member's Base64 while its pieces
+    are joined.
+
+    Inflated sizes come from the central directory. When it cannot be read
+    from the tail, the XML is assumed to be one member of decoded size x
+    `assumed_inflation_ratio`.
+    """
+    encoded = zip_record.get('ZIPFileContent') or ''
+    manifest, status = peek_zip_manifest(encoded, tail_bytes)
+
+    decoded = decoded_length(encoded)
+    if decoded is None:
+        decoded = len(encoded) * 3 // 4
+    spooled = min(decoded, spool_max_bytes)
+
+    if status == 'ok':
+        inflated = [entry.file_size for entry in manifest.xml_entries]
+    elif status == 'not_zip':
+        return spooled
+    else:
+        logging.info(
+            f"ZIP File ID: {zip_record.get('SourceZIPID')} - Central directory not readable from tail "
+            f"- estimating inflated size (ratio={assumed_inflation_ratio})"
+        )
+        inflated = [decoded * assumed_inflation_ratio]
+
+    if not inflated:
+        return spooled
+
+    encoded_sizes = [-(-size // 3) * 4 for size in inflated]
+    return spooled + sum(encoded_sizes) + max(encoded_sizes) + encode_chunk_bytes * 7 // 3
+
+
+class ByteBudget:
+    """
+    Async admission control on a byte budget rather than a task count.
+
+    Any number of ZIPs may run while their combined cost fits the budget, so
+    small archives run widely in parallel and large ones run alone. A ZIP whose
+    cost alone exceeds the budget is admitted once nothing else holds any of
+    it, and then has the budget to itself; while it waits, nothing new is
+    admitted ahead of it.
+
+    `waiting` counts the acquirers that are blocked. If given, `on_wait` is
+    called when an acquirer has to wait, so that held costs can be released.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.in_use = 0
+        self.waiting = 0
+        self._waiting_alone = 0
+        self._condition = asyncio.Condition()
+
+    def _fits(self, cost):
+        if cost > self.capacity:
+            return self.in_use == 0
+        return self.in_use + cost <= self.capacity and not self._waiting_alone
+
+    def try_acquire(self, cost):
+        """Take `cost` if it fits now (see acquire) without waiting. Returns whether it was taken."""
+        if not self._fits(cost):
+            return False
+        self.in_use += cost
+        return True
+
+    async def acquire(self, cost, on_wait=None):
+        async with self._condition:
+            if not self._fits(cost):
+                alone = cost > self.capacity
+                self.waiting += 1
+                self._waiting_alone += alone
+                try:
+                    if on_wait is not None:
+                        on_wait()
+                    await self._condition.wait_for(
+                        lambda: self.in_use == 0 if alone else self.in_use + cost <= self.capacity and not self._waiting_alone
+                    )
+                finally:
+                    self.waiting -= 1
+                    self._waiting_alone -= alone
+                    self._condition.notify_all()
+            self.in_use += cost
+
+    async def release(self, cost):
+        async with self._condition:
+            self.in_use -= cost
+            self._condition.notify_all()
@@ -1,38 +1,59 @@
-import zipfile
 import logging
-import base64
+import hashlib
 
+from zip_extract.utils.helpers.zip_streaming import b64encode_stream
+from zip_extract.utils.helpers.zip_metadata import PnldMetadataSniffer
+from zip_extract.utils.zip_settings import ENCODE_CHUNK_BYTES
 
-def decompress_zip(zip_file_id, zip_file, file_uploaded_by):
+
+def decompress_zip(zip_file_id, zip_ref, manifest, file_uploaded_by, timings=None):
+
+    # Iterate over each member recorded in the manifest (no second directory lookup)
+    return decompress_members(zip_file_id, zip_ref, manifest.entries, file_uploaded_by, timings)
+
+
+def decompress_members(zip_file_id, zip_ref, entries, file_uploaded_by, timings=None):
+    """
+    Extract the given manifest entries from `zip_ref`, in order. Used whole or per member range.
+    Stage timings are added to `timings` if given (see b64encode_stream).
+    """
 
     child_files = []
 
-    # Open ZIP File
-    with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-        # Iterate over each file in the ZIP
-        for file_name in zip_ref.namelist():
-            logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - Detected')
-
-            if file_name.endswith('.xml'):
-                logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - File is XML')
-                
-                # Open and read the file
-                with zip_ref.open(file_name) as file:
-                    file_bytes = base64.b64encode(file.read()).decode('utf-8')
-
-                    # Prepare JSON for the POST
-                    json_output = {
-                        'SourceFileName': file_name,
-                        'SourceFileContent': file_bytes,
-                        'FID_SourceZIP': zip_file_id,
-                        'FID_SourceStatus': 'To Be Processed',
-                        'UploadedBy': file_uploaded_by
-                    }
-
-                    child_files.append(json_output)
-                    logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - Successfully Processed')
-
-            else:
-                logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - File is Not XML')
+    for entry in entries:
+        file_name = entry.name
+
+        if entry.is_dir:
+            continue
+
+        logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - Detected')
+
+        if entry.is_xml:
+            logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - File is XML')
+
+            # Inflate, hash, sniff and encode the file in bounded chunks
+            content_digest = hashlib.sha256()
+            sniffer = PnldMetadataSniffer()
+            with zip_ref.open(entry.info) as file:
+                file_bytes = b64encode_stream(file, ENCODE_CHUNK_BYTES, content_digest, sniffer, timings=timings)
+
+                # Prepare JSON for the POST
+                json_output = {
+                    'SourceFileName': file_name,
+                    'SourceFileContent': file_bytes,
+                    'FID_SourceZIP': zip_file_id,
+                    'FID_SourceStatus': 'To Be Processed',
+                    'UploadedBy': file_uploaded_by,
+                    # CJSCode / PNLDRef / PNLDDateOfLastUpdate, so pnld_process can pre-index the batch
+                    **sniffer.metadata(),
+                    # Internal only - used for batch de-duplication, not persisted
+                    'content_sha256': content_digest.hexdigest()
+                }
+
+                child_files.append(json_output)
+                logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - Successfully Processed')
+
+        else:
+            logging.info(f'ZIP File ID: {zip_file_id} - Child File: {file_name} - File is Not XML')
 
     return child_files
@@ -0,0 +1,137 @@
+import logging
+
+# A skipped copy is posted with the existing Failed SourceStatus (zip_outcomes.FAILED_STATUS)
+# and no content; the original it repeats is recorded in its SourceZIP row's Notes
+# (duplicate_notes) and reported in the outcome manifest (Duplicates)
+DUPLICATE_STATUS = 'Failed'
+
+# Helper fields carried on SourceFile records that must not be sent to Semarchy
+INTERNAL_SOURCE_FILE_KEYS = ('content_sha256', 'duplicate_of')
+
+
+class SourceFileDeduplicator:
+    """
+    Tracks the SHA-256 of every extracted XML across a ZIP batch.
+
+    apply() links each later copy of some content to its first occurrence
+    ('duplicate_of') as the ZIPs are extracted; nothing is dropped yet. A copy
+    is only skipped - posted as DUPLICATE_STATUS without its SourceFileContent -
+    by skip_duplicates, once its content is in a load that has succeeded
+    (loaded) or is sent in the same load. Otherwise the copy is uploaded with
+    its content, so a failed load never leaves the content missing from
+    Semarchy. A skipped copy's 'duplicate_of' names the file whose content
+    was actually loaded, and the SourceZIP row of its ZIP gets Notes naming
+    every copy skipped in it and its original, so a Failed duplicate can be
+    told apart from a failed extraction in Semarchy. (A SourceFileMessage
+    cannot be used: SourceFile IDs are generated by the same load.)
+    """
+
+    def __init__(self):
+        self._first_seen = {}
+        self._loaded = {}  # digest -> (FID_SourceZIP, SourceFileName) of the file it was loaded from
+        self.duplicate_count = 0
+        self.skipped_count = 0
+
+    def apply(self, processed_record):
+        """Link the copies within one process_zip result to their originals. Mutates and returns it."""
+
+        for source_file in processed_record.get('SourceFile', []):
+            digest = source_file.get('content_sha256')
+            if digest is None:
+                continue
+
+            original = self._first_seen.get(digest)
+            if original is None:
+                self._first_seen[digest] = _file_ref(source_file)
+                continue
+
+            source_file['duplicate_of'] = original
+            self.duplicate_count += 1
+
+        return processed_record
+
+    def skip_duplicates(self, load):
+        """
+        Skip the copies in `load` (process_zip results sent together) whose
+        content is already loaded or is sent in this load. Call before the
+        load is submitted; mutates the results and returns the number skipped.
+        """
+        source_files = [source_file
+                        for processed_record in load
+                        for source_file in processed_record.get('SourceFile', [])
+                        if source_file.get('SourceFileContent') is not None]
+
+        # Content sent in this load: the originals, then each copy that cannot be skipped
+        sent = {source_file.get('content_sha256'): _file_ref(source_file) for source_file in source_files
+                if 'duplicate_of' not in source_file}
+        skipped = 0
+
+        for source_file in source_files:
+            if 'duplicate_of' not in source_file:
+                continue
+
+            digest = source_file.get('content_sha256')
+            original = sent.get(digest) or self._loaded.get(digest)
+            if original is None:
+                # The original's load has not succeeded (yet) - send this copy's content too
+                sent[digest] = _file_ref(source_file)
+                continue
+
+            source_file['duplicate_of'] = original
+            source_file['FID_SourceStatus'] = DUPLICATE_STATUS
+            source_file.pop('SourceFileContent', None)
+            skipped += 1
+
+            logging.info(
+                f"ZIP File ID: {source_file.get('FID_SourceZIP')} - Child File: {source_file.get('SourceFileName')} "
+                f"- Duplicate of ZIP File ID: {original[0]} - Child File: {original[1]} - Content Skipped"
+            )
+
+        if skipped:
+            for processed_record in load:
+                notes = duplicate_notes(processed_record)
+                if notes:
+                    for zip_row in processed_record.get('SourceZIP', []):
+                        zip_row['Notes'] = notes
+
+        self.skipped_count += skipped
+        return skipped
+
+    def loaded(self, load):
+        """`load` was accepted by Semarchy: copies of its content can be skipped from now on."""
+        for processed_record in load:
+            for source_file in processed_record.get('SourceFile', []):
+                if source_file.get('SourceFileContent') is not None and source_file.get('content_sha256'):
+                    self._loaded.setdefault(source_file['content_sha256'], _file_ref(source_file))
+
+
+def _file_ref(source_file):
+    return source_file.get('FID_SourceZIP'), source_file.get('SourceFileName')
+
+
+def skipped_duplicates(processed_record):
+    """[{SourceFileName, DuplicateOfSourceZIPID, DuplicateOfSourceFileName}] of the copies skipped in one ZIP."""
+    return [
+        {
+            'SourceFileName': source_file.get('SourceFileName'),
+            'DuplicateOfSourceZIPID': source_file['duplicate_of'][0],
+            'DuplicateOfSourceFileName': source_file['duplicate_of'][1],
+        }
+        for source_file in processed_record.get('SourceFile', [])
+        if 'duplicate_of' in source_file and source_file.get('FID_SourceStatus') == DUPLICATE_STATUS
+    ]
+
+
+def duplicate_notes(processed_record):
+    """SourceZIP Notes explaining the copies skipped in one ZIP, or None when there are none."""
+    duplicates = skipped_duplicates(processed_record)
+    if not duplicates:
+        return None
+
+    listed = '; '.join(
+        f"{duplicate['SourceFileName']} = ZIP File ID {duplicate['DuplicateOfSourceZIPID']} / "
+        f"{duplicate['DuplicateOfSourceFileName']}"
+        for duplicate in duplicates
+    )
+    return (f'{len(duplicates)} XML file(s) set to {DUPLICATE_STATUS} without content as duplicates of '
+            f'content already loaded: {listed}')
@@ -1,5 +1,7 @@
 import logging 
 
+from zip_extract.utils.helpers.zip_deduplication import INTERNAL_SOURCE_FILE_KEYS
+
 def zip_define_post_body(records):
 
     result = {
@@ -9,7 +11,11 @@ def zip_define_post_body(records):
 
     for item in records or []:
         result["SourceZIP"].extend(item.get("SourceZIP", []))
-        result["SourceFile"].extend(item.get("SourceFile", []))
+        # Remove non-persisted helper field(s)
+        result["SourceFile"].extend(
+            {k: v for k, v in source_file.items() if k not in INTERNAL_SOURCE_FILE_KEYS}
+            for source_file in item.get("SourceFile", [])
+        )
 
     
     logging.info(
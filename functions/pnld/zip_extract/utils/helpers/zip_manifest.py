@@ -0,0 +1,67 @@
+import zipfile
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ZipManifestEntry:
+    """A single member of a ZIP archive, as recorded in its central directory."""
+    name: str
+    compressed_size: int
+    file_size: int
+    crc: int
+    compress_type: int
+    is_dir: bool
+    info: zipfile.ZipInfo = field(repr=False, compare=False)
+
+    @property
+    def is_xml(self):
+        return not self.is_dir and self.name.endswith('.xml')
+
+
+@dataclass(frozen=True)
+class ZipManifest:
+    """
+    Member listing for one archive, built from a single central directory parse.
+    Shared by the OOXML check (is_true_zip) and extraction (decompress_zip).
+    """
+    entries: tuple
+
+    @classmethod
+    def from_zipfile(cls, zip_ref):
+        return cls(entries=tuple(
+            ZipManifestEntry(
+                name=info.filename,
+                compressed_size=info.compress_size,
+                file_size=info.file_size,
+                crc=info.CRC,
+                compress_type=info.compress_type,
+                is_dir=info.is_dir(),
+                info=info,
+            )
+            for info in zip_ref.infolist()
+        ))
+
+    @property
+    def names(self):
+        return [entry.name for entry in self.entries]
+
+    @property
+    def xml_entries(self):
+        return [entry for entry in self.entries if entry.is_xml]
+
+    @property
+    def total_file_size(self):
+        return sum(entry.file_size for entry in self.entries)
+
+
+def open_zip_archive(zip_file):
+    """
+    Open `zip_file` as a ZipFile, parsing the central directory once.
+    Returns (zip_ref, manifest), or (None, None) if it is not a readable ZIP.
+    """
+    try:
+        zip_ref = zipfile.ZipFile(zip_file, 'r')
+    except (zipfile.BadZipFile, OSError, ValueError):
+        return None, None
+
+    return zip_ref, ZipManifest.from_zipfile(zip_ref)
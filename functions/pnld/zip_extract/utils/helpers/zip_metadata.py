@@ -0,0 +1,108 @@
+import logging
+from datetime import date
+
+from lxml import etree
+
+# (parent element, element) -> SourceFile attribute. Mirrors the XPaths used by the
+# SourceFileExtract enricher (fn_get_source_file_cjs_code / _pnld_ref / _dolu):
+#   //document/codes/cjsoffencecode, //document/pnldref, //document/ancillary/dateoflastupdate
+# pnld_process reads the same elements through config/flatten_pnld.json and keys the
+# baseline prefetch on CJSCode / PNLDRef, so the two must agree: change one, change both.
+SOURCE_FILE_METADATA_ATTRIBUTES = {
+    ('codes', 'cjsoffencecode'): 'CJSCode',
+    ('document', 'pnldref'): 'PNLDRef',
+    ('ancillary', 'dateoflastupdate'): 'PNLDDateOfLastUpdate',
+}
+
+
+def _element_text(element):
+    # XPath string value, trimmed - the enricher's value and, for the leaf elements
+    # PNLD uses, the stripped text flatten_pnld reads
+    return "".join(element.itertext()).strip()
+
+
+def _code_value(text):
+    # As the enricher: empty -> NULL, longer than varchar(8) -> NULL
+    if not text or len(text) > 8:
+        return None
+    return text
+
+
+def _date_value(text):
+    # As fn_get_source_file_dolu: trimmed, NULL if empty or not a valid date
+    try:
+        return date.fromisoformat((text or '').strip()).isoformat()
+    except ValueError:
+        return None
+
+
+_NORMALISE = {
+    'CJSCode': _code_value,
+    'PNLDRef': _code_value,
+    'PNLDDateOfLastUpdate': _date_value,
+}
+
+
+def _local_name(element):
+    if element is None or not isinstance(element.tag, str):
+        return None
+    return etree.QName(element).localname
+
+
+class PnldMetadataSniffer:
+    """
+    Streaming sniff of the PNLD identifiers in an XML member.
+
+    Fed the inflated bytes chunk by chunk (same `update` interface as a hashlib
+    object, so it can ride along with b64encode_stream). Parsing stops as soon
+    as every attribute has been seen, and finished elements are cleared as it
+    goes, so memory stays flat whatever the size of the offence wording
+    (except inside an attribute's element, whose whole text is read at its end).
+
+    Values are normalised the same way the enricher does, so a file that is
+    not well-formed or has out-of-range values simply yields None - the full
+    validation in pnld_process reports the problem.
+    """
+
+    def __init__(self):
+        self._parser = etree.XMLPullParser(events=('start', 'end'), resolve_entities=False, no_network=True)
+        self.values = {}
+        self.done = False
+        self._open_attributes = 0
+
+    def update(self, chunk):
+        if self.done:
+            return
+
+        try:
+            self._parser.feed(chunk)
+            for event, element in self._parser.read_events():
+                key = (_local_name(element.getparent()), _local_name(element))
+                attribute = SOURCE_FILE_METADATA_ATTRIBUTES.get(key)
+
+                if event == 'start':
+                    if attribute:
+                        self._open_attributes += 1
+                    continue
+
+                if attribute:
+                    self._open_attributes -= 1
+                    if attribute not in self.values:
+                        self.values[attribute] = _NORMALISE[attribute](_element_text(element))
+
+                # Children of an attribute's element are kept until it ends
+                if not self._open_attributes:
+                    element.clear(keep_tail=True)
+
+                if len(self.values) == len(SOURCE_FILE_METADATA_ATTRIBUTES):
+                    self.done = True
+                    break
+
+        except etree.XMLSyntaxError as e:
+            logging.debug(f'PNLD metadata sniff stopped - {e}')
+            self.done = True
+
+    def metadata(self):
+        """Sniffed values for every attribute (None where not found)."""
+        return {attribute: self.values.get(attribute)
+                for attribute in SOURCE_FILE_METADATA_ATTRIBUTES.values()}
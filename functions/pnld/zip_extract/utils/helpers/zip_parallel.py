@@ -0,0 +1,131 @@
+import io
+import mmap
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from zip_extract.utils.helpers.zip_decompress import decompress_members
+from zip_extract.utils.zip_settings import SPLIT_MIN_MEMBERS, SPLIT_MIN_BYTES, SPLIT_WORKERS
+from zip_extract.utils.zip_telemetry import merge_timings
+
+
+def should_split(manifest, on_disk=True, workers=SPLIT_WORKERS):
+    """
+    True when an archive is big enough to be worth extracting in member ranges.
+    Only an archive whose spool is `on_disk` can be mapped without writing an
+    in-memory spool out to a temp file first.
+    """
+    xml_entries = manifest.xml_entries
+    if not on_disk or workers < 2 or len(xml_entries) < 2:
+        return False
+
+    return (len(xml_entries) >= SPLIT_MIN_MEMBERS
+            or sum(entry.file_size for entry in xml_entries) >= SPLIT_MIN_BYTES)
+
+
+def split_member_ranges(entries, parts):
+    """
+    Split the (non-directory) entries into at most `parts` contiguous ranges of
+    roughly equal inflated size. Concatenating the ranges gives back the
+    original member order.
+    """
+    entries = [entry for entry in entries if not entry.is_dir]
+    total_size = sum(entry.file_size for entry in entries)
+
+    ranges, current, cumulative = [], [], 0
+    for entry in entries:
+        current.append(entry)
+        cumulative += entry.file_size
+
+        if len(ranges) < parts - 1 and cumulative * parts >= total_size * (len(ranges) + 1):
+            ranges.append(current)
+            current = []
+
+    if current:
+        ranges.append(current)
+
+    return ranges
+
+
+class _MappedReader(io.RawIOBase):
+    """Seekable, read-only file object over a shared mmap, with its own position."""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += len(self._view)
+        self._pos = max(0, pos)
+        return self._pos
+
+    def readinto(self, target):
+        with self._view[self._pos:self._pos + len(target)] as data:
+            size = len(data)
+            target[:size] = data
+        self._pos += size
+        return size
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def _extract_range(zip_file_id, buffer, entries, file_uploaded_by):
+    # Own reader, ZipFile and timings per range, so nothing mutable is shared between threads
+    timings = {}
+    with _MappedReader(buffer) as reader, zipfile.ZipFile(reader, 'r') as zip_ref:
+        return decompress_members(zip_file_id, zip_ref, entries, file_uploaded_by, timings), timings
+
+
+def decompress_zip_parallel(zip_file_id, zip_file, manifest, file_uploaded_by, timings=None, workers=SPLIT_WORKERS):
+    """
+    decompress_zip for very large archives: the members are split into ranges
+    that are inflated, hashed and encoded by separate threads, each reading its
+    own view of one read-only mapping of the decoded spool. zlib and hashlib
+    release the GIL on large buffers, so the ranges overlap even inside a
+    single process worker.
+
+    Each range opens its members with ZipFile.open, through its own ZipFile
+    over its view; that re-reads the central directory once per range, which
+    is small next to an archive worth splitting.
+
+    Results are merged in member order, the same as decompress_zip. Stage
+    timings are summed across the ranges, so they can exceed the wall time.
+
+    `zip_file` must be a spool that has already rolled over to its temp file
+    (see should_split); fileno() would otherwise write it out to disk.
+    """
+    ranges = split_member_ranges(manifest.entries, workers)
+
+    # Flush so the mapping sees every byte
+    fileno = zip_file.fileno()
+    zip_file.flush()
+
+    logging.info(f'ZIP File ID: {zip_file_id} - Extracting {len(manifest.entries)} members in {len(ranges)} ranges')
+
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as buffer:
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='zip_range') as executor:
+            futures = [executor.submit(_extract_range, zip_file_id, buffer, entries, file_uploaded_by)
+                       for entries in ranges]
+
+            child_files = []
+            for future in futures:
+                range_files, range_timings = future.result()
+                child_files.extend(range_files)
+                if timings is not None:
+                    merge_timings(timings, range_timings)
+
+            return child_files
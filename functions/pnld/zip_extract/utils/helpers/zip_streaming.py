@@ -0,0 +1,106 @@
+import re
+import time
+import base64
+import tempfile
+
+# Anything b64decode would discard (whitespace, MIME line breaks, stray characters)
+_NON_ALPHABET = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+def spool_base64(encoded, max_memory_bytes, chunk_chars):
+    """
+    Decode a Base64 string into a SpooledTemporaryFile, one chunk at a time.
+
+    Only `chunk_chars` of the encoded string are decoded at once, and at most
+    `max_memory_bytes` of decoded data is kept in memory before the spool
+    rolls over to a temporary file on disk.
+
+    Returns the spool positioned at the start. The caller owns (and closes) it.
+    """
+    chunk_chars = max(4, chunk_chars - chunk_chars % 4)
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes)
+
+    try:
+        carry = ""
+        for start in range(0, len(encoded or ""), chunk_chars):
+            piece = carry + encoded[start:start + chunk_chars]
+
+            # Discarded characters would misalign the 4-char groups, so drop them first
+            if _NON_ALPHABET.search(piece):
+                piece = _NON_ALPHABET.sub("", piece)
+
+            cut = len(piece) - len(piece) % 4
+            spool.write(base64.b64decode(piece[:cut]))
+            carry = piece[cut:]
+
+        if carry:
+            # Let binascii raise on a truncated / badly padded tail, as b64decode did before
+            spool.write(base64.b64decode(carry))
+
+        spool.seek(0)
+        return spool
+
+    except Exception:
+        spool.close()
+        raise
+
+
+def b64encode_stream(file_obj, chunk_bytes, *sinks, timings=None):
+    """
+    Base64-encode a readable binary stream chunk by chunk.
+
+    Chunks are kept to a multiple of 3 bytes so the encoded pieces can be
+    concatenated without padding in the middle. Returns the encoded str.
+
+    Only the inflated side is bounded to `chunk_bytes`: the result has to be
+    one str for the load body, so the pieces are joined at the end and the
+    member's full Base64 is briefly held twice (see estimate_zip_cost).
+
+    Any `sinks` (objects with an `update(bytes)` method, e.g. a hashlib digest)
+    are fed the raw bytes as they are read, so the content can be hashed or
+    inspected in the same pass.
+
+    If `timings` (a dict) is given, the seconds spent reading (inflating),
+    in the sinks and encoding are added to its InflateSeconds,
+    InspectSeconds and EncodeSeconds.
+    """
+    chunk_bytes = max(3, chunk_bytes - chunk_bytes % 3)
+
+    parts = []
+    carry = b""
+    inflate_seconds = inspect_seconds = encode_seconds = 0.0
+
+    while True:
+        started = time.perf_counter()
+        chunk = file_obj.read(chunk_bytes)
+        read_done = time.perf_counter()
+        inflate_seconds += read_done - started
+        if not chunk:
+            break
+
+        for sink in sinks:
+            sink.update(chunk)
+        sinks_done = time.perf_counter()
+        inspect_seconds += sinks_done - read_done
+
+        if carry:
+            chunk = carry + chunk
+
+        cut = len(chunk) - len(chunk) % 3
+        if cut:
+            parts.append(base64.b64encode(chunk[:cut]).decode("ascii"))
+        carry = chunk[cut:]
+        encode_seconds += time.perf_counter() - sinks_done
+
+    started = time.perf_counter()
+    if carry:
+        parts.append(base64.b64encode(carry).decode("ascii"))
+    encoded = "".join(parts)
+    encode_seconds += time.perf_counter() - started
+
+    if timings is not None:
+        timings['InflateSeconds'] = timings.get('InflateSeconds', 0.0) + inflate_seconds
+        timings['InspectSeconds'] = timings.get('InspectSeconds', 0.0) + inspect_seconds
+        timings['EncodeSeconds'] = timings.get('EncodeSeconds', 0.0) + encode_seconds
+
+    return encoded
@@ -0,0 +1,30 @@
+import logging
+
+from shared_code.content_fetch import fetch_named_query_content
+from zip_extract.utils.zip_settings import CONTENT_QUERY, CONTENT_FETCH_PARALLEL
+
+
+def needs_content_fetch(zip_record):
+    """Claim-check mode: the notification carries the SourceZIPID but not the content."""
+    return zip_record.get('ZIPFileContent') is None and zip_record.get('SourceZIPID') is not None
+
+
+def fetch_zip_content(zip_file_id):
+    """
+    Fetch the Base64 content of one SourceZIP through the named query.
+    Raises on HTTP errors or when the ZIP is not found.
+    """
+    logging.info(f'ZIP File ID: {zip_file_id} - Fetching content ({CONTENT_QUERY})')
+    content = fetch_named_query_content(
+        CONTENT_QUERY, {'SOURCE_ZIP_ID': zip_file_id}, 'ZIPFileContent', (5, 120), CONTENT_FETCH_PARALLEL,
+    )
+
+    if content is None:
+        raise LookupError(f'No content returned for SourceZIPID {zip_file_id}')
+
+    return content
+
+
+def with_content(zip_record):
+    """Copy of the record with its content fetched (the notification record is left as it was)."""
+    return {**zip_record, 'ZIPFileContent': fetch_zip_content(zip_record.get('SourceZIPID'))}
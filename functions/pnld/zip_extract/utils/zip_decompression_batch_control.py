@@ -1,7 +1,30 @@
+import time
 import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from zip_extract.utils.zip_decompression_functions import process_zip
+from zip_extract.utils.helpers.zip_deduplication import SourceFileDeduplicator
+from zip_extract.utils.helpers.zip_admission import ByteBudget, estimate_zip_cost
+from zip_extract.utils.zip_outcomes import failed_zip_output, deferred_zip_output
+from zip_extract.utils.zip_content_fetch import needs_content_fetch, with_content
+from zip_extract.utils.zip_telemetry import record_zip_span
+from zip_extract.utils.zip_settings import (
+    MEMORY_BUDGET_BYTES,
+    SPOOL_MAX_MEMORY_BYTES,
+    ENCODE_CHUNK_BYTES,
+    ADMISSION_TAIL_BYTES,
+    ASSUMED_INFLATION_RATIO,
+    CONTENT_FETCH_PARALLEL,
+)
+from zip_extract.utils.zip_executor import (
+    resolve_executor,
+    acquire_process_pool,
+    release_process_pool,
+    discard_process_pool,
+    compact_zip_input,
+)
 
 # # Process each ZIP record
 # result_files = []
@@ -11,37 +34,186 @@ from zip_extract.utils.zip_decompression_functions import process_zip
 #     result_files.extend(result)
 
 
-async def process_zip_batch(input_records, 
-                             max_concurrency: int = 8):
+async def process_zip_batch(input_records,
+                             max_concurrency: int = None,
+                             backend: str = None,
+                             on_result=None,
+                             deduplicator: SourceFileDeduplicator = None,
+                             on_budget_wait=None):
     """
     Process each XML record concurrently using asyncio.
-    Calls process_zip(zip_file) in a thread pool for non-blocking execution.
+    Calls process_zip(zip_file) in a thread or process pool for non-blocking execution.
+
+    `backend` is "thread", "process" or "auto" (default: ZipExtractExecutor setting).
+    `max_concurrency` overrides the worker count the backend would size itself to.
+
+    Each ZIP's memory cost is estimated from its central directory (see
+    estimate_zip_cost) and admitted against the byte budget
+    (ZipExtractMemoryBudgetBytes, see ByteBudget). A ZIP larger than the whole
+    budget runs alone.
+
+    Results are returned in input order, one per input record, with repeated
+    XML content across the batch linked to its first occurrence by
+    `deduplicator` (whether a copy is skipped is decided at upload).
+    A ZIP whose extraction raises is returned as Failed (see failed_zip_output)
+    rather than dropped.
+
+    Records without ZIPFileContent (claim-check notifications) have their content
+    fetched by SourceZIPID as part of their own task, so extraction of the
+    first ZIPs starts while the rest are still downloading.
+
+    If `on_result` (an async callable) is given, each ZIP's result is passed to it
+    as soon as that ZIP finishes, so uploads can overlap the remaining extraction.
+    Duplicates are then linked in completion order instead of input order.
+    `on_result` returns an awaitable that is done once the result has been
+    uploaded, and the ZIP holds its cost until then, waiting for budget if
+    needed. `on_budget_wait` (e.g. PipelinedUploader.flush) is called whenever
+    a ZIP waits for budget that held results are using.
+
+    Without `on_result` every result is held until the whole batch is done, so
+    no cost is ever released: a ZIP that does not fit in what is left of the
+    budget when it is admitted is not extracted, and is returned as deferred
+    (see deferred_zip_output) for a retry.
     """
 
-    semaphore = asyncio.Semaphore(max_concurrency)
+    backend, workers = resolve_executor(input_records, backend, max_concurrency)
+    logging.info(f"ZIP Batch - Executor: {backend} (workers={workers}, zips={len(input_records)})")
+
+    if backend == 'process':
+        executor = acquire_process_pool(workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zip_extract')
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(workers)
+    budget = ByteBudget(MEMORY_BUDGET_BYTES)
+    deduplicator = deduplicator or SourceFileDeduplicator()
     queue = asyncio.Queue()
+    fetch_slots = asyncio.Semaphore(max(1, CONTENT_FETCH_PARALLEL))
+
+    held = set()
+
+    async def _emit(idx, processed_record):
+        """Queue the result and pass it on. Returns the awaitable from on_result, if any."""
+        await queue.put((idx, processed_record))
+        if on_result is not None:
+            return await on_result(deduplicator.apply(processed_record))
+        return None
+
+    async def _hold(uploaded, cost):
+        try:
+            await uploaded
+        finally:
+            await budget.release(cost)
+
+    def _release_after(uploaded, cost):
+        """Release `cost` once `uploaded` is done; flush held results if a ZIP is waiting for them."""
+        task = loop.create_task(_hold(uploaded, cost))
+        held.add(task)
+        task.add_done_callback(held.discard)
+        if budget.waiting and on_budget_wait is not None:
+            on_budget_wait()
+
+    async def _admit(idx, zip_file):
+        """Fetch the content if needed, then admit against the byte budget. Returns (zip_file, cost) or None."""
+        try:
+            if needs_content_fetch(zip_file):
+                # Claim-check mode - content is fetched by SourceZIPID
+                zip_file = await asyncio.to_thread(with_content, zip_file)
+
+            # Admission: memory cost from the central directory, against the byte budget
+            cost = await asyncio.to_thread(
+                estimate_zip_cost, zip_file, ADMISSION_TAIL_BYTES, ASSUMED_INFLATION_RATIO,
+                SPOOL_MAX_MEMORY_BYTES, ENCODE_CHUNK_BYTES,
+            )
+            if on_result is not None:
+                await budget.acquire(cost, on_budget_wait)
+            elif not budget.try_acquire(cost):
+                # Batch upload - the results already admitted hold the rest of the budget until the end
+                logging.warning(f"Processing ZIP [{idx}/{len(input_records)}] - DEFERRED")
+                await _emit(idx, deferred_zip_output(zip_file, cost, budget.capacity - budget.in_use, budget.capacity))
+                return None
+
+            return zip_file, cost
+        except Exception as e:
+            logging.exception(f"Error processing ZIP [{idx}]: {e}")
+            await _emit(idx, failed_zip_output(zip_file, e))
+            return None
 
     async def _worker(idx, zip_file):
-        async with semaphore:
-            try:
-                logging.info(f"Processing ZIP [{idx}/{len(input_records)}] - START")
-                # Run synchronous process_xml in a thread
-                processed_record = await asyncio.to_thread(process_zip, zip_file)
+        queued_ns = time.time_ns()
+
+        if needs_content_fetch(zip_file):
+            # Bound the fetched contents held in memory while they wait for the budget
+            async with fetch_slots:
+                admitted = await _admit(idx, zip_file)
+        else:
+            admitted = await _admit(idx, zip_file)
+
+        if admitted is None:
+            return
+        zip_file, cost = admitted
+
+        try:
+            async with semaphore:
+                logging.info(f"Processing ZIP [{idx}/{len(input_records)}] - START (estimated_bytes={cost})")
+                start_ns = time.time_ns()
+                # Run synchronous process_zip in the executor with only the fields it needs
+                processed_record = await loop.run_in_executor(executor, process_zip, compact_zip_input(zip_file))
+                end_ns = time.time_ns()
                 logging.info(f"Processing ZIP [{idx}/{len(input_records)}] - SUCCESS")
-                await queue.put(processed_record)
-            except Exception as e:
-                logging.exception(f"Error processing ZIP [{idx}]: {e}")
 
-    # Create tasks
-    tasks = [asyncio.create_task(_worker(idx, zip_file))
-             for idx, zip_file in enumerate(input_records, start=1)]
+            # Time spent queued for the byte budget and a worker slot
+            processed_record['Metrics']['WaitSeconds'] = (start_ns - queued_ns) / 1e9
+            record_zip_span(processed_record['Metrics'], start_ns, end_ns)
+        except BrokenProcessPool as e:
+            logging.exception(f"Error processing ZIP [{idx}]: process pool failed - {e}")
+            discard_process_pool(executor)
+            processed_record = failed_zip_output(zip_file, e)
+        except Exception as e:
+            logging.exception(f"Error processing ZIP [{idx}]: {e}")
+            # Keep the ZIP in the results (as Failed) so the caller can see it and retry it
+            processed_record = failed_zip_output(zip_file, e)
 
-    # Wait for all workers to finish
-    await asyncio.gather(*tasks)
+        if on_result is None:
+            await _emit(idx, processed_record)
+            return
+
+        # The result's content stays in memory until it is uploaded - hold its budget until then
+        uploaded = None
+        try:
+            uploaded = await _emit(idx, processed_record)
+        finally:
+            if uploaded is None:
+                await budget.release(cost)
+            else:
+                _release_after(uploaded, cost)
+
+    try:
+        # Create tasks
+        tasks = [asyncio.create_task(_worker(idx, zip_file))
+                 for idx, zip_file in enumerate(input_records, start=1)]
+
+        # Wait for all workers to finish
+        await asyncio.gather(*tasks)
+    finally:
+        if backend == 'thread':
+            executor.shutdown(wait=False)
+        else:
+            release_process_pool(executor)
 
     # Collect results from queue
     processed_records = []
     while not queue.empty():
         processed_records.append(await queue.get())
 
-    return processed_records
\ No newline at end of file
+    processed_records = [record for _, record in sorted(processed_records, key=lambda item: item[0])]
+
+    # Link repeated XML content across the whole batch (already done per ZIP when streaming results)
+    if on_result is None:
+        for processed_record in processed_records:
+            deduplicator.apply(processed_record)
+
+    logging.info(f"ZIP Batch - Duplicate Child Files Found: {deduplicator.duplicate_count}")
+
+    return processed_records
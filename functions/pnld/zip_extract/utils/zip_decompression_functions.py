@@ -1,9 +1,14 @@
-import logging
-import base64
 import io
+import time
+import logging
 
 from zip_extract.utils.helpers.zip_decompress import decompress_zip
+from zip_extract.utils.helpers.zip_parallel import should_split, decompress_zip_parallel
 from zip_extract.utils.helpers.zip_validation import is_true_zip
+from zip_extract.utils.helpers.zip_manifest import open_zip_archive
+from zip_extract.utils.helpers.zip_streaming import spool_base64
+from zip_extract.utils.zip_settings import SPOOL_MAX_MEMORY_BYTES, DECODE_CHUNK_CHARS
+from zip_extract.utils.zip_telemetry import new_zip_metrics
 
 def process_zip(zip_record):
 
@@ -14,44 +19,71 @@ def process_zip(zip_record):
     file_uploaded_by = zip_record.get('UploadedBy')
     logging.info(f'ZIP File Received - File ID: {zip_file_id} - Batch ID: {batch_id}')
 
-    # Decode the Base64 ZIP file
-    zip_file = base64.b64decode(zip_encoded_file)
-    zip_file = io.BytesIO(zip_file)
-
-    if is_true_zip(zip_file):
-        
-        child_files_output = decompress_zip(zip_file_id, zip_file, file_uploaded_by)
-        zip_length = len(child_files_output)
-
-        # Success JSON for this ZIP
-        zip_output = [{
-            'SourceZIPID': zip_file_id,
-            #'ZIPFileName': zip_file_name,
-            'FID_SourceStatus': 'Decompression Complete',
-            'FileCount': zip_length,
-            #'Notes': zip_notes,
-            #'ZIPFileContent': zip_encoded_file
-            }]
-
-        logging.info(f'ZIP File ID: {zip_file_id} - All Files Successfully Processed ({zip_length} Files)')
-
-    else:
-        # Failure JSON for this ZIP
-        zip_output = [{
-            'SourceZIPID': zip_file_id,
-            #'ZIPFileName': zip_file_name,
-            'FID_SourceStatus': 'Failed',
-            #'Notes': zip_notes,
-            #'ZIPFileContent': zip_encoded_file
-            }]
-
-        child_files_output = []
-
-        logging.info(f'ZIP File ID: {zip_file_id} - File is Not a ZIP')
+    metrics = new_zip_metrics(zip_file_id)
+    started = time.perf_counter()
+
+    # Decode the Base64 ZIP file incrementally into a bounded spool
+    # (rolls over to a temp file once SPOOL_MAX_MEMORY_BYTES is exceeded)
+    with spool_base64(zip_encoded_file, SPOOL_MAX_MEMORY_BYTES, DECODE_CHUNK_CHARS) as zip_file:
+        metrics['DecodeSeconds'] = time.perf_counter() - started
+        metrics['CompressedBytes'] = zip_file.seek(0, io.SEEK_END)
+        zip_file.seek(0)
+
+        # Parse the central directory once; the manifest feeds validation and extraction
+        zip_ref, manifest = open_zip_archive(zip_file)
+
+        if is_true_zip(manifest):
+            metrics['MemberCount'] = sum(1 for entry in manifest.entries if not entry.is_dir)
+            metrics['XMLCount'] = len(manifest.xml_entries)
+            metrics['InflatedBytes'] = sum(entry.file_size for entry in manifest.xml_entries)
+
+            # The spool rolls over to its temp file once it holds more than SPOOL_MAX_MEMORY_BYTES (0 = never)
+            on_disk = 0 < SPOOL_MAX_MEMORY_BYTES < metrics['CompressedBytes']
+
+            with zip_ref:
+                # Very large archives (already on disk) are extracted in parallel member ranges
+                if should_split(manifest, on_disk):
+                    child_files_output = decompress_zip_parallel(zip_file_id, zip_file, manifest, file_uploaded_by, metrics)
+                else:
+                    child_files_output = decompress_zip(zip_file_id, zip_ref, manifest, file_uploaded_by, metrics)
+            zip_length = len(child_files_output)
+
+            # Success JSON for this ZIP
+            zip_output = [{
+                'SourceZIPID': zip_file_id,
+                #'ZIPFileName': zip_file_name,
+                'FID_SourceStatus': 'Decompression Complete',
+                'FileCount': zip_length,
+                #'Notes': zip_notes,
+                #'ZIPFileContent': zip_encoded_file
+                }]
+
+            logging.info(f'ZIP File ID: {zip_file_id} - All Files Successfully Processed ({zip_length} Files)')
+
+        else:
+            if zip_ref is not None:
+                zip_ref.close()
+
+            # Failure JSON for this ZIP
+            zip_output = [{
+                'SourceZIPID': zip_file_id,
+                #'ZIPFileName': zip_file_name,
+                'FID_SourceStatus': 'Failed',
+                #'Notes': zip_notes,
+                #'ZIPFileContent': zip_encoded_file
+                }]
+
+            child_files_output = []
+
+            logging.info(f'ZIP File ID: {zip_file_id} - File is Not a ZIP')
+
+    metrics['ProcessSeconds'] = time.perf_counter() - started
 
     result = {
             'SourceFile': child_files_output, 
-            'SourceZIP': zip_output
+            'SourceZIP': zip_output,
+            # Internal only - per-ZIP telemetry, not persisted
+            'Metrics': metrics
         }
 
     return result
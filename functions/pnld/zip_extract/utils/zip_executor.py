@@ -0,0 +1,135 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from zip_extract.utils.zip_settings import (
+    EXECUTOR_BACKEND,
+    THREAD_MAX_CONCURRENCY,
+    PROCESS_MIN_BYTES_PER_WORKER,
+)
+
+BACKENDS = ('thread', 'process', 'auto')
+
+# Fields process_zip actually reads - anything else in the notification is not sent to workers
+ZIP_INPUT_KEYS = ('SourceZIPID', 'ZIPFileContent', 'BatchID', 'UploadedBy')
+
+# One process pool for the life of the worker instance (spawn start-up is
+# expensive). A batch that needs more workers replaces it with a larger one;
+# a replaced pool is shut down once the last batch using it releases it.
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_users = {}  # pool -> batches holding it
+_process_pool_lock = threading.Lock()
+
+
+def compact_zip_input(zip_record):
+    """Reduce a SourceZIP notification record to the small, picklable dict process_zip needs."""
+    return {key: zip_record.get(key) for key in ZIP_INPUT_KEYS}
+
+
+def resolve_executor(input_records, backend=None, max_concurrency=None):
+    """
+    Pick the executor backend and worker count for a batch.
+
+    - thread:  max_concurrency (default ZipExtractMaxConcurrency) threads.
+    - process: one process per core, but no more than there are ZIPs, and no
+               more than one per ZipExtractProcessMinBytesPerWorker of input.
+    - auto:    process when that sizing gives more than one worker, else thread.
+
+    Returns (backend, workers).
+    """
+    backend = (backend or EXECUTOR_BACKEND).lower()
+    if backend not in BACKENDS:
+        logging.warning(f"ZIP Executor - Unknown backend '{backend}' - using 'thread'")
+        backend = 'thread'
+
+    record_count = max(1, len(input_records))
+
+    if backend == 'thread':
+        return 'thread', max(1, min(max_concurrency or THREAD_MAX_CONCURRENCY, record_count))
+
+    cpu_count = os.cpu_count() or 1
+    # Claim-check records (content not in the notification) count as one worker's worth each
+    total_bytes = sum(
+        PROCESS_MIN_BYTES_PER_WORKER if record.get('ZIPFileContent') is None else len(record['ZIPFileContent'])
+        for record in input_records
+    )
+
+    if max_concurrency:
+        process_workers = max(1, min(max_concurrency, record_count))
+    else:
+        size_workers = max(1, total_bytes // max(1, PROCESS_MIN_BYTES_PER_WORKER))
+        process_workers = max(1, min(cpu_count, record_count, size_workers))
+
+    if backend == 'process':
+        return 'process', process_workers
+
+    # auto
+    if cpu_count > 1 and process_workers > 1:
+        return 'process', process_workers
+
+    return 'thread', max(1, min(max_concurrency or THREAD_MAX_CONCURRENCY, record_count))
+
+
+def acquire_process_pool(workers):
+    """
+    Return the shared ProcessPoolExecutor, with at least `workers` processes,
+    for one batch. Release it with release_process_pool when the batch ends.
+
+    The pool is only replaced when a batch needs more processes than it has;
+    a smaller batch bounds its own concurrency, so alternating batch sizes do
+    not respawn workers. Uses the spawn start method - the Functions host is
+    multi-threaded, so forking it is not safe.
+    """
+    global _process_pool, _process_pool_workers
+
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers < workers:
+            if _process_pool is not None:
+                logging.info(f"ZIP Executor - Replacing process pool (workers={_process_pool_workers} -> {workers})")
+                _retire_process_pool(_process_pool)
+            else:
+                logging.info(f"ZIP Executor - Starting process pool (workers={workers})")
+
+            # Processes are spawned on first use, so this does not block the lock
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _process_pool_workers = workers
+
+        pool = _process_pool
+        _process_pool_users[pool] = _process_pool_users.get(pool, 0) + 1
+        return pool
+
+
+def release_process_pool(pool):
+    """A batch is done with `pool`; a replaced pool is shut down after its last batch."""
+    with _process_pool_lock:
+        users = _process_pool_users.get(pool, 1) - 1
+        if users > 0:
+            _process_pool_users[pool] = users
+            return
+        _process_pool_users.pop(pool, None)
+        retired = pool is not _process_pool
+
+    if retired:
+        pool.shutdown(wait=False)
+
+
+def discard_process_pool(pool):
+    """Forget a pool (e.g. after BrokenProcessPool) so the next batch starts a fresh one."""
+    global _process_pool, _process_pool_workers
+
+    with _process_pool_lock:
+        if pool is _process_pool:
+            _process_pool, _process_pool_workers = None, 0
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _retire_process_pool(pool):
+    # Called with the lock held; batches still holding the pool keep using it
+    if pool not in _process_pool_users:
+        pool.shutdown(wait=False)
@@ -0,0 +1,153 @@
+import logging
+
+from zip_extract.utils.helpers.zip_deduplication import skipped_duplicates
+from zip_extract.utils.zip_telemetry import new_zip_metrics
+
+COMPLETE_STATUS = 'Decompression Complete'
+FAILED_STATUS = 'Failed'
+
+# Extraction outcome per ZIP
+EXTRACTED = 'extracted'
+FAILED = 'failed'
+NOT_ZIP = 'not_zip'
+DEFERRED = 'deferred'
+
+# Upload outcome per ZIP
+UPLOADED = 'uploaded'
+UPLOAD_FAILED = 'failed'
+NOT_SENT = 'not_sent'
+
+
+def failed_zip_output(zip_record, error):
+    """
+    process_zip-shaped result for a ZIP whose extraction raised.
+
+    The ZIP is still accounted for: its SourceZIP row is posted as Failed, and
+    the error is kept under the internal 'Error' key for the outcome manifest.
+    """
+    zip_file_id = zip_record.get('SourceZIPID')
+    metrics = new_zip_metrics(zip_file_id)
+    metrics['CompressedBytes'] = len(zip_record.get('ZIPFileContent') or '') * 3 // 4
+
+    return {
+        'SourceFile': [],
+        'SourceZIP': [{
+            'SourceZIPID': zip_file_id,
+            'FID_SourceStatus': FAILED_STATUS,
+        }],
+        'Metrics': metrics,
+        'Error': f'{type(error).__name__}: {error}',
+    }
+
+
+def deferred_zip_output(zip_record, cost, available_bytes, budget_bytes):
+    """
+    process_zip-shaped result for a ZIP left out of a batch-mode upload: its
+    estimated memory cost (see estimate_zip_cost) does not fit in what the
+    ZIPs before it left of the budget. A retry with fewer ZIPs extracts it.
+
+    Like a failed ZIP, its SourceZIP row is posted as Failed with the reason
+    under 'Error'; the internal 'Deferred' key marks it for the outcome manifest.
+    """
+    zip_file_id = zip_record.get('SourceZIPID')
+    logging.warning(
+        f'ZIP File ID: {zip_file_id} - Deferred - estimated memory {cost} bytes, '
+        f'{available_bytes} of {budget_bytes} budget bytes left'
+    )
+    processed_record = failed_zip_output(zip_record, MemoryError(
+        f'estimated memory {cost} bytes does not fit the {available_bytes} bytes left of '
+        f'ZipExtractMemoryBudgetBytes ({budget_bytes}) in batch upload mode - retry it'
+    ))
+    processed_record['Deferred'] = True
+    return processed_record
+
+
+def select_retry_records(input_records, retry_zip_ids):
+    """
+    Re-run mode: keep only the notification records whose SourceZIPID is listed.
+
+    A listed ZIP whose notification already shows 'Decompression Complete' is
+    skipped - its SourceZIP row is only ever loaded together with its
+    SourceFile rows, so it has nothing left to upload. Re-sending the same
+    retry request is therefore safe. IDs are compared as strings, so
+    1 and "1" match.
+
+    Returns (selected_records, skipped_zip_ids, unknown_zip_ids).
+    """
+    wanted = {str(zip_id) for zip_id in retry_zip_ids}
+    selected, skipped, seen = [], [], set()
+
+    for record in input_records:
+        zip_id = str(record.get('SourceZIPID'))
+        if zip_id not in wanted or zip_id in seen:
+            continue
+        seen.add(zip_id)
+
+        if record.get('FID_SourceStatus') == COMPLETE_STATUS:
+            skipped.append(record.get('SourceZIPID'))
+        else:
+            selected.append(record)
+
+    unknown = sorted(wanted - seen)
+    logging.info(
+        f"ZIP Retry - Selected {len(selected)} ZIP(s) "
+        f"(requested={len(wanted)}, already_complete={len(skipped)}, not_in_request={len(unknown)})"
+    )
+
+    return selected, skipped, unknown
+
+
+def build_zip_outcomes(processed_records, load_outcomes):
+    """
+    Outcome manifest: one entry per ZIP with its extraction and upload result.
+
+        {'SourceZIPID', 'Extraction', 'FileCount', 'Upload', 'LoadID', 'LoadTag', 'Error', 'Duplicates'}
+
+    Duplicates lists the XML files posted without content because the same
+    content was loaded from another file, with that original file.
+
+    Returns (outcomes, retry_zip_ids) where retry_zip_ids are the ZIPs worth
+    sending again in re-run mode: extraction raised, the ZIP was deferred for
+    lack of budget in batch upload mode, or their load failed. A ZIP that is not a ZIP would fail the same way again
+    and is not listed.
+    """
+    load_by_zip = {zip_id: outcome for outcome in load_outcomes for zip_id in outcome['SourceZIPIDs']}
+    outcomes, retry_zip_ids = [], []
+
+    for processed_record in processed_records:
+        for zip_row in processed_record.get('SourceZIP', []):
+            zip_id = zip_row.get('SourceZIPID')
+            status = zip_row.get('FID_SourceStatus')
+            load = load_by_zip.get(zip_id)
+
+            if status == COMPLETE_STATUS:
+                extraction = EXTRACTED
+            elif processed_record.get('Deferred'):
+                extraction = DEFERRED
+            elif processed_record.get('Error'):
+                extraction = FAILED
+            else:
+                extraction = NOT_ZIP
+
+            if load is None:
+                upload = NOT_SENT
+            elif load['StatusCode'] == 200:
+                upload = UPLOADED
+            else:
+                upload = UPLOAD_FAILED
+
+            outcomes.append({
+                'SourceZIPID': zip_id,
+                'Extraction': extraction,
+                'FileCount': len(processed_record.get('SourceFile', [])),
+                'Upload': upload,
+                'LoadID': load['LoadID'] if load else None,
+                'LoadTag': load['LoadTag'] if load else None,
+                'Error': processed_record.get('Error') or (load['Error'] if load else None),
+                'Duplicates': skipped_duplicates(processed_record),
+            })
+
+            if processed_record.get('Error') or upload != UPLOADED:
+                retry_zip_ids.append(zip_id)
+
+    return outcomes, retry_zip_ids
@@ -0,0 +1,71 @@
+import os
+import logging
+
+
+def int_setting(name, default):
+    """
+    Read an integer Application Setting, falling back to `default`
+    when it is missing or not a valid integer.
+    """
+    raw = os.getenv(name)
+
+    if raw is None or raw.strip() == "":
+        return default
+
+    try:
+        return int(raw)
+    except ValueError:
+        logging.warning(f"ZIP SETTINGS | Invalid integer for {name} ({raw!r}) - using default {default}")
+        return default
+
+
+# Bytes of decoded ZIP held in memory before the spool rolls over to a temp file
+SPOOL_MAX_MEMORY_BYTES = int_setting("ZipExtractSpoolMaxBytes", 32 * 1024 * 1024)
+
+# Base64 characters decoded per step (rounded down to a multiple of 4)
+DECODE_CHUNK_CHARS = int_setting("ZipExtractDecodeChunkChars", 4 * 1024 * 1024)
+
+# Inflated bytes read per step when encoding a child file (rounded down to a multiple of 3)
+ENCODE_CHUNK_BYTES = int_setting("ZipExtractEncodeChunkBytes", 3 * 1024 * 1024)
+
+# A ZIP with at least this many XML members, or this many inflated XML bytes, is
+# split into member ranges that are inflated and encoded in parallel
+SPLIT_MIN_MEMBERS = int_setting("ZipExtractSplitMinMembers", 256)
+SPLIT_MIN_BYTES = int_setting("ZipExtractSplitMinBytes", 64 * 1024 * 1024)
+
+# Parallel member ranges for one split ZIP (1 disables splitting)
+SPLIT_WORKERS = int_setting("ZipExtractSplitWorkers", 4)
+
+# Executor backend for process_zip_batch: "thread", "process" or "auto"
+EXECUTOR_BACKEND = (os.getenv("ZipExtractExecutor") or "thread").strip().lower()
+
+# Concurrent ZIPs for the thread backend
+THREAD_MAX_CONCURRENCY = int_setting("ZipExtractMaxConcurrency", 8)
+
+# Encoded ZIP bytes per process worker - small batches are not worth extra processes
+PROCESS_MIN_BYTES_PER_WORKER = int_setting("ZipExtractProcessMinBytesPerWorker", 4 * 1024 * 1024)
+
+# Upper bounds for one Semarchy CREATE_LOAD_AND_SUBMIT body (a single ZIP is never split)
+LOAD_MAX_BYTES = int_setting("ZipExtractLoadMaxBytes", 8 * 1024 * 1024)
+LOAD_MAX_RECORDS = int_setting("ZipExtractLoadMaxRecords", 500)
+
+# Semarchy loads submitted at the same time
+LOAD_MAX_PARALLEL = int_setting("ZipExtractLoadMaxParallel", 4)
+
+# Estimated memory (decoded archive + Base64 of its XML) that may be held across the batch at once
+MEMORY_BUDGET_BYTES = int_setting("ZipExtractMemoryBudgetBytes", 512 * 1024 * 1024)
+
+# Decoded bytes read from the end of each ZIP to find its central directory
+ADMISSION_TAIL_BYTES = int_setting("ZipExtractAdmissionTailBytes", 1024 * 1024)
+
+# Inflation ratio assumed when the central directory cannot be read from the tail
+ASSUMED_INFLATION_RATIO = int_setting("ZipExtractAssumedInflationRatio", 10)
+
+# "pipelined" uploads ZIPs while the rest of the batch is extracted; "batch" uploads after all ZIPs finish
+UPLOAD_MODE = (os.getenv("ZipExtractUploadMode") or "pipelined").strip().lower()
+
+# Claim-check mode: named query returning {"records": [{"ZIPFileContent": ...}]} for ?SOURCE_ZIP_ID=
+CONTENT_QUERY = (os.getenv("ZipExtractContentQuery") or "GetSourceZIPContent").strip()
+
+# Claim-check mode: ZIP contents fetched (and held awaiting admission) at the same time
+CONTENT_FETCH_PARALLEL = int_setting("ZipExtractContentFetchParallel", 8)
@@ -0,0 +1,120 @@
+import re
+import json
+import logging
+from contextlib import nullcontext
+
+try:
+    from opentelemetry import trace
+except ImportError:  # opentelemetry-api not installed - metrics are still logged and returned
+    trace = None
+
+_tracer = trace.get_tracer('zip_extract') if trace is not None else None
+
+# Per-stage timings accumulated while a ZIP is processed
+STAGE_TIMINGS = ('DecodeSeconds', 'InflateSeconds', 'InspectSeconds', 'EncodeSeconds')
+
+# Per-ZIP metrics summed across the batch in the HTTP response
+SUMMED_METRICS = ('CompressedBytes', 'InflatedBytes', 'MemberCount', 'XMLCount', *STAGE_TIMINGS)
+
+_WORD_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+def new_zip_metrics(zip_file_id):
+    """
+    Empty metrics for one ZIP. Carried on the process_zip result under the
+    internal 'Metrics' key (never posted to Semarchy).
+    """
+    return {
+        'SourceZIPID': zip_file_id,
+        'CompressedBytes': 0,
+        'InflatedBytes': 0,
+        'MemberCount': 0,
+        'XMLCount': 0,
+        **{stage: 0.0 for stage in STAGE_TIMINGS},
+        'WaitSeconds': 0.0,
+        'ProcessSeconds': 0.0,
+        'UploadSeconds': 0.0,
+        'LoadTag': None,
+    }
+
+
+def merge_timings(target, timings):
+    """Add stage timings collected by b64encode_stream (one dict per thread) into `target`."""
+    for stage, seconds in timings.items():
+        target[stage] = target.get(stage, 0.0) + seconds
+
+
+def _span_attributes(metrics):
+    # OpenTelemetry attributes cannot be None; CompressedBytes -> zip.compressed_bytes
+    return {f'zip.{_WORD_BOUNDARY.sub("_", key).lower()}': value
+            for key, value in metrics.items() if value is not None}
+
+
+def record_zip_span(metrics, start_ns, end_ns):
+    """
+    Log the metrics for one ZIP and record them as a 'zip_extract.process_zip' span.
+
+    The span is created in the host process with explicit start / end times,
+    so ZIPs extracted in spawned process workers are traced the same way as
+    ZIPs extracted in threads.
+    """
+    logging.info(f"ZIP File ID: {metrics.get('SourceZIPID')} - Metrics: {json.dumps(metrics)}")
+
+    if _tracer is None:
+        return
+
+    span = _tracer.start_span('zip_extract.process_zip', start_time=start_ns, attributes=_span_attributes(metrics))
+    span.end(end_time=end_ns)
+
+
+def load_span(load_tag, zip_count):
+    """Current span around one Semarchy load submission (no-op without OpenTelemetry)."""
+    if _tracer is None:
+        return nullcontext()
+
+    return _tracer.start_as_current_span(
+        'zip_extract.semarchy_load',
+        attributes={'semarchy.load_tag': load_tag, 'zip.count': zip_count},
+    )
+
+
+def set_span_attributes(span, attributes):
+    if span is not None:
+        span.set_attributes({key: value for key, value in attributes.items() if value is not None})
+
+
+def summarise_batch(processed_records, load_outcomes, wall_seconds):
+    """
+    Batch summary for the HTTP response: totals plus the metrics of every ZIP.
+    Each ZIP's UploadSeconds / LoadTag are taken from the load that carried it.
+    """
+    zip_metrics = [record['Metrics'] for record in processed_records if record.get('Metrics')]
+
+    load_by_zip = {zip_id: outcome for outcome in load_outcomes for zip_id in outcome['SourceZIPIDs']}
+    for metrics in zip_metrics:
+        outcome = load_by_zip.get(metrics['SourceZIPID'])
+        if outcome is not None:
+            metrics['UploadSeconds'] = outcome.get('Seconds') or 0.0
+            metrics['LoadTag'] = outcome['LoadTag']
+
+    summary = {
+        'ZIPCount': len(processed_records),
+        'FileCount': sum(len(record.get('SourceFile', [])) for record in processed_records),
+        **{key: sum(metrics.get(key) or 0 for metrics in zip_metrics) for key in SUMMED_METRICS},
+        # Each load is counted once, not once per ZIP it carried
+        'UploadSeconds': sum(outcome.get('Seconds') or 0 for outcome in load_outcomes),
+        'LoadCount': len(load_outcomes),
+        'FailedLoadCount': sum(1 for outcome in load_outcomes if outcome['StatusCode'] != 200),
+        'WallSeconds': wall_seconds,
+        'ZIPs': zip_metrics,
+    }
+
+    for key in (*STAGE_TIMINGS, 'UploadSeconds', 'WallSeconds'):
+        summary[key] = round(summary[key], 3)
+
+    for metrics in zip_metrics:
+        for key, value in metrics.items():
+            if isinstance(value, float):
+                metrics[key] = round(value, 4)
+
+    return summary
@@ -0,0 +1,237 @@
+import time
+import logging
+import asyncio
+import requests
+
+from zip_extract.utils.helpers.zip_define_post_body import zip_define_post_body
+from zip_extract.utils.zip_telemetry import load_span, set_span_attributes
+from zip_extract.utils.zip_settings import LOAD_MAX_BYTES, LOAD_MAX_RECORDS, LOAD_MAX_PARALLEL
+
+# Allowance for the JSON keys and small attributes around each record
+RECORD_OVERHEAD_BYTES = 512
+
+
+def estimate_zip_size(processed_record):
+    """Approximate serialised size and record count of one process_zip result."""
+    source_files = processed_record.get('SourceFile', [])
+    source_zips = processed_record.get('SourceZIP', [])
+
+    record_count = len(source_files) + len(source_zips)
+    size = record_count * RECORD_OVERHEAD_BYTES
+    size += sum(len(source_file.get('SourceFileContent') or '') for source_file in source_files)
+
+    return size, record_count
+
+
+def plan_loads(processed_records, max_bytes=LOAD_MAX_BYTES, max_records=LOAD_MAX_RECORDS):
+    """
+    Group process_zip results into loads bounded by bytes and record count.
+
+    Each ZIP is kept whole, so its SourceZIP row is always in the same load as
+    its SourceFile children. A ZIP that is over the limits on its own gets a
+    load to itself.
+    """
+    loads = []
+    current, current_bytes, current_records = [], 0, 0
+
+    for processed_record in processed_records:
+        size, record_count = estimate_zip_size(processed_record)
+
+        if current and (current_bytes + size > max_bytes or current_records + record_count > max_records):
+            loads.append(current)
+            current, current_bytes, current_records = [], 0, 0
+
+        current.append(processed_record)
+        current_bytes += size
+        current_records += record_count
+
+    if current:
+        loads.append(current)
+
+    return loads
+
+
+def zip_ids(processed_records):
+    return [zip_row.get('SourceZIPID')
+            for processed_record in processed_records
+            for zip_row in processed_record.get('SourceZIP', [])]
+
+
+def submit_load(post_url, post_headers, processed_records, load_tag):
+    """
+    Send one CREATE_LOAD_AND_SUBMIT body. Never raises - the outcome is returned as a dict:
+        {'LoadTag', 'SourceZIPIDs', 'StatusCode', 'LoadID', 'Error', 'Seconds'}
+    """
+    outcome = {
+        'LoadTag': load_tag,
+        'SourceZIPIDs': zip_ids(processed_records),
+        'StatusCode': None,
+        'LoadID': None,
+        'Error': None,
+        'Seconds': None,
+    }
+
+    with load_span(load_tag, len(outcome['SourceZIPIDs'])) as span:
+        started = time.perf_counter()
+        post_body = zip_define_post_body(processed_records)
+        logging.info(f"Semarchy Load {load_tag} - SUBMIT (zips={len(outcome['SourceZIPIDs'])})")
+
+        try:
+            response = requests.post(
+                url=post_url,
+                json=post_body,
+                headers=post_headers,
+                timeout=(5, 60)
+                )
+            outcome['StatusCode'] = response.status_code
+
+            if response.status_code == 200:
+                outcome['LoadID'] = response.json().get('load', {}).get('loadId')
+                logging.info(f"Semarchy Load {load_tag} - SUCCESS (load_id={outcome['LoadID']})")
+            else:
+                outcome['Error'] = response.text
+                logging.error(f"Semarchy Load {load_tag} - FAILED: {response.status_code} - {response.text}")
+
+        except requests.exceptions.RequestException as e:
+            outcome['Error'] = str(e)
+            logging.error(f"Semarchy Load {load_tag} - RequestException: {e}")
+
+        outcome['Seconds'] = time.perf_counter() - started
+        set_span_attributes(span, {
+            'http.status_code': outcome['StatusCode'],
+            'semarchy.load_id': outcome['LoadID'],
+        })
+
+    return outcome
+
+
+async def upload_zip_records(processed_records, post_url, post_headers, deduplicator=None,
+                             max_parallel=LOAD_MAX_PARALLEL):
+    """
+    Split the batch into size-bounded loads and submit them with bounded parallelism.
+
+    With a SourceFileDeduplicator, copies of content already loaded (or sent in
+    the same load) are skipped as each load is submitted.
+
+    Returns the per-load outcomes (see submit_load), in load order.
+    """
+    loads = plan_loads(processed_records)
+    logging.info(f"Semarchy Loads - Planned {len(loads)} load(s) for {len(processed_records)} ZIP(s)")
+
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def _submit(idx, load):
+        async with semaphore:
+            if deduplicator is not None:
+                deduplicator.skip_duplicates(load)
+            outcome = await asyncio.to_thread(submit_load, post_url, post_headers, load, f'[{idx}/{len(loads)}]')
+
+        if deduplicator is not None and outcome['StatusCode'] == 200:
+            deduplicator.loaded(load)
+        return outcome
+
+    return list(await asyncio.gather(*(
+        _submit(idx, load) for idx, load in enumerate(loads, start=1)
+    )))
+
+
+def outcomes_by_zip(load_outcomes):
+    """Flatten per-load outcomes into {SourceZIPID: outcome}."""
+    return {
+        zip_id: outcome
+        for outcome in load_outcomes
+        for zip_id in outcome['SourceZIPIDs']
+    }
+
+
+class PipelinedUploader:
+    """
+    Uploads ZIP results while the rest of the batch is still being extracted.
+
+    `add` is called as each ZIP finishes (see process_zip_batch's on_result).
+    Results are grouped under the same byte / record limits as plan_loads, and
+    each full group is submitted straight away in the background, with at most
+    `max_parallel` loads in flight. `close` flushes the last group and returns
+    every load outcome.
+
+    Once a load has been submitted, its SourceFileContent strings are released.
+    `add` returns a future that is done at that point, so a caller can hold
+    resources for the ZIP (e.g. its memory budget) until then; `flush` sends
+    the pending group early when they are needed elsewhere.
+
+    With a SourceFileDeduplicator, copies of content already loaded are skipped
+    as each ZIP is added, and copies of content in the same load as it is
+    submitted.
+    """
+
+    def __init__(self, post_url, post_headers, deduplicator=None,
+                 max_bytes=LOAD_MAX_BYTES, max_records=LOAD_MAX_RECORDS, max_parallel=LOAD_MAX_PARALLEL):
+        self._post_url = post_url
+        self._post_headers = post_headers
+        self._deduplicator = deduplicator
+        self._max_bytes = max_bytes
+        self._max_records = max_records
+        self._semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        self._pending = []
+        self._pending_sent = []
+        self._pending_bytes = 0
+        self._pending_records = 0
+        self._tasks = []
+
+    async def add(self, processed_record):
+        if self._deduplicator is not None:
+            # A ZIP always travels in one load, so copies within it can go now
+            self._deduplicator.skip_duplicates([processed_record])
+
+        size, record_count = estimate_zip_size(processed_record)
+
+        if self._pending and (self._pending_bytes + size > self._max_bytes
+                              or self._pending_records + record_count > self._max_records):
+            self.flush()
+
+        sent = asyncio.get_running_loop().create_future()
+        self._pending.append(processed_record)
+        self._pending_sent.append(sent)
+        self._pending_bytes += size
+        self._pending_records += record_count
+        return sent
+
+    def flush(self):
+        """Submit the pending group now, if there is one."""
+        if not self._pending:
+            return
+
+        load, sent = self._pending, self._pending_sent
+        self._pending, self._pending_sent, self._pending_bytes, self._pending_records = [], [], 0, 0
+
+        load_tag = f'[{len(self._tasks) + 1}]'
+        self._tasks.append(asyncio.create_task(self._submit(load, sent, load_tag)))
+
+    async def _submit(self, load, sent, load_tag):
+        try:
+            async with self._semaphore:
+                if self._deduplicator is not None:
+                    self._deduplicator.skip_duplicates(load)
+                outcome = await asyncio.to_thread(submit_load, self._post_url, self._post_headers, load, load_tag)
+
+            if self._deduplicator is not None and outcome['StatusCode'] == 200:
+                self._deduplicator.loaded(load)
+
+            # The content has been sent (or has failed) - no need to hold it any longer
+            for processed_record in load:
+                for source_file in processed_record.get('SourceFile', []):
+                    source_file.pop('SourceFileContent', None)
+
+            return outcome
+        finally:
+            for future in sent:
+                if not future.done():
+                    future.set_result(None)
+
+    async def close(self):
+        self.flush()
+
+        outcomes = list(await asyncio.gather(*self._tasks))
+        logging.info(f"Semarchy Loads - Pipelined upload complete ({len(outcomes)} load(s))")
+        return outcomes